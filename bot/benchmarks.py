@@ -0,0 +1,769 @@
+# ==========================================
+# bot/benchmarks.py — Performance Benchmarks
+# ==========================================
+# Run from the bot/ directory, e.g.:
+#   python benchmarks.py db-concurrency --submissions 50
+#
+# Benchmarks that touch MySQL write rows tagged with username "__bench__"
+# and delete them afterwards. Point DB_NAME at a scratch database.
+
+import argparse
+import asyncio
+import os
+import time
+
+BENCH_USERNAME = "__bench__"
+
+
+# --------------------------------------------------
+# Helpers
+# --------------------------------------------------
+class LoopLagProbe:
+    """
+    Ticks every `interval` seconds on the event loop and records how late each
+    tick fires. A blocked loop shows up as a large max lag.
+    """
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.max_lag = 0.0
+        self.ticks = 0
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, loop.time() - expected)
+            self.ticks += 1
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def _cleanup_bench_rows():
+    from database import get_connection, rebuild_grievance_summary, rebuild_frequency_buckets, DB_NAME
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return
+    cur = conn.cursor()
+    try:
+        # Chunked so large synthetic seeds don't become one huge transaction
+        while True:
+            cur.execute("SELECT id FROM grievances WHERE username = %s LIMIT 10000", (BENCH_USERNAME,))
+            ids = [row[0] for row in cur.fetchall()]
+            if not ids:
+                break
+            placeholders = ", ".join(["%s"] * len(ids))
+            cur.execute(f"DELETE FROM grievance_history WHERE grievance_id IN ({placeholders})", ids)
+            cur.execute(f"DELETE FROM grievances WHERE id IN ({placeholders})", ids)
+            conn.commit()
+    finally:
+        cur.close()
+        conn.close()
+    # Raw DELETEs bypass the incremental summary and frequency upkeep
+    rebuild_grievance_summary()
+    rebuild_frequency_buckets()
+
+
+# --------------------------------------------------
+# 1. Async DB layer: concurrent submissions
+# --------------------------------------------------
+async def _run_submissions(n, photo, use_executor):
+    from database import save_grievance, _insert_grievance
+
+    async def blocking_submit(i):
+        # What the handlers did before: blocking MySQL work on the event loop
+        return _insert_grievance(
+            0, BENCH_USERNAME, f"Benchmark grievance {i}: garbage near bus stop",
+            "Garbage & Waste Management", "Bench Street", photo, None, ""
+        )
+
+    async def async_submit(i):
+        return await save_grievance(
+            0, BENCH_USERNAME, f"Benchmark grievance {i}: garbage near bus stop",
+            "Garbage & Waste Management", "Bench Street", photo, None, ""
+        )
+
+    submit = async_submit if use_executor else blocking_submit
+    probe = LoopLagProbe()
+    probe.start()
+    start = time.perf_counter()
+    results = await asyncio.gather(*(submit(i) for i in range(n)))
+    elapsed = time.perf_counter() - start
+    await probe.stop()
+    saved = sum(1 for r in results if r)
+    return saved, elapsed, probe.max_lag
+
+
+def bench_db_concurrency(args):
+    from priority_index import calculate_priority_index
+
+    calculate_priority_index("warm up the sentiment model", "Other Civic Complaints")
+    photo = os.urandom(args.photo_kb * 1024) if args.photo_kb else None
+
+    print(f"{args.submissions} concurrent submissions, photo={args.photo_kb} KB")
+    print(f"{'mode':<12}{'saved':>8}{'seconds':>10}{'subs/sec':>10}{'max loop lag (ms)':>20}")
+    try:
+        for label, use_executor in (("blocking", False), ("executor", True)):
+            saved, elapsed, lag = asyncio.run(_run_submissions(args.submissions, photo, use_executor))
+            print(f"{label:<12}{saved:>8}{elapsed:>10.2f}{saved / elapsed:>10.1f}{lag * 1000:>20.1f}")
+    finally:
+        _cleanup_bench_rows()
+
+
+# --------------------------------------------------
+# 2. Gemini calls: blocking vs async with a fake slow model
+# --------------------------------------------------
+class FakeDelayedModel:
+    """
+    Local stand-in for genai.GenerativeModel that answers after `delay` seconds.
+    """
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def _answer(self, prompt):
+        if "- reply:" in prompt:
+            return self._Response(
+                '{"issue": "Roads & Traffic", "location": "Bench Street", "reply": "Thank you, we are on it."}'
+            )
+        if "Classify the issue" in prompt:
+            return self._Response('{"issue": "Roads & Traffic", "location": "Bench Street"}')
+        return self._Response("Thank you, we are on it.")
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.delay)
+        return self._answer(prompt)
+
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(self.delay)
+        return self._answer(prompt)
+
+
+async def _run_llm_users(n, use_async):
+    import genai_helper
+
+    async def slow_user(i):
+        if use_async:
+            return await genai_helper.get_gemini_reply_async(f"pothole {i}")
+        return genai_helper.get_gemini_reply(f"pothole {i}")
+
+    async def unrelated_user():
+        # e.g. /start from someone else: should answer immediately
+        start = time.perf_counter()
+        await asyncio.sleep(0)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    slow = [asyncio.ensure_future(slow_user(i)) for i in range(n)]
+    other_wait = await unrelated_user()
+    await asyncio.gather(*slow)
+    return time.perf_counter() - start, other_wait
+
+
+def bench_llm_concurrency(args):
+    import genai_helper
+
+    genai_helper.set_model_factory(lambda: FakeDelayedModel(args.delay))
+    genai_helper.GEMINI_MAX_CONCURRENCY = args.concurrency
+
+    print(f"{args.users} users, fake model delay={args.delay}s, concurrency={args.concurrency}")
+    print(f"{'mode':<12}{'total seconds':>15}{'unrelated user wait (ms)':>28}")
+    for label, use_async in (("blocking", False), ("async", True)):
+        genai_helper._semaphore = None
+        total, other_wait = asyncio.run(_run_llm_users(args.users, use_async))
+        print(f"{label:<12}{total:>15.2f}{other_wait * 1000:>28.1f}")
+
+    # One /register: combined structured call vs classification + reply
+    for label, combined in (("two-call", False), ("combined", True)):
+        genai_helper._semaphore = None
+        genai_helper.GEMINI_COMBINED_CALL = combined
+
+        async def one_register():
+            start = time.perf_counter()
+            result = await genai_helper.analyze_grievance_async("pothole on Bench Street")
+            if result["reply"] is None:
+                result["reply"] = await genai_helper.get_gemini_reply_async("pothole on Bench Street")
+            return time.perf_counter() - start
+
+        print(f"{label:<12}/register LLM time: {asyncio.run(one_register()):.2f}s")
+
+    # Timeouts fall back to the canned reply
+    genai_helper._semaphore = None
+    genai_helper.GEMINI_TIMEOUT = args.delay / 2
+    reply = asyncio.run(genai_helper.get_gemini_reply_async("timeout check"))
+    print(f"timeout fallback reply: {reply!r}")
+
+
+# --------------------------------------------------
+# 3. Sentiment inference: one-by-one vs micro-batched
+# --------------------------------------------------
+SAMPLE_COMPLAINTS = [
+    "Garbage has not been collected for a week and the smell is unbearable.",
+    "There is a huge pothole near the bus stop, two bikes fell today.",
+    "Street lights on 5th cross are not working, it is unsafe at night.",
+    "Thank you for fixing the water supply so quickly!",
+    "Sewage is overflowing onto the road outside the school.",
+    "Loud music from the hall every night past midnight.",
+    "Electric wire hanging low near the park, risk of fire.",
+    "The bus on route 21 never arrives on time.",
+]
+
+
+def _corpus(n):
+    return [f"{SAMPLE_COMPLAINTS[i % len(SAMPLE_COMPLAINTS)]} (#{i})" for i in range(n)]
+
+
+def bench_sentiment_throughput(args):
+    from concurrent.futures import ThreadPoolExecutor
+    import priority_index
+    from sentiment_batcher import MicroBatcher
+
+    texts = _corpus(args.texts)
+    priority_index.get_sentiment_scores(texts[:2])  # warm up
+
+    print(f"{args.texts} texts, {args.callers} concurrent callers")
+    print(f"{'path':<28}{'seconds':>10}{'texts/sec':>12}")
+
+    start = time.perf_counter()
+    for t in texts:
+        priority_index.get_sentiment_scores([t])
+    elapsed = time.perf_counter() - start
+    print(f"{'one-by-one':<28}{elapsed:>10.2f}{len(texts) / elapsed:>12.1f}")
+
+    for batch_size in args.batch_sizes:
+        batcher = MicroBatcher(priority_index.get_sentiment_scores, batch_size, args.wait_ms)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.callers) as pool:
+            list(pool.map(lambda t: batcher.submit(t).result(), texts))
+        elapsed = time.perf_counter() - start
+        label = f"micro-batch (max {batch_size})"
+        print(f"{label:<28}{elapsed:>10.2f}{len(texts) / elapsed:>12.1f}"
+              f"   avg batch {batcher.stats()['avg_batch_size']:.1f}")
+
+
+# --------------------------------------------------
+# 4. Startup cost: eager vs lazy sentiment model
+# --------------------------------------------------
+STARTUP_TARGETS = {
+    "database": "import database",
+    # dashboard.py renders on import, so time the modules it pulls in instead
+    "dashboard": "import streamlit, pandas, plotly.express, reportlab.platypus, database, issue_config",
+}
+
+
+def _time_import_subprocess(statement, preload):
+    import json
+    import subprocess
+    import sys
+
+    code = (
+        "import json, resource, time\n"
+        "t = time.perf_counter()\n"
+        f"{statement}\n"
+        "elapsed = time.perf_counter() - t\n"
+        "rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024\n"
+        "print(json.dumps({'seconds': elapsed, 'rss_mb': rss_mb}))\n"
+    )
+    env = dict(os.environ, SENTIMENT_PRELOAD="1" if preload else "0")
+    out = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def bench_startup(args):
+    print(f"{'module':<12}{'model load':<12}{'import seconds':>16}{'peak RSS (MB)':>16}")
+    for name, statement in STARTUP_TARGETS.items():
+        for label, preload in (("eager", True), ("lazy", False)):
+            runs = [_time_import_subprocess(statement, preload) for _ in range(args.repeat)]
+            seconds = min(r["seconds"] for r in runs)
+            rss = min(r["rss_mb"] for r in runs)
+            print(f"{name:<12}{label:<12}{seconds:>16.2f}{rss:>16.0f}")
+
+
+# --------------------------------------------------
+# 5. Sentiment backends: accuracy parity + latency/RSS
+# --------------------------------------------------
+# Fixed corpus for parity checks (kept stable so results are comparable across runs)
+PARITY_CORPUS = SAMPLE_COMPLAINTS + [
+    "Fire in the transformer box, sparks everywhere, please send help immediately!",
+    "Nobody has responded to my complaint for three months. This is ridiculous.",
+    "The new park benches look great, thanks to the council.",
+    "Water supply is irregular, comes only for 30 minutes in the morning.",
+    "Stray dogs are chasing children near the school gate.",
+    "My property tax bill shows a wrong amount again.",
+    "The hospital emergency ward had no doctor on duty last night.",
+    "The portal keeps logging me out while I pay my water bill.",
+    "Tree branch fell on the road after the storm, traffic is blocked.",
+    "Drain is clogged but it is not urgent.",
+    "Kachra teen din se pada hai, bahut badbu aa rahi hai.",
+    "La calle está llena de basura desde hace una semana.",
+    "Die Straßenlaterne vor meinem Haus ist seit Tagen kaputt.",
+    "Le bus de la ligne 4 ne passe plus le dimanche.",
+    "Officials asked for a bribe to process my building permit.",
+    "Everything is fine now, the power came back after an hour.",
+]
+
+
+def bench_sentiment_backend_worker(args):
+    import json
+    import resource
+    import priority_index
+
+    priority_index.SENTIMENT_BACKEND = args.backend
+    start = time.perf_counter()
+    analyzer = priority_index.get_sentiment_analyzer()
+    load_seconds = time.perf_counter() - start
+    built = getattr(analyzer, "sentiment_backend", args.backend)
+    if built != args.backend:
+        # Numbers measured now would be the fallback's, published under this backend's name
+        print(json.dumps({"backend": args.backend, "fallback": built}))
+        return
+
+    priority_index.get_sentiment_scores(PARITY_CORPUS[:2])  # warm up
+    start = time.perf_counter()
+    scores = [priority_index.get_sentiment_scores([t])[0] for t in PARITY_CORPUS]
+    single_ms = (time.perf_counter() - start) / len(PARITY_CORPUS) * 1000
+
+    start = time.perf_counter()
+    priority_index.get_sentiment_scores(PARITY_CORPUS)
+    batch_ms = (time.perf_counter() - start) / len(PARITY_CORPUS) * 1000
+
+    print(json.dumps({
+        "backend": args.backend,
+        "load_seconds": load_seconds,
+        "single_ms": single_ms,
+        "batch_ms": batch_ms,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "scores": scores,
+    }))
+
+
+def bench_sentiment_backends(args):
+    import json
+    import subprocess
+    import sys
+
+    results = {}
+    for backend in args.backends:
+        # Separate process per backend so peak RSS isn't shared
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "sentiment-backend-worker", "--backend", backend],
+            capture_output=True, text=True, check=True
+        )
+        results[backend] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    for backend, r in list(results.items()):
+        if r.get("fallback"):
+            print(f"{backend}: not available here (would fall back to '{r['fallback']}'), not measured.")
+            del results[backend]
+    if not results:
+        return
+    reference = results.get("pipeline") or next(iter(results.values()))
+    print(f"{len(PARITY_CORPUS)} parity texts, reference backend: {reference['backend']}")
+    print(f"{'backend':<12}{'load s':>8}{'ms/text':>10}{'ms/text batched':>17}{'RSS MB':>9}"
+          f"{'star agreement':>16}{'max |Δscore|':>14}")
+    for backend, r in results.items():
+        agree = sum(a == b for a, b in zip(r["scores"], reference["scores"])) / len(PARITY_CORPUS)
+        max_diff = max(abs(a - b) for a, b in zip(r["scores"], reference["scores"]))
+        print(f"{backend:<12}{r['load_seconds']:>8.1f}{r['single_ms']:>10.1f}{r['batch_ms']:>17.1f}"
+              f"{r['rss_mb']:>9.0f}{agree:>16.0%}{max_diff:>14.2f}")
+
+
+# --------------------------------------------------
+# 6. Keyword severity: substring loop vs Aho–Corasick
+# --------------------------------------------------
+def _substring_loop_severity(text, weights):
+    # The original get_keyword_severity() implementation
+    text = text.lower()
+    max_score = 0.0
+    for word, weight in weights.items():
+        if word in text:
+            max_score = max(max_score, weight)
+    return max_score
+
+
+def bench_keyword_matcher(args):
+    import random
+    from keyword_matcher import AhoCorasick
+    from priority_index import KEYWORD_WEIGHTS
+
+    rng = random.Random(42)
+    alphabet = "abcdefghijklmnopqrstuvwxyzáéíñöüआगकर"
+    texts = _corpus(args.texts)
+
+    print(f"{args.texts} texts")
+    print(f"{'lexicon size':>12}{'loop ms/text':>14}{'AC ms/text':>12}{'speedup':>9}{'compile s':>11}")
+    for size in args.sizes:
+        lexicon = dict(KEYWORD_WEIGHTS)
+        while len(lexicon) < size:
+            term = "".join(rng.choice(alphabet) for _ in range(rng.randint(4, 10)))
+            lexicon[term] = round(rng.random(), 2)
+
+        start = time.perf_counter()
+        matcher = AhoCorasick(lexicon)
+        compile_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for t in texts:
+            _substring_loop_severity(t, lexicon)
+        loop_ms = (time.perf_counter() - start) / len(texts) * 1000
+
+        start = time.perf_counter()
+        for t in texts:
+            matcher.max_weight(t)
+        ac_ms = (time.perf_counter() - start) / len(texts) * 1000
+
+        print(f"{len(lexicon):>12}{loop_ms:>14.3f}{ac_ms:>12.3f}{loop_ms / ac_ms:>8.1f}x{compile_s:>11.2f}")
+
+
+# --------------------------------------------------
+# 7. Dashboard load: inline photo BLOBs vs media-store references
+# --------------------------------------------------
+def bench_media_dashboard_load(args):
+    import hashlib
+    from database import get_connection, DB_NAME
+
+    conn = get_connection(DB_NAME)
+    cur = conn.cursor()
+    photo = os.urandom(args.photo_kb * 1024)
+    ref = hashlib.sha256(photo).hexdigest()
+    layouts = {
+        "inline BLOB": ("bench_grievances_inline", "photo LONGBLOB", photo),
+        "photo_ref": ("bench_grievances_ref", "photo_ref CHAR(64)", ref),
+    }
+    try:
+        print(f"{args.rows} rows, {args.photo_kb} KB photo on every {args.photo_every}th row")
+        print(f"{'layout':<14}{'SELECT * seconds':>18}{'MB transferred':>16}")
+        for label, (table, photo_col, value) in layouts.items():
+            cur.execute(f"DROP TABLE IF EXISTS {table}")
+            cur.execute(f"""
+                CREATE TABLE {table} (
+                    id INT AUTO_INCREMENT PRIMARY KEY, grievance TEXT, issue VARCHAR(255),
+                    location VARCHAR(255), {photo_col}, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            column = photo_col.split()[0]
+            for start in range(0, args.rows, 100):
+                cur.executemany(
+                    f"INSERT INTO {table} (grievance, issue, location, {column}) VALUES (%s, %s, %s, %s)",
+                    [(SAMPLE_COMPLAINTS[i % len(SAMPLE_COMPLAINTS)], "Roads & Traffic", "Bench Street",
+                      value if i % args.photo_every == 0 else None)
+                     for i in range(start, min(start + 100, args.rows))]
+                )
+                conn.commit()
+
+            start = time.perf_counter()
+            cur.execute(f"SELECT * FROM {table} ORDER BY created_at DESC")
+            rows = cur.fetchall()
+            elapsed = time.perf_counter() - start
+            size_mb = sum(len(v) for r in rows for v in r if isinstance(v, (bytes, bytearray, str))) / 1e6
+            print(f"{label:<14}{elapsed:>18.3f}{size_mb:>16.1f}")
+    finally:
+        for table, _, _ in layouts.values():
+            cur.execute(f"DROP TABLE IF EXISTS {table}")
+        cur.close()
+        conn.close()
+
+
+# --------------------------------------------------
+# 8. Dashboard queries: full SELECT * vs projected keyset pages
+# --------------------------------------------------
+def _seed_synthetic_grievances(rows, chunk=5000):
+    """
+    Inserts `rows` synthetic bench grievances spread over the last ~year
+    (no sentiment model involved). Returns the number inserted.
+    """
+    import random
+    from database import get_connection, rebuild_grievance_summary, DB_NAME
+    from issue_config import ISSUE_CONFIG
+
+    rng = random.Random(7)
+    issues = list(ISSUE_CONFIG.keys())
+    locations = [f"Ward {i}" for i in range(200)]
+    conn = get_connection(DB_NAME)
+    cur = conn.cursor()
+    try:
+        for start in range(0, rows, chunk):
+            batch = []
+            for i in range(start, min(start + chunk, rows)):
+                batch.append((
+                    0, BENCH_USERNAME, SAMPLE_COMPLAINTS[i % len(SAMPLE_COMPLAINTS)],
+                    rng.choice(issues), rng.choice(locations),
+                    rng.choice(["Pending", "Completed"]), round(rng.random(), 3), rows - i
+                ))
+            cur.executemany(
+                """
+                INSERT INTO grievances (user_id, username, grievance, issue, location, status,
+                                        priority_index, created_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, NOW() - INTERVAL %s SECOND)
+                """,
+                batch
+            )
+            conn.commit()
+            print(f"  seeded {min(start + chunk, rows)}/{rows}", end="\r")
+        print()
+    finally:
+        cur.close()
+        conn.close()
+    rebuild_grievance_summary()
+    return rows
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def bench_dashboard_query(args):
+    import database
+
+    if not args.skip_seed:
+        print(f"Seeding {args.rows} synthetic grievances...")
+        _seed_synthetic_grievances(args.rows)
+
+    def old_full_select():
+        conn = database.get_connection(database.DB_NAME)
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute("SELECT *, (notified_to_dept = TRUE) AS notified_to_dept FROM grievances ORDER BY created_at DESC")
+            return cur.fetchall()
+        finally:
+            cur.close()
+            conn.close()
+
+    def deep_page(filters, pages):
+        cursor = None
+        for _ in range(pages):
+            _, cursor = database.fetch_grievances_page(filters, cursor, 10)
+        return cursor
+
+    filters = {"issue": ["Fire Hazards"], "status": ["Pending"]}
+    try:
+        print(f"{'query':<44}{'seconds':>10}{'rows':>10}")
+        for label, fn in (
+            ("old: SELECT * (all rows, all columns)", old_full_select),
+            ("card page 1", lambda: database.fetch_grievances_page(None, None, 10)[0]),
+            ("card page 1, filtered", lambda: database.fetch_grievances_page(filters, None, 10)[0]),
+            (f"card page {args.deep_pages} (keyset walk)", lambda: [deep_page(None, args.deep_pages)]),
+            ("analytics projection, filtered", lambda: database.fetch_grievances(filters)),
+            ("filter options (summary)", lambda: [database.fetch_filter_options()]),
+            ("old: metrics/charts in pandas (full scan)", lambda: database.fetch_grievances()),
+            ("metrics (summary)", lambda: [database.fetch_summary_metrics()]),
+            ("counts by issue, filtered (summary)", lambda: database.fetch_counts_by("issue", filters)),
+            ("top 10 locations (summary)", lambda: database.fetch_counts_by("location", None, 10)),
+            ("top 10 priority, filtered", lambda: database.fetch_top_priority(filters)),
+        ):
+            elapsed, rows = _timed(fn)
+            print(f"{label:<44}{elapsed:>10.3f}{len(rows):>10}")
+    finally:
+        if not args.keep_rows:
+            _cleanup_bench_rows()
+
+
+# --------------------------------------------------
+# 9. Bulk insert: per-row saves vs save_grievances_batch
+# --------------------------------------------------
+def _bench_records(n, offset=0):
+    from issue_config import ISSUE_CONFIG
+
+    issues = list(ISSUE_CONFIG.keys())
+    return [
+        {
+            "user_id": 0, "username": BENCH_USERNAME,
+            "grievance": SAMPLE_COMPLAINTS[(offset + i) % len(SAMPLE_COMPLAINTS)],
+            "issue": issues[(offset + i) % len(issues)], "location": f"Ward {(offset + i) % 50}",
+            "ai_reply": "Thank you, we are on it.",
+        }
+        for i in range(n)
+    ]
+
+
+def bench_bulk_insert(args):
+    import database
+    from priority_index import calculate_priority_index
+
+    calculate_priority_index("warm up the sentiment model", "Other Civic Complaints")
+
+    def per_row(records):
+        return [
+            database._insert_grievance(r["user_id"], r["username"], r["grievance"], r["issue"],
+                                       r["location"], None, None, r["ai_reply"])
+            for r in records
+        ]
+
+    print(f"{args.rows} rows per run")
+    print(f"{'mode':<28}{'saved':>8}{'seconds':>10}{'rows/sec':>10}")
+    try:
+        elapsed, ids = _timed(per_row, _bench_records(args.rows))
+        saved = sum(1 for i in ids if i)
+        print(f"{'per-row (1 txn each)':<28}{saved:>8}{elapsed:>10.2f}{saved / elapsed:>10.1f}")
+        for size in args.batch_sizes:
+            records = _bench_records(args.rows, offset=size)
+            elapsed, (ids, errors) = _timed(database.save_grievances_batch, records, size)
+            saved = sum(1 for i in ids if i)
+            print(f"{f'batch, chunk={size}':<28}{saved:>8}{elapsed:>10.2f}{saved / elapsed:>10.1f}")
+            if errors:
+                print(f"  {len(errors)} row errors, e.g. {next(iter(errors.values()))}")
+    finally:
+        _cleanup_bench_rows()
+
+
+# --------------------------------------------------
+# 10. PDF report: one in-memory Table vs streamed chunks
+# --------------------------------------------------
+def _legacy_pdf_report(filters):
+    """The old dashboard path: whole frame in memory, one Table for every row."""
+    import io
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table
+    from database import fetch_grievances
+    from reports import REPORT_COLUMNS, HEADER, TABLE_STYLE, _row
+
+    rows = fetch_grievances(filters, REPORT_COLUMNS)
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=letter).build(
+        [Table([HEADER] + [_row(r) for r in rows], style=TABLE_STYLE)]
+    )
+    return buffer.getbuffer().nbytes
+
+
+def _traced(fn, *args):
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        elapsed, result = _timed(fn, *args)
+        return elapsed, tracemalloc.get_traced_memory()[1] / 1e6, result
+    finally:
+        tracemalloc.stop()
+
+
+def bench_pdf_report(args):
+    import shutil
+    import tempfile
+    from datetime import date, timedelta
+    import reports
+
+    if not args.skip_seed:
+        print(f"Seeding {args.rows} synthetic grievances...")
+        _seed_synthetic_grievances(args.rows)
+
+    end = date.today()
+    start = end - timedelta(days=30)
+    filters = reports._report_filters(start, end, None)
+    out_dir = tempfile.mkdtemp(prefix="civicare-report-")
+    reports.REPORT_CACHE_DIR = out_dir
+    try:
+        print(f"{'mode':<36}{'seconds':>10}{'peak MB':>10}{'PDF MB':>10}")
+        if args.rows <= args.legacy_max_rows:
+            elapsed, peak, size = _traced(_legacy_pdf_report, filters)
+            print(f"{'old: one Table, in memory':<36}{elapsed:>10.2f}{peak:>10.1f}{size / 1e6:>10.1f}")
+        else:
+            print(f"old: one Table — skipped above --legacy-max-rows ({args.legacy_max_rows})")
+        for chunk_rows in args.chunk_rows:
+            path = os.path.join(out_dir, f"chunk-{chunk_rows}.pdf")
+            elapsed, peak, _ = _traced(reports.build_report, path, filters, "Benchmark", chunk_rows)
+            label = f"streamed, chunk={chunk_rows}"
+            print(f"{label:<36}{elapsed:>10.2f}{peak:>10.1f}{os.path.getsize(path) / 1e6:>10.1f}")
+        for label in ("get_report, first request", "get_report, cached"):
+            elapsed, _ = _timed(reports.get_report, start, end)
+            print(f"{label:<36}{elapsed:>10.3f}")
+        print("(peak MB = Python allocations under tracemalloc, which also slows both runs)")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+        if not args.keep_rows:
+            _cleanup_bench_rows()
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="CiviCare performance benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("db-concurrency", help="Concurrent submissions with/without the DB executor")
+    p.add_argument("--submissions", type=int, default=50)
+    p.add_argument("--photo-kb", type=int, default=512)
+    p.set_defaults(func=bench_db_concurrency)
+
+    p = sub.add_parser("llm-concurrency", help="Blocking vs async Gemini calls against a fake slow model")
+    p.add_argument("--users", type=int, default=8)
+    p.add_argument("--delay", type=float, default=0.5)
+    p.add_argument("--concurrency", type=int, default=4)
+    p.set_defaults(func=bench_llm_concurrency)
+
+    p = sub.add_parser("sentiment-throughput", help="Sentiment texts/sec: one-by-one vs micro-batched")
+    p.add_argument("--texts", type=int, default=256)
+    p.add_argument("--callers", type=int, default=32)
+    p.add_argument("--batch-sizes", type=int, nargs="+", default=[8, 16, 32])
+    p.add_argument("--wait-ms", type=float, default=5.0)
+    p.set_defaults(func=bench_sentiment_throughput)
+
+    p = sub.add_parser("startup", help="Import time of database/dashboard with eager vs lazy model load")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("sentiment-backends", help="Parity, latency and RSS of the sentiment backends")
+    p.add_argument("--backends", nargs="+", default=["pipeline", "quantized", "onnx"])
+    p.set_defaults(func=bench_sentiment_backends)
+
+    p = sub.add_parser("sentiment-backend-worker", help="(internal) measure one backend, print JSON")
+    p.add_argument("--backend", required=True)
+    p.set_defaults(func=bench_sentiment_backend_worker)
+
+    p = sub.add_parser("keyword-matcher", help="Keyword severity: substring loop vs Aho-Corasick by lexicon size")
+    p.add_argument("--texts", type=int, default=2000)
+    p.add_argument("--sizes", type=int, nargs="+", default=[18, 1000, 10000, 50000])
+    p.set_defaults(func=bench_keyword_matcher)
+
+    p = sub.add_parser("media-dashboard-load", help="Dashboard SELECT with inline BLOBs vs photo_ref")
+    p.add_argument("--rows", type=int, default=2000)
+    p.add_argument("--photo-kb", type=int, default=300)
+    p.add_argument("--photo-every", type=int, default=2)
+    p.set_defaults(func=bench_media_dashboard_load)
+
+    p = sub.add_parser("dashboard-query", help="Dashboard query cost on synthetic rows (default 1M)")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--deep-pages", type=int, default=100)
+    p.add_argument("--skip-seed", action="store_true", help="reuse rows from a previous --keep-rows run")
+    p.add_argument("--keep-rows", action="store_true")
+    p.set_defaults(func=bench_dashboard_query)
+
+    p = sub.add_parser("bulk-insert", help="Rows/sec: per-row saves vs save_grievances_batch by chunk size")
+    p.add_argument("--rows", type=int, default=1000)
+    p.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 500])
+    p.set_defaults(func=bench_bulk_insert)
+
+    p = sub.add_parser("pdf-report", help="PDF report time/peak memory: one Table vs streamed chunks")
+    p.add_argument("--rows", type=int, default=100_000)
+    p.add_argument("--chunk-rows", type=int, nargs="+", default=[200, 500, 2000])
+    p.add_argument("--legacy-max-rows", type=int, default=20_000,
+                   help="skip the old single-Table build above this many rows (it is quadratic)")
+    p.add_argument("--skip-seed", action="store_true", help="reuse rows from a previous --keep-rows run")
+    p.add_argument("--keep-rows", action="store_true")
+    p.set_defaults(func=bench_pdf_report)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
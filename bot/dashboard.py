@@ -5,16 +5,20 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from database import get_connection, DB_NAME, update_grievance_status, notify_department
+from database import (
+    update_grievance_status, notify_department,
+    update_grievance_status_batch, notify_department_batch, fetch_grievance_ids,
+    fetch_grievances_page, fetch_filter_options,
+    fetch_summary_metrics, fetch_counts_by, fetch_top_priority,
+    fetch_grievances_by_ids, changes_since, latest_change_cursor, CARD_COLUMNS
+)
 from issue_config import ISSUE_CONFIG  # <-- ADDED
-import base64
+import media_store
 import asyncio
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
+from reports import get_report
 from datetime import datetime, timedelta
-import io
+import os
+import time
 
 # --- Page Config ---
 st.set_page_config(page_title="Civic Grievance Collector Dashboard", layout="wide")
@@ -75,26 +79,157 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --- Database Fetch ---
+# Filters are pushed down into SQL; only the columns each view needs are read.
+# Metrics and charts come from the pre-aggregated grievance_summary table.
 @st.cache_data(ttl=60)
-def get_all_grievances():
-    conn = get_connection(DB_NAME)
-    if conn is None:
-        st.error("Database connection failed.")
-        return pd.DataFrame()
-    cursor = conn.cursor(dictionary=True)
-    cursor.execute("SELECT *, (notified_to_dept = TRUE) AS notified_to_dept FROM grievances ORDER BY created_at DESC")
-    data = cursor.fetchall()
-    conn.close()
-    return pd.DataFrame(data)
+def get_filter_options():
+    return fetch_filter_options()
+
+
+@st.cache_data(ttl=60)
+def get_metrics(filters=None):
+    return fetch_summary_metrics(filters)
+
+
+@st.cache_data(ttl=60)
+def get_counts(dimension, filters=None, limit=None):
+    return pd.DataFrame(fetch_counts_by(dimension, filters, limit), columns=[dimension, 'Count'])
+
+
+@st.cache_data(ttl=60)
+def get_top_priority(filters=None, limit=10):
+    return pd.DataFrame(fetch_top_priority(filters, limit))
+
+
+# --- Card page cache (per session) ---
+# Writes patch the changed row in place, and changes made elsewhere (new
+# submissions, other staff's edits) are replayed from the grievance_history
+# feed, so clicking through the queue never reloads the page.
+CARD_PAGE_TTL = 60
+CHANGE_FEED_LIMIT = 200  # more changes than this since the last run: reload instead
+
+
+def get_card_page(filters, cursor, page_size=10):
+    key = (repr(filters), cursor)
+    cached = st.session_state.get('card_page')
+    now = time.time()
+    fresh = cached is not None and cached['key'] == key and now - cached['loaded_at'] <= CARD_PAGE_TTL
+    if not (fresh and apply_changes(cached, filters, cursor, page_size)):
+        # Take the feed position first: changes racing the page load are replayed, not lost
+        change_cursor = latest_change_cursor()
+        rows, next_cursor = fetch_grievances_page(filters, cursor, page_size, CARD_COLUMNS)
+        cached = {
+            'key': key, 'rows': rows, 'next_cursor': next_cursor, 'loaded_at': now,
+            'change_cursor': change_cursor,
+        }
+        st.session_state.card_page = cached
+    return pd.DataFrame(cached['rows']), cached['next_cursor']
+
+
+def apply_changes(cached, filters, cursor, page_size):
+    """
+    Replays the change feed into the cached page: rows on it are patched, and
+    new or updated rows that now match the filters and sort into this page's
+    range are added. Returns False when too much changed to patch and the page
+    should be reloaded.
+    """
+    changes = list(changes_since(cached['change_cursor'], limit=CHANGE_FEED_LIMIT))
+    if len(changes) >= CHANGE_FEED_LIMIT:
+        return False
+    if not changes:
+        return True
+    cached['change_cursor'] = changes[-1]['id']
+
+    on_page = {r['id'] for r in cached['rows']}
+    changed = {c['grievance_id'] for c in changes}
+    if changed & on_page:
+        patch_card_rows(changed & on_page, filters)
+    # New submissions, and rows another operator's edit moved into the filters
+    entering = [
+        r for r in fetch_grievances_by_ids(changed - on_page, CARD_COLUMNS)
+        if _matches_filters(r, filters) and _in_page_range(r, cursor, cached['next_cursor'])
+    ]
+    if entering:
+        rows = sorted(cached['rows'] + entering, key=_page_key, reverse=True)
+        if len(rows) > page_size:
+            # Rows pushed off the bottom now start the next page
+            rows = rows[:page_size]
+            cached['next_cursor'] = _page_key(rows[-1])
+        cached['rows'] = rows
+    return True
+
+
+def _matches_filters(row, filters):
+    return all(not values or row.get(key) in values for key, values in filters.items())
+
+
+def _page_key(row):
+    # Same order and cursor shape as fetch_grievances_page
+    return (row['created_at'], row['id'])
+
+
+def _in_page_range(row, cursor, next_cursor):
+    """True if the row sorts between this page's cursor and the next page's."""
+    key = _page_key(row)
+    return (cursor is None or key < tuple(cursor)) and (next_cursor is None or key > tuple(next_cursor))
+
+
+def patch_card_rows(grievance_ids, filters):
+    """Re-reads just the changed rows into the cached page (dropping ones that left the filter)."""
+    cached = st.session_state.get('card_page')
+    if cached is None:
+        return
+    grievance_ids = set(grievance_ids)
+    fresh = {r['id']: r for r in fetch_grievances_by_ids(grievance_ids, CARD_COLUMNS)}
+    patched = []
+    for r in cached['rows']:
+        if r['id'] in grievance_ids:
+            r = fresh.get(r['id'])
+            if r is None or not _matches_filters(r, filters):
+                continue
+        patched.append(r)
+    cached['rows'] = patched
+
+
+def refresh_aggregates(status_changed=False):
+    """Drops only the summary-backed caches a write can affect (each is a small query)."""
+    get_metrics.clear()
+    get_counts.clear()
+    get_top_priority.clear()
+    if status_changed:
+        get_filter_options.clear()
+
+
+# --- Photos (thumbnail on the card, full image only when opened) ---
+@st.cache_data(max_entries=500)
+def load_thumbnail(photo_ref):
+    # Content-addressed, so a cached thumbnail never goes stale
+    thumb_path = media_store.ensure_thumbnail(photo_ref)
+    if thumb_path is None:
+        return None
+    with open(thumb_path, "rb") as f:
+        return f.read()
+
+
+@st.dialog("Grievance Photo", width="large")
+def show_full_photo(photo_ref, grievance_id):
+    full_path = media_store.path_for(photo_ref)
+    if media_store.exists(photo_ref):
+        st.image(full_path, caption=f"Grievance #{grievance_id}")
+    else:
+        st.error("Original photo not found in the media store.")
 
 # --- Data Preparation ---
 def prepare_data(df):
     if df.empty:
         return df
-    df['created_at'] = pd.to_datetime(df['created_at'])
-    df['Date'] = df['created_at'].dt.strftime('%Y-%m-%d %H:%M')
-    df['Photo Status'] = df['photo'].apply(lambda x: 'Yes' if x not in [None, b'', ''] else 'No')
-    df['Extra Data'] = df['additional_data'].fillna('N/A')
+    if 'created_at' in df.columns:
+        df['created_at'] = pd.to_datetime(df['created_at'])
+        df['Date'] = df['created_at'].dt.strftime('%Y-%m-%d %H:%M')
+    if 'photo_ref' in df.columns:
+        df['Photo Status'] = df['photo_ref'].apply(lambda x: 'Yes' if x not in [None, ''] else 'No')
+    if 'additional_data' in df.columns:
+        df['Extra Data'] = df['additional_data'].fillna('N/A')
     df.rename(columns={'issue': 'Issue Type', 'location': 'Location', 'status': 'Status'}, inplace=True)
     for col in ['priority_index', 'sentiment_score', 'keyword_severity', 'frequency_score', 'notified_to_dept']:
         if col in df.columns:
@@ -103,84 +238,34 @@ def prepare_data(df):
             df[col] = 0.0 if col != 'notified_to_dept' else False
     return df
 
-# --- Generate PDF Report ---
-def generate_pdf_report(df):
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    elements = []
-
-    title = Paragraph("Civic Grievance Report (Last 30 Days)", styles['Title'])
-    elements.append(title)
-    elements.append(Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S IST')}", styles['Normal']))
-    elements.append(Paragraph(f"Total Grievances: {len(df)}", styles['Normal']))
-    elements.append(Paragraph("\n", styles['Normal']))
-
-    table_data = [['ID', 'Issue Type', 'Location', 'Status', 'Priority Index', 'Complaint', 'Date', 'Notified']]
-    for _, row in df.iterrows():
-        table_data.append([
-            str(row['id']),
-            row['Issue Type'],
-            row['Location'],
-            row['Status'],
-            f"{row['priority_index']:.2f}",
-            row['grievance'][:100] + "..." if len(row['grievance']) > 100 else row['grievance'],
-            row['Date'],
-            "Yes" if row['notified_to_dept'] else "No"
-        ])
-
-    table = Table(table_data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ]))
-    elements.append(table)
-    doc.build(elements)
-    buffer.seek(0)
-    return buffer
+# --- Sidebar Filters (options come from DISTINCT queries) ---
+filter_options = get_filter_options()
+st.sidebar.header("Filters")
+selected_issue = st.sidebar.multiselect("Issue Type", filter_options["issue"])
+selected_status = st.sidebar.multiselect("Status", filter_options["status"])
+selected_location = st.sidebar.multiselect("Location", filter_options["location"])
+filters = {"issue": selected_issue, "status": selected_status, "location": selected_location}
 
 # --- Load Data ---
-df = get_all_grievances()
-if df.empty:
+metrics = get_metrics()
+if metrics["total"] == 0:
     st.warning("No grievance data available.")
     st.stop()
 
-df = prepare_data(df)
-
 # --- Title ---
 st.markdown('<div class="big-title">Civic Grievance Collector Dashboard</div>', unsafe_allow_html=True)
 st.markdown("#### Empowering smarter governance through AI-based prioritization and citizen feedback")
 
 # --- Summary Metrics ---
 col1, col2, col3, col4, col5 = st.columns(5)
-col1.markdown(f"<div class='metric-box'><div class='metric-label'>Total Grievances</div><div class='metric-value'>{len(df)}</div></div>", unsafe_allow_html=True)
-col2.markdown(f"<div class='metric-box'><div class='metric-label'>Pending Issues</div><div class='metric-value'>{df['Status'].eq('Pending').sum()}</div></div>", unsafe_allow_html=True)
-col3.markdown(f"<div class='metric-box'><div class='metric-label'>With Photos</div><div class='metric-value'>{df['Photo Status'].eq('Yes').sum()}</div></div>", unsafe_allow_html=True)
-col4.markdown(f"<div class='metric-box'><div class='metric-label'>Unique Locations</div><div class='metric-value'>{df['Location'].nunique()}</div></div>", unsafe_allow_html=True)
-col5.markdown(f"<div class='metric-box'><div class='metric-label'>Avg Priority Index</div><div class='metric-value'>{df['priority_index'].mean():.2f}</div></div>", unsafe_allow_html=True)
+col1.markdown(f"<div class='metric-box'><div class='metric-label'>Total Grievances</div><div class='metric-value'>{metrics['total']}</div></div>", unsafe_allow_html=True)
+col2.markdown(f"<div class='metric-box'><div class='metric-label'>Pending Issues</div><div class='metric-value'>{metrics['pending']}</div></div>", unsafe_allow_html=True)
+col3.markdown(f"<div class='metric-box'><div class='metric-label'>With Photos</div><div class='metric-value'>{metrics['with_photo']}</div></div>", unsafe_allow_html=True)
+col4.markdown(f"<div class='metric-box'><div class='metric-label'>Unique Locations</div><div class='metric-value'>{metrics['locations']}</div></div>", unsafe_allow_html=True)
+col5.markdown(f"<div class='metric-box'><div class='metric-label'>Avg Priority Index</div><div class='metric-value'>{metrics['avg_priority']:.2f}</div></div>", unsafe_allow_html=True)
 
 st.divider()
 
-# --- Sidebar Filters ---
-st.sidebar.header("Filters")
-selected_issue = st.sidebar.multiselect("Issue Type", sorted(df['Issue Type'].unique()))
-selected_status = st.sidebar.multiselect("Status", sorted(df['Status'].unique()))
-selected_location = st.sidebar.multiselect("Location", sorted(df['Location'].unique()))
-
-filtered_df = df.copy()
-if selected_issue:
-    filtered_df = filtered_df[filtered_df['Issue Type'].isin(selected_issue)]
-if selected_status:
-    filtered_df = filtered_df[filtered_df['Status'].isin(selected_status)]
-if selected_location:
-    filtered_df = filtered_df[filtered_df['Location'].isin(selected_location)]
-
 # --- Charts & Analytics (unchanged) ---
 # ... [Your existing charts code here – unchanged] ...
 # --- Charts Section ---
@@ -189,7 +274,7 @@ st.subheader("📊 Issue, Location & Priority Analytics")
 chart_col1, chart_col2 = st.columns([2, 2])
 with chart_col1:
     issue_chart = px.bar(
-        filtered_df.groupby('Issue Type').size().reset_index(name='Count'),
+        get_counts('issue', filters).rename(columns={'issue': 'Issue Type'}),
         y='Issue Type', x='Count', orientation='h',
         title="Grievances by Issue Type", color='Count', color_continuous_scale='Blues'
     )
@@ -198,7 +283,7 @@ with chart_col1:
 
 with chart_col2:
     loc_chart = px.bar(
-        filtered_df.groupby('Location').size().reset_index(name='Count').sort_values('Count', ascending=False).head(10),
+        get_counts('location', filters, 10).rename(columns={'location': 'Location'}),
         y='Location', x='Count', orientation='h',
         title="Top 10 Reported Locations", color='Count', color_continuous_scale='Oranges'
     )
@@ -208,8 +293,8 @@ with chart_col2:
 # --- Priority Index Analytics ---
 st.subheader("🔥 High Priority Issues Overview")
 
-if 'priority_index' in filtered_df.columns and filtered_df['priority_index'].sum() != 0:
-    high_priority_df = filtered_df.sort_values(by='priority_index', ascending=False).head(10)
+high_priority_df = prepare_data(get_top_priority(filters, 10).copy())
+if not high_priority_df.empty and high_priority_df['priority_index'].sum() != 0:
     priority_chart = px.bar(
         high_priority_df,
         x='priority_index',
@@ -229,17 +314,6 @@ if 'priority_index' in filtered_df.columns and filtered_df['priority_index'].sum
 else:
     st.info("Priority index values not available yet. Run the bot to generate data.")
 
-# --- Map Visualization ---
-if {'latitude', 'longitude'}.issubset(df.columns):
-    st.subheader("🗺️ Issue Heatmap by Location (Weighted by Priority)")
-    map_fig = px.density_mapbox(
-        df, lat='latitude', lon='longitude', z='priority_index',
-        hover_name='Issue Type', hover_data=['Location', 'Status', 'priority_index'],
-        radius=20, center=dict(lat=df['latitude'].mean(), lon=df['longitude'].mean()),
-        mapbox_style='carto-darkmatter', zoom=10, color_continuous_scale="Inferno"
-    )
-    st.plotly_chart(map_fig, use_container_width=True)
-
 # --- Interactive Grievance List ---
 st.subheader("Recent Grievances")
 
@@ -249,7 +323,87 @@ if 'show_popup' not in st.session_state:
 if 'popup_message' not in st.session_state:
     st.session_state.popup_message = ""
 
-for _, row in filtered_df.head(10).iterrows():
+# Keyset pagination: a stack of page cursors, reset whenever the filters change
+filters_signature = repr(filters)
+if st.session_state.get('page_filters') != filters_signature:
+    st.session_state.page_filters = filters_signature
+    st.session_state.page_cursors = [None]
+
+page_df, next_cursor = get_card_page(filters, st.session_state.page_cursors[-1])
+page_df = prepare_data(page_df.copy())
+
+if page_df.empty:
+    st.info("No grievances match the selected filters.")
+
+# --- Bulk Actions (one UPDATE + one transaction per click) ---
+BULK_ACTION_LIMIT = 5000
+
+
+def notified_departments(grievance_ids):
+    """Department → number of the given grievances routed to it."""
+    departments = {}
+    for r in fetch_grievances_by_ids(grievance_ids, ("id", "issue")):
+        dept = DEPARTMENT_MAP.get(r['issue'], "Relevant Department")
+        departments[dept] = departments.get(dept, 0) + 1
+    return departments
+
+
+with st.expander("Bulk Actions"):
+    scope = st.radio(
+        "Apply to", ["Selected on this page", "All matching the filters"],
+        horizontal=True, key="bulk_scope"
+    )
+    if scope == "Selected on this page":
+        bulk_ids = st.multiselect(
+            "Grievances", page_df['id'].tolist() if not page_df.empty else [],
+            format_func=lambda gid: f"#{gid}", key="bulk_ids"
+        )
+    else:
+        bulk_ids = None
+        matching = get_metrics(filters)["total"]
+        st.caption(f"{matching} grievance(s) match the sidebar filters"
+                   + (f" (first {BULK_ACTION_LIMIT} are processed per click)." if matching > BULK_ACTION_LIMIT else "."))
+
+    bulk_complete, bulk_pending, bulk_notify = st.columns(3)
+    action = None
+    if bulk_complete.button("Mark all Completed", key="bulk_complete"):
+        action = "Completed"
+    if bulk_pending.button("Mark all Pending", key="bulk_pending"):
+        action = "Pending"
+    if bulk_notify.button("Notify departments", key="bulk_notify", type="primary"):
+        action = "notify"
+
+    if action:
+        if bulk_ids is None:
+            notified = False if action == "notify" else None
+            bulk_ids = fetch_grievance_ids(filters, notified=notified, limit=BULK_ACTION_LIMIT)
+        if not bulk_ids:
+            st.warning("No grievances selected.")
+        else:
+            with st.spinner(f"Updating {len(bulk_ids)} grievance(s)..."):
+                if action == "notify":
+                    changed = asyncio.run(notify_department_batch(bulk_ids))
+                else:
+                    changed = asyncio.run(update_grievance_status_batch(bulk_ids, action))
+            if changed is None:
+                st.error("Bulk update failed; no grievance was changed.")
+            else:
+                if changed:
+                    patch_card_rows(changed, filters)
+                    refresh_aggregates(status_changed=action != "notify")
+                if action == "notify":
+                    departments = notified_departments(changed)
+                    st.session_state.show_popup = True
+                    st.session_state.popup_message = (
+                        f"{len(changed)} grievance(s) notified: "
+                        + (", ".join(f"**{dept}** ({n})" for dept, n in sorted(departments.items()))
+                           or "all were already notified")
+                        + "."
+                    )
+                st.session_state.pop("bulk_ids", None)
+                st.rerun()
+
+for _, row in page_df.iterrows():
     with st.container():
         current_status = row['Status']
         button_text = "Mark Completed" if current_status == 'Pending' else "Mark Pending"
@@ -282,7 +436,8 @@ for _, row in filtered_df.head(10).iterrows():
                         success = asyncio.run(update_grievance_status(row['id'], new_status))
                         if success:
                             st.success(f"Grievance #{row['id']} marked as {new_status}")
-                            st.cache_data.clear()
+                            patch_card_rows([row['id']], filters)
+                            refresh_aggregates(status_changed=True)
                             st.rerun()
                         else:
                             st.error("Failed to update status")
@@ -310,34 +465,34 @@ for _, row in filtered_df.head(10).iterrows():
                             if success:
                                 st.session_state.show_popup = True
                                 st.session_state.popup_message = f"Grievance #{row['id']} ({row['Issue Type']}) has been successfully notified to the **{dept_name}**."
-                                st.cache_data.clear()
+                                patch_card_rows([row['id']], filters)
+                                refresh_aggregates()
                                 st.rerun()
                             else:
                                 st.error("Failed to notify department")
 
-        # --- Zoomable Image ---
-        blob_data = row.get('photo')
-        if blob_data:
-            base64_str = base64.b64encode(blob_data).decode('utf-8')
-            image_html = f"""
-            <div style="text-align:center; margin: 10px 0;">
-                <img src="data:image/jpeg;base64,{base64_str}" width="150"
-                    style="border-radius:10px; cursor:pointer;" onclick="openPopup{row['id']}()">
-            </div>
-            <div id="popup-{row['id']}" style="display:none; position:fixed; top:0; left:0; width:100%; height:100%; background:rgba(0,0,0,0.9); justify-content:center; align-items:center; z-index:9999;">
-                <img id="popup-img-{row['id']}" src="data:image/jpeg;base64,{base64_str}"
-                    style="max-width:90%; max-height:90%; border-radius:12px; box-shadow:0 0 25px #000;">
-            </div>
-            <script>
-            const popup{row['id']} = document.getElementById("popup-{row['id']}");
-            function openPopup{row['id']}() {{ popup{row['id']}.style.display = "flex"; }}
-            popup{row['id']}.onclick = (e) => {{ if (e.target === popup{row['id']}) popup{row['id']}.style.display = "none"; }};
-            </script>
-            """
-            st.markdown(image_html, unsafe_allow_html=True)
+        # --- Thumbnail + full image on demand ---
+        thumbnail = load_thumbnail(row['photo_ref']) if row.get('photo_ref') else None
+        if thumbnail:
+            st.image(thumbnail, width=150)
+            if st.button("View full image", key=f"photo_{row['id']}"):
+                show_full_photo(row['photo_ref'], row['id'])
         else:
             st.markdown("<span style='color:#888'>No image available</span>", unsafe_allow_html=True)
 
+# --- Page navigation ---
+nav_prev, nav_page, nav_next = st.columns([1, 2, 1])
+with nav_prev:
+    if st.button("← Newer", disabled=len(st.session_state.page_cursors) == 1):
+        st.session_state.page_cursors.pop()
+        st.rerun()
+with nav_page:
+    st.markdown(f"<div style='text-align:center'>Page {len(st.session_state.page_cursors)}</div>", unsafe_allow_html=True)
+with nav_next:
+    if st.button("Older →", disabled=next_cursor is None):
+        st.session_state.page_cursors.append(next_cursor)
+        st.rerun()
+
 # --- Popup Modal (Dynamic Department) ---
 if st.session_state.show_popup:
     st.markdown(f"""
@@ -362,18 +517,32 @@ if st.session_state.show_popup:
     """, unsafe_allow_html=True)
     st.session_state.show_popup = False
 
-# --- PDF Download Section ---
+# --- PDF Report (built only on request; cached per range + filters until data changes) ---
 st.subheader("Download Report")
-last_month = datetime.now() - timedelta(days=30)
-recent_df = df[df['created_at'] >= last_month]
-
-if not recent_df.empty:
-    pdf_buffer = generate_pdf_report(recent_df)
-    st.download_button(
-        label="Download Last 30 Days Report as PDF",
-        data=pdf_buffer,
-        file_name=f"grievance_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
-        mime="application/pdf"
-    )
-else:
-    st.warning("No grievances recorded in the last 30 days.")
\ No newline at end of file
+today = datetime.now().date()
+report_range = st.date_input("Report period", (today - timedelta(days=30), today), max_value=today)
+
+# The picker returns a single date while the range is still being chosen
+if isinstance(report_range, tuple) and len(report_range) == 2:
+    report_start, report_end = report_range
+    st.caption("Includes grievances matching the sidebar filters.")
+    if st.button("Generate PDF report"):
+        with st.spinner("Building report..."):
+            report_path, cached = get_report(report_start, report_end, filters)
+        if report_path is None:
+            st.error("Could not build the report: database unavailable.")
+        else:
+            st.session_state.report = {
+                "path": report_path,
+                "file_name": f"grievance_report_{report_start:%Y%m%d}_{report_end:%Y%m%d}.pdf",
+            }
+
+report = st.session_state.get("report")
+if report and os.path.exists(report["path"]):
+    with open(report["path"], "rb") as f:
+        st.download_button(
+            label=f"Download {report['file_name']}",
+            data=f.read(),
+            file_name=report["file_name"],
+            mime="application/pdf"
+        )
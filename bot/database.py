@@ -1,14 +1,26 @@
 # ==========================================
-# bot/database.py — Final Version: Safe Column Add + Notify Any Department
+# bot/database.py — Final Version: Versioned Schema + Notify Any Department
 # ==========================================
 
 import os
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode
 from dotenv import load_dotenv
-from priority_index import calculate_priority_index
+from priority_index import calculate_priority_index, calculate_priority_indices
+from frequency_counter import (
+    tracker as frequency_tracker, normalize_key, bucket_start,
+    FREQUENCY_BUCKET_SECONDS, FREQUENCY_WINDOWS
+)
+from db_pool import ConnectionPool
+import migrations
+import media_store
+from concurrent.futures import ThreadPoolExecutor
+import functools
 import traceback
 import asyncio
+import threading
+import time
+import uuid
 
 load_dotenv()
 
@@ -17,31 +29,89 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
 DB_NAME = os.getenv("DB_NAME")
 
+# Pool tuning (shared by the bot and the Streamlit dashboard)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_RECYCLE = float(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Threads that run blocking MySQL work for the async bot (keep <= DB_POOL_SIZE)
+DB_EXECUTOR_THREADS = int(os.getenv("DB_EXECUTOR_THREADS", str(DB_POOL_SIZE)))
+
+_pools = {}
+_pools_lock = threading.Lock()
+
 
 # --------------------------------------------------
-# 1. Connection Helper
+# 1. Connection Helper (Pooled)
 # --------------------------------------------------
+def get_pool(db_name=DB_NAME):
+    """
+    Returns the process-wide connection pool for `db_name`, creating it on first use.
+    """
+    with _pools_lock:
+        pool = _pools.get(db_name)
+        if pool is None:
+            pool = ConnectionPool(
+                size=DB_POOL_SIZE,
+                timeout=DB_POOL_TIMEOUT,
+                recycle_seconds=DB_POOL_RECYCLE,
+                host=DB_HOST,
+                user=DB_USER,
+                password=DB_PASSWORD,
+                database=db_name
+            )
+            _pools[db_name] = pool
+        return pool
+
+
 def get_connection(db_name=None):
+    """
+    Borrows a connection for `db_name` from the shared pool.
+    Calling `.close()` on it returns it to the pool.
+    Server-level connections (db_name=None, used once by init_db) are not pooled.
+    """
     try:
-        conn = mysql.connector.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=db_name
-        )
-        return conn
+        if db_name is None:
+            return mysql.connector.connect(
+                host=DB_HOST,
+                user=DB_USER,
+                password=DB_PASSWORD
+            )
+        return get_pool(db_name).get_connection()
     except Error as e:
         print(f"MySQL connection error: {e}")
         return None
 
 
+def pool_stats(db_name=DB_NAME):
+    """
+    Returns checkout/wait/usage statistics for the pool serving `db_name`.
+    """
+    return get_pool(db_name).stats()
+
+
 # --------------------------------------------------
-# 2. Database Initialization (Safe Column Add – No IF NOT EXISTS)
+# 1b. Async Access (Bounded DB Executor)
+# --------------------------------------------------
+_db_executor = ThreadPoolExecutor(max_workers=DB_EXECUTOR_THREADS, thread_name_prefix="db")
+
+
+async def run_db(func, *args, **kwargs):
+    """
+    Runs a blocking database function on the bounded DB executor and awaits it,
+    so slow queries (e.g. LONGBLOB inserts) don't freeze other conversations.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(func, *args, **kwargs))
+
+
+# --------------------------------------------------
+# 2. Database Initialization (Versioned Migrations)
 # --------------------------------------------------
 def init_db():
     """
-    Creates the database and grievances table if missing.
-    Safely adds `notified_to_dept` column if it doesn't exist.
+    Creates the database if missing and applies pending schema migrations
+    (see migrations.py). Cheap when the schema is already current.
     """
     try:
         # Step 1: Create database if missing
@@ -55,67 +125,399 @@ def init_db():
         cur.close()
         root_conn.close()
 
-        # Step 2: Connect to target DB
+        # Step 2: Bring the schema up to date
         conn = get_connection(DB_NAME)
         if not conn:
             print("Failed to connect to database after creation.")
             return
-        cur = conn.cursor()
+        try:
+            migrations.migrate(conn)
+        finally:
+            conn.close()
+    except (Error, RuntimeError) as e:
+        print(f"Database initialization error: {e}")
+        traceback.print_exc()
 
-        # Step 3: Create base table
-        create_table_query = """
-            CREATE TABLE IF NOT EXISTS grievances (
-                id INT AUTO_INCREMENT PRIMARY KEY,
-                user_id BIGINT,
-                username VARCHAR(255),
-                grievance TEXT,
-                issue VARCHAR(255) DEFAULT 'General complaint',
-                location VARCHAR(255) DEFAULT 'unknown',
-                photo LONGBLOB,
-                additional_data TEXT,
-                ai_reply TEXT,
-                sentiment_score FLOAT DEFAULT 0,
-                keyword_severity FLOAT DEFAULT 0,
-                frequency_score FLOAT DEFAULT 0,
-                priority_index FLOAT DEFAULT 0,
-                status VARCHAR(50) DEFAULT 'Pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
+
+# --------------------------------------------------
+# 2b. Rolling Frequency Counters (persisted buckets)
+# --------------------------------------------------
+_FREQUENCY_UPSERT = """
+    INSERT INTO grievance_frequency (scope, `key`, bucket_start, count)
+    VALUES (%s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE count = count + VALUES(count)
+"""
+_frequency_load_lock = threading.Lock()
+
+# Buckets older than the longest window are deleted at load time and then at
+# most once per FREQUENCY_PRUNE_INTERVAL seconds by the insert paths
+FREQUENCY_PRUNE_INTERVAL = float(os.getenv("FREQUENCY_PRUNE_INTERVAL", "3600"))
+FREQUENCY_PRUNE_BATCH = 5000
+_frequency_pruned_at = 0.0
+
+
+def _backfill_frequency(cur):
+    """
+    Seeds grievance_frequency from existing grievances (first run and rebuilds).
+    """
+    since = time.time() - max(FREQUENCY_WINDOWS.values())
+    cur.execute(
         """
-        cur.execute(create_table_query)
+        SELECT issue, location, UNIX_TIMESTAMP(created_at) DIV %s * %s AS bucket, COUNT(*)
+        FROM grievances
+        WHERE created_at >= FROM_UNIXTIME(%s)
+        GROUP BY issue, location, bucket
+        """,
+        (FREQUENCY_BUCKET_SECONDS, FREQUENCY_BUCKET_SECONDS, int(since))
+    )
+    totals = {}
+    for issue, location, bucket, count in cur.fetchall():
+        for scope, value in (("issue", issue), ("location", location)):
+            k = (scope, normalize_key(scope, value), int(bucket))
+            totals[k] = totals.get(k, 0) + count
+    if totals:
+        cur.executemany(_FREQUENCY_UPSERT, [(*k, c) for k, c in totals.items()])
+        print(f"Backfilled {len(totals)} frequency buckets from existing grievances.")
+
 
-        # Step 4: Add `notified_to_dept` safely (MySQL doesn't support IF NOT EXISTS for columns)
-        cur.execute("SHOW COLUMNS FROM grievances LIKE 'notified_to_dept'")
-        if not cur.fetchone():
-            cur.execute("ALTER TABLE grievances ADD COLUMN notified_to_dept BOOLEAN DEFAULT FALSE")
-            print("Added column: notified_to_dept")
-        else:
-            print("Column notified_to_dept already exists")
+def prune_frequency_buckets(cur, now=None, batch=FREQUENCY_PRUNE_BATCH):
+    """
+    Deletes up to `batch` buckets that fell out of every window, inside the
+    caller's transaction. Returns the number of rows deleted.
+    """
+    global _frequency_pruned_at
+    _frequency_pruned_at = time.monotonic()
+    cutoff = bucket_start((now or time.time()) - max(FREQUENCY_WINDOWS.values()))
+    cur.execute("DELETE FROM grievance_frequency WHERE bucket_start < %s LIMIT %s", (cutoff, batch))
+    return cur.rowcount
+
+
+def _maybe_prune_frequency(cur, now):
+    if time.monotonic() - _frequency_pruned_at >= FREQUENCY_PRUNE_INTERVAL:
+        prune_frequency_buckets(cur, now)
 
+
+def load_frequency_counters():
+    """
+    Loads recent frequency buckets into the in-memory tracker (once per process).
+    """
+    if frequency_tracker.loaded:
+        return
+    with _frequency_load_lock:
+        if frequency_tracker.loaded:
+            return
+        conn = get_connection(DB_NAME)
+        if conn is None:
+            return
+        cur = conn.cursor()
+        try:
+            pruned = 0
+            while True:
+                deleted = prune_frequency_buckets(cur)
+                conn.commit()
+                pruned += deleted
+                if deleted < FREQUENCY_PRUNE_BATCH:
+                    break
+            if pruned:
+                print(f"Pruned {pruned} expired frequency buckets.")
+            since = time.time() - max(FREQUENCY_WINDOWS.values())
+            cur.execute(
+                "SELECT scope, `key`, bucket_start, count FROM grievance_frequency WHERE bucket_start >= %s",
+                (bucket_start(since),)
+            )
+            frequency_tracker.load(cur.fetchall())
+        except Error as e:
+            print(f"Error loading frequency counters: {e}")
+        finally:
+            cur.close()
+            conn.close()
+
+
+def rebuild_frequency_buckets():
+    """
+    Recomputes grievance_frequency from grievances. Needed only after deletes
+    that bypass this module (benchmark cleanup); running processes keep their
+    in-memory counts until restarted.
+    """
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        print("DB connection failed in rebuild_frequency_buckets().")
+        return False
+    cur = conn.cursor()
+    try:
+        cur.execute("DELETE FROM grievance_frequency")
+        _backfill_frequency(cur)
         conn.commit()
+        return True
+    except Error as e:
+        conn.rollback()
+        print(f"Error rebuilding frequency buckets: {e}")
+        traceback.print_exc()
+        return False
+    finally:
         cur.close()
         conn.close()
-        print("Database initialized successfully with all columns.")
+
+
+def _record_frequency(cur, issue, location, ts):
+    """
+    Increments the persisted buckets for one grievance inside the caller's transaction.
+    """
+    b = bucket_start(ts)
+    cur.executemany(_FREQUENCY_UPSERT, [
+        ("issue", normalize_key("issue", issue), b, 1),
+        ("location", normalize_key("location", location), b, 1),
+    ])
+    _maybe_prune_frequency(cur, ts)
+
+
+# --------------------------------------------------
+# 2c. Dashboard Summary (counts per issue x location x status)
+# --------------------------------------------------
+# Kept in step with grievances inside the same transactions, so the dashboard
+# metrics and charts read a few hundred aggregate rows instead of the raw table.
+_SUMMARY_UPSERT = """
+    INSERT INTO grievance_summary (issue, location, status, total, with_photo, notified, priority_sum)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        total = total + VALUES(total),
+        with_photo = with_photo + VALUES(with_photo),
+        notified = notified + VALUES(notified),
+        priority_sum = priority_sum + VALUES(priority_sum)
+"""
+
+
+def _summary_key(issue, location, status):
+    return (issue or "", location or "", status or "")
+
+
+def _adjust_summary(cur, issue, location, status, sign=1,
+                    has_photo=False, notified=False, priority=0.0):
+    """
+    Adds (sign=1) or removes (sign=-1) one grievance from its summary row
+    inside the caller's transaction.
+    """
+    cur.execute(_SUMMARY_UPSERT, (
+        *_summary_key(issue, location, status),
+        sign, sign * int(bool(has_photo)), sign * int(bool(notified)), sign * float(priority or 0)
+    ))
+
+
+def _rebuild_summary(cur):
+    cur.execute("DELETE FROM grievance_summary")
+    cur.execute("""
+        INSERT INTO grievance_summary (issue, location, status, total, with_photo, notified, priority_sum)
+        SELECT COALESCE(issue, ''), COALESCE(location, ''), COALESCE(status, ''),
+               COUNT(*), SUM(photo_ref IS NOT NULL OR photo IS NOT NULL),
+               SUM(COALESCE(notified_to_dept, FALSE)), SUM(COALESCE(priority_index, 0))
+        FROM grievances
+        GROUP BY 1, 2, 3
+    """)
+    print(f"Rebuilt grievance_summary ({cur.rowcount} rows).")
+
+
+def rebuild_grievance_summary():
+    """
+    Recomputes grievance_summary from scratch. Needed only after writes that
+    bypass this module (manual SQL, bulk deletes, benchmark seeding).
+    Run from bot/: python -c "from database import rebuild_grievance_summary as r; r()"
+    """
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        print("DB connection failed in rebuild_grievance_summary().")
+        return False
+    cur = conn.cursor()
+    try:
+        _rebuild_summary(cur)
+        conn.commit()
+        return True
     except Error as e:
-        print(f"Database initialization error: {e}")
+        conn.rollback()
+        print(f"Error rebuilding grievance summary: {e}")
         traceback.print_exc()
+        return False
+    finally:
+        cur.close()
+        conn.close()
+
+
+# --------------------------------------------------
+# 2d. Change History (append-only feed)
+# --------------------------------------------------
+# Every insert, status change and department notification appends a row to
+# grievance_history in the same transaction, so consumers (dashboard, exporters,
+# notifiers) can follow changes incrementally with changes_since().
+_HISTORY_INSERT = """
+    INSERT INTO grievance_history (grievance_id, event, old_value, new_value)
+    VALUES (%s, %s, %s, %s)
+"""
+# History ids are assigned at INSERT but become visible at COMMIT, so a reader
+# stays this far behind the newest events to not step over a slower transaction.
+CHANGE_FEED_SETTLE_SECONDS = float(os.getenv("CHANGE_FEED_SETTLE_SECONDS", "2"))
+
+
+def _history_value(value):
+    if value is None:
+        return None
+    if isinstance(value, (bool, int)):
+        return str(int(value))
+    return str(value)
+
+
+def _record_history(cur, events):
+    """events: [(grievance_id, event, old_value, new_value), ...] inside the caller's transaction."""
+    if events:
+        cur.executemany(_HISTORY_INSERT, [
+            (gid, event, _history_value(old), _history_value(new)) for gid, event, old, new in events
+        ])
+
+
+def latest_change_cursor(settle_seconds=CHANGE_FEED_SETTLE_SECONDS):
+    """
+    Cursor for the current end of the feed: changes_since() from here returns
+    only changes made afterwards.
+    """
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return 0
+    cur = conn.cursor()
+    try:
+        cur.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM grievance_history WHERE changed_at < NOW(6) - INTERVAL %s SECOND",
+            (settle_seconds,)
+        )
+        return cur.fetchone()[0]
+    except Error as e:
+        print(f"Error reading change feed cursor: {e}")
+        return 0
+    finally:
+        cur.close()
+        conn.close()
+
+
+def changes_since(cursor=0, limit=None, batch_size=500, settle_seconds=CHANGE_FEED_SETTLE_SECONDS):
+    """
+    Yields grievance changes after `cursor` in commit order, as dicts with
+    id, grievance_id, event ('created' | 'status' | 'notified_to_dept'),
+    old_value, new_value and changed_at. The `id` of the last change handled
+    is the cursor to resume from. Reads in keyset batches, holding a pooled
+    connection only while a batch is fetched.
+    """
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        conn = get_connection(DB_NAME)
+        if conn is None:
+            return
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(
+                "SELECT id, grievance_id, event, old_value, new_value, changed_at FROM grievance_history "
+                "WHERE id > %s AND changed_at < NOW(6) - INTERVAL %s SECOND ORDER BY id LIMIT %s",
+                (cursor, settle_seconds, size)
+            )
+            rows = cur.fetchall()
+        except Error as e:
+            print(f"Error reading change feed: {e}")
+            return
+        finally:
+            cur.close()
+            conn.close()
+        yield from rows
+        if len(rows) < size:
+            return
+        cursor = rows[-1]["id"]
+        if remaining is not None:
+            remaining -= len(rows)
 
 
 # --------------------------------------------------
 # 3. Save Grievance (Handles both File object and bytes)
 # --------------------------------------------------
-async def save_grievance(user_id, username, grievance,
-                         issue="General complaint", location="unknown",
-                         photo_file=None, additional_data=None, ai_reply=""):
+_GRIEVANCE_INSERT = """
+    INSERT INTO grievances (
+        user_id, username, grievance, issue, location,
+        photo_ref, additional_data, ai_reply,
+        sentiment_score, keyword_severity, frequency_score, priority_index, status, tracking_id
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'Pending', %s)
+"""
+
+
+def _insert_grievance(user_id, username, grievance, issue, location,
+                      photo_blob, additional_data, ai_reply, tracking_id=None):
     """
-    Saves grievance data with optional photo (BLOB) and AI-based priority metrics.
+    Blocking part of save_grievance(): photo storage, priority scoring + INSERT.
+    Runs on the DB executor so it never stalls the bot's event loop.
+    Returns the new grievance id, or None on failure. With a `tracking_id`,
+    saving the same submission twice returns the existing row's id.
     """
+    # --- Store photo in the media store; the row only keeps its hash
+    photo_ref = None
+    if photo_blob:
+        try:
+            photo_ref = media_store.put(photo_blob)
+        except OSError as e:
+            print(f"Failed to store photo: {e}")
+            traceback.print_exc()
+    load_frequency_counters()
+
+    # --- Calculate Priority Index
+    try:
+        sentiment, keyword_sev, freq, priority_idx = calculate_priority_index(grievance, issue, location)
+    except Exception as e:
+        print(f"Priority index calculation failed: {e}")
+        sentiment, keyword_sev, freq, priority_idx = 0, 0, 0, 0
+
     conn = get_connection(DB_NAME)
     if conn is None:
         print("DB connection failed in save_grievance().")
-        return
+        return None
 
     cur = conn.cursor(dictionary=True)
+
+    # --- Insert into DB
+    try:
+        cur.execute(_GRIEVANCE_INSERT, (
+            user_id, username, grievance, issue, location,
+            photo_ref, additional_data, ai_reply,
+            sentiment, keyword_sev, freq, priority_idx, tracking_id
+        ))
+        grievance_id = cur.lastrowid
+        now = time.time()
+        _record_frequency(cur, issue, location, now)
+        _adjust_summary(cur, issue, location, "Pending",
+                        has_photo=photo_ref is not None, priority=priority_idx)
+        _record_history(cur, [(grievance_id, "created", None, "Pending")])
+        conn.commit()
+        frequency_tracker.record(issue, location, now)
+        print(f"Grievance {grievance_id} saved (priority={priority_idx:.3f})")
+        return grievance_id
+    except Error as e:
+        conn.rollback()
+        if e.errno == errorcode.ER_DUP_ENTRY and tracking_id:
+            # A retried submission that was already saved
+            cur.execute("SELECT id FROM grievances WHERE tracking_id = %s", (tracking_id,))
+            row = cur.fetchone()
+            if row:
+                print(f"Grievance {tracking_id} already saved as {row['id']}")
+                return row["id"]
+        print(f"Error saving grievance: {e}")
+        traceback.print_exc()
+        return None
+    finally:
+        cur.close()
+        conn.close()
+
+
+async def save_grievance(user_id, username, grievance,
+                         issue="General complaint", location="unknown",
+                         photo_file=None, additional_data=None, ai_reply="", tracking_id=None):
+    """
+    Saves grievance data with optional photo (media store) and AI-based priority metrics.
+    The photo download is awaited on the event loop; scoring and the INSERT run
+    on the DB executor. Returns the new grievance id, or None on failure.
+    """
     photo_blob = None
 
     # --- Handle photo
@@ -134,38 +536,143 @@ async def save_grievance(user_id, username, grievance,
             print(f"Failed to download photo: {e}")
             traceback.print_exc()
 
-    # --- Calculate Priority Index
-    try:
-        sentiment, keyword_sev, freq, priority_idx = calculate_priority_index(grievance, issue)
-    except Exception as e:
-        print(f"Priority index calculation failed: {e}")
-        sentiment, keyword_sev, freq, priority_idx = 0, 0, 0, 0
+    return await run_db(
+        _insert_grievance, user_id, username, grievance, issue, location,
+        photo_blob, additional_data, ai_reply, tracking_id
+    )
 
-    # --- Insert into DB
-    query = """
-        INSERT INTO grievances (
-            user_id, username, grievance, issue, location,
-            photo, additional_data, ai_reply,
-            sentiment_score, keyword_severity, frequency_score, priority_index, status
-        )
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'Pending')
+
+# --------------------------------------------------
+# 3b. Bulk Save (imports, ingest workers)
+# --------------------------------------------------
+SAVE_BATCH_CHUNK_SIZE = int(os.getenv("SAVE_BATCH_CHUNK_SIZE", "500"))
+
+
+def _insert_chunk(cur, rows, now):
+    """
+    Inserts prepared rows (tuples for _GRIEVANCE_INSERT) with one multi-row INSERT,
+    plus their frequency, summary and history rows, inside the caller's transaction.
+    Returns {tracking_id: grievance_id}.
+    """
+    cur.executemany(_GRIEVANCE_INSERT, rows)
+
+    freq, summary = {}, {}
+    b = bucket_start(now)
+    for row in rows:
+        issue, location, photo_ref, priority = row[3], row[4], row[5], row[11]
+        for k in (("issue", normalize_key("issue", issue), b), ("location", normalize_key("location", location), b)):
+            freq[k] = freq.get(k, 0) + 1
+        key = _summary_key(issue, location, "Pending")
+        total, photos, priority_sum = summary.get(key, (0, 0, 0.0))
+        summary[key] = (total + 1, photos + (photo_ref is not None), priority_sum + float(priority or 0))
+    cur.executemany(_FREQUENCY_UPSERT, [(*k, c) for k, c in freq.items()])
+    _maybe_prune_frequency(cur, now)
+    cur.executemany(_SUMMARY_UPSERT, [(*k, t, p, 0, ps) for k, (t, p, ps) in summary.items()])
+
+    # Read ids back by tracking_id (unique) rather than assuming lastrowid + n
+    tracking_ids = [row[12] for row in rows]
+    cur.execute(
+        f"SELECT id, tracking_id FROM grievances WHERE tracking_id IN ({', '.join(['%s'] * len(tracking_ids))})",
+        tracking_ids
+    )
+    saved = {tid: gid for gid, tid in cur.fetchall()}
+    _record_history(cur, [(gid, "created", None, "Pending") for gid in saved.values()])
+    return saved
+
+
+def save_grievances_batch(records, chunk_size=SAVE_BATCH_CHUNK_SIZE):
     """
+    Saves many grievances at once: photos go to the media store, texts are scored
+    in batches, rows are written with executemany in one transaction per chunk.
+
+    records: dicts with user_id, username, grievance, issue, location and optionally
+             photo (bytes) or photo_ref (already in the media store),
+             additional_data, ai_reply, tracking_id.
+    Returns (ids, errors): ids[i] is the new id of records[i] or None, and
+    errors maps the index of every failed record to its error message.
+    A failing chunk is retried row by row, so one bad row only fails itself.
+    Rows in the same batch don't count towards each other's frequency score.
+    """
+    ids = [None] * len(records)
+    errors = {}
+    if not records:
+        return ids, errors
+
+    load_frequency_counters()
+    prepared = []  # (index, row tuple)
+    for i, r in enumerate(records):
+        photo_ref = r.get("photo_ref")
+        if photo_ref is None and r.get("photo"):
+            try:
+                photo_ref = media_store.put(r["photo"])
+            except OSError as e:
+                print(f"Failed to store photo for batch row {i}: {e}")
+        prepared.append((i, [
+            r.get("user_id"), r.get("username"), r.get("grievance") or "",
+            r.get("issue") or "General complaint", r.get("location") or "unknown",
+            photo_ref, r.get("additional_data"), r.get("ai_reply") or "",
+            0, 0, 0, 0,
+            r.get("tracking_id") or f"B-{uuid.uuid4().hex[:20]}"
+        ]))
 
     try:
-        cur.execute(query, (
-            user_id, username, grievance, issue, location,
-            photo_blob, additional_data, ai_reply,
-            sentiment, keyword_sev, freq, priority_idx
-        ))
-        conn.commit()
-        print(f"Grievance {cur.lastrowid} saved (priority={priority_idx:.3f})")
-    except Error as e:
-        print(f"Error saving grievance: {e}")
-        traceback.print_exc()
+        scores = calculate_priority_indices([(row[2], row[3], row[4]) for _, row in prepared])
+    except Exception as e:
+        print(f"Batch priority calculation failed: {e}")
+        scores = [(0, 0, 0, 0)] * len(prepared)
+    for (_, row), (sentiment, keyword_sev, freq, priority_idx) in zip(prepared, scores):
+        row[8:12] = [sentiment, keyword_sev, freq, priority_idx]
+
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return ids, {i: "DB connection failed" for i in range(len(records))}
+    cur = conn.cursor()
+    try:
+        for start in range(0, len(prepared), chunk_size):
+            chunk = prepared[start:start + chunk_size]
+            now = time.time()
+            already_saved = set()  # tracking_ids stored by an earlier attempt
+            try:
+                saved = _insert_chunk(cur, [tuple(row) for _, row in chunk], now)
+                conn.commit()
+            except Error as e:
+                conn.rollback()
+                print(f"Batch chunk at {start} failed ({e}); retrying row by row.")
+                saved = {}
+                for i, row in chunk:
+                    try:
+                        saved.update(_insert_chunk(cur, [tuple(row)], now))
+                        conn.commit()
+                    except Error as row_error:
+                        conn.rollback()
+                        if row_error.errno == errorcode.ER_DUP_ENTRY:
+                            cur.execute("SELECT id, tracking_id FROM grievances WHERE tracking_id = %s", (row[12],))
+                            saved.update({tid: gid for gid, tid in cur.fetchall()})
+                            already_saved.add(row[12])
+                        if row[12] not in saved:
+                            errors[i] = str(row_error)
+            for i, row in chunk:
+                gid = saved.get(row[12])
+                if gid is not None:
+                    ids[i] = gid
+                    if row[12] not in already_saved:
+                        frequency_tracker.record(row[3], row[4], now)
+                elif i not in errors:
+                    errors[i] = "row not found after insert"
     finally:
         cur.close()
         conn.close()
 
+    print(f"Batch saved {len(records) - len(errors)}/{len(records)} grievances.")
+    return ids, errors
+
+
+async def save_grievances_batch_async(records, chunk_size=SAVE_BATCH_CHUNK_SIZE):
+    """
+    Non-blocking save_grievances_batch() (runs on the DB executor).
+    """
+    return await run_db(save_grievances_batch, records, chunk_size)
+
 
 # --------------------------------------------------
 # 4. Retrieve Grievance Status (for user)
@@ -176,7 +683,7 @@ def get_status(user_id):
         return []
     cur = conn.cursor(dictionary=True)
     query = """
-        SELECT id, grievance, issue, location, photo,
+        SELECT id, grievance, issue, location, photo_ref,
                additional_data, ai_reply, status,
                sentiment_score, keyword_severity,
                frequency_score, priority_index, created_at,
@@ -197,26 +704,203 @@ def get_status(user_id):
         conn.close()
 
 
+async def get_status_async(user_id):
+    """
+    Non-blocking get_status() for the bot handlers.
+    """
+    return await run_db(get_status, user_id)
+
+
+def get_status_page(user_id, before_id=None, after_id=None, limit=5):
+    """
+    One page of a user's grievances for /status, newest first, only the listed fields.
+    `before_id` pages to older rows, `after_id` back to newer ones (keyset on id,
+    so the cost doesn't grow with the user's history).
+    Returns (rows, older_cursor, newer_cursor); a cursor is None when there is no such page.
+    """
+    where, params = "user_id = %s", [user_id]
+    if after_id is not None:
+        where += " AND id > %s"
+        params.append(after_id)
+        order = "ASC"
+    else:
+        if before_id is not None:
+            where += " AND id < %s"
+            params.append(before_id)
+        order = "DESC"
+
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return [], None, None
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            f"SELECT id, issue, location, status, created_at FROM grievances "
+            f"WHERE {where} ORDER BY id {order} LIMIT %s",
+            params + [limit + 1]
+        )
+        rows = cur.fetchall()
+    except Error as e:
+        print(f"Error fetching status page: {e}")
+        return [], None, None
+    finally:
+        cur.close()
+        conn.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if after_id is not None:
+        rows.reverse()
+        has_newer, has_older = has_more, True
+    else:
+        has_newer, has_older = before_id is not None, has_more
+    if not rows:
+        return [], None, None
+    return rows, (rows[-1]["id"] if has_older else None), (rows[0]["id"] if has_newer else None)
+
+
+def get_grievance_detail(user_id, grievance_id):
+    """
+    One of the user's own grievances for `/status <id>`, or None.
+    """
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return None
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            """
+            SELECT id, grievance, issue, location, status, ai_reply, additional_data,
+                   priority_index, created_at, notified_to_dept, photo_ref IS NOT NULL AS has_photo
+            FROM grievances WHERE id = %s AND user_id = %s
+            """,
+            (grievance_id, user_id)
+        )
+        return cur.fetchone()
+    except Error as e:
+        print(f"Error fetching grievance {grievance_id}: {e}")
+        return None
+    finally:
+        cur.close()
+        conn.close()
+
+
+async def get_status_page_async(user_id, before_id=None, after_id=None, limit=5):
+    return await run_db(get_status_page, user_id, before_id, after_id, limit)
+
+
+async def get_grievance_detail_async(user_id, grievance_id):
+    return await run_db(get_grievance_detail, user_id, grievance_id)
+
+
 # --------------------------------------------------
 # 5. Update Grievance Status
 # --------------------------------------------------
-async def update_grievance_status(grievance_id, new_status):
+_SUMMARY_FIELDS = """
+    issue, location, status, (photo_ref IS NOT NULL OR photo IS NOT NULL) AS has_photo,
+    COALESCE(notified_to_dept, FALSE) AS notified_to_dept, priority_index
+"""
+_SUMMARY_ROW_FOR_UPDATE = f"SELECT {_SUMMARY_FIELDS} FROM grievances WHERE id = %s FOR UPDATE"
+
+
+def _move_summary(cur, row, **changes):
     """
-    Updates the status of a grievance.
+    Moves one grievance between summary rows: removes it as `row` was,
+    adds it back with `changes` applied.
+    """
+    new = {**row, **changes}
+    for sign, r in ((-1, row), (1, new)):
+        _adjust_summary(cur, r["issue"], r["location"], r["status"], sign,
+                        r["has_photo"], r["notified_to_dept"], r["priority_index"])
+
+
+def _move_summary_many(cur, rows, **changes):
+    """
+    _move_summary() for many grievances: deltas are netted per summary row
+    and written with one executemany.
+    """
+    deltas = {}
+    for row in rows:
+        for sign, r in ((-1, row), (1, {**row, **changes})):
+            key = _summary_key(r["issue"], r["location"], r["status"])
+            total, photos, notified, priority_sum = deltas.get(key, (0, 0, 0, 0.0))
+            deltas[key] = (
+                total + sign,
+                photos + sign * int(bool(r["has_photo"])),
+                notified + sign * int(bool(r["notified_to_dept"])),
+                priority_sum + sign * float(r["priority_index"] or 0),
+            )
+    cur.executemany(_SUMMARY_UPSERT, [(*k, *v) for k, v in deltas.items() if any(v)])
+
+
+def _change_grievances(ids, set_clause, set_params, needs_change, changes, action):
+    """
+    Shared body of the batch updates: locks the rows (in id order), applies one
+    UPDATE to those that `needs_change`, moves them in the summary and records
+    their history, all in a single transaction. `changes` holds the one changed
+    column. Returns the ids that changed, or None on failure.
     """
+    (column, value), = changes.items()
+    ids = sorted({int(i) for i in ids})
+    if not ids:
+        return []
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        print(f"DB connection failed in {action}.")
+        return None
+
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            f"SELECT id, {_SUMMARY_FIELDS} FROM grievances "
+            f"WHERE id IN ({', '.join(['%s'] * len(ids))}) ORDER BY id FOR UPDATE",
+            ids
+        )
+        rows = [r for r in cur.fetchall() if needs_change(r)]
+        changed = [r["id"] for r in rows]
+        if changed:
+            cur.execute(
+                f"UPDATE grievances SET {set_clause} WHERE id IN ({', '.join(['%s'] * len(changed))})",
+                list(set_params) + changed
+            )
+            _move_summary_many(cur, rows, **changes)
+            _record_history(cur, [(r["id"], column, r[column], value) for r in rows])
+        conn.commit()
+        print(f"{action}: {len(changed)} of {len(ids)} grievances changed.")
+        return changed
+    except Error as e:
+        conn.rollback()
+        print(f"Error in {action}: {e}")
+        return None
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _update_grievance_status(grievance_id, new_status):
     conn = get_connection(DB_NAME)
     if conn is None:
         print("DB connection failed in update_grievance_status().")
         return False
 
-    cur = conn.cursor()
-    query = "UPDATE grievances SET status = %s WHERE id = %s"
+    cur = conn.cursor(dictionary=True)
     try:
-        cur.execute(query, (new_status, grievance_id))
+        # Lock the row so the summary moves it from exactly the status it had
+        cur.execute(_SUMMARY_ROW_FOR_UPDATE, (grievance_id,))
+        row = cur.fetchone()
+        if row is None:
+            conn.rollback()
+            print(f"Grievance {grievance_id} not found.")
+            return False
+        if row["status"] != new_status:
+            cur.execute("UPDATE grievances SET status = %s WHERE id = %s", (new_status, grievance_id))
+            _move_summary(cur, row, status=new_status)
+            _record_history(cur, [(grievance_id, "status", row["status"], new_status)])
         conn.commit()
         print(f"Grievance {grievance_id} status updated to {new_status}")
         return True
     except Error as e:
+        conn.rollback()
         print(f"Error updating grievance status: {e}")
         return False
     finally:
@@ -224,29 +908,493 @@ async def update_grievance_status(grievance_id, new_status):
         conn.close()
 
 
+async def update_grievance_status(grievance_id, new_status):
+    """
+    Updates the status of a grievance.
+    """
+    return await run_db(_update_grievance_status, grievance_id, new_status)
+
+
+def _update_grievance_status_batch(grievance_ids, new_status):
+    return _change_grievances(
+        grievance_ids, "status = %s", [new_status],
+        lambda r: r["status"] != new_status, {"status": new_status},
+        f"update_grievance_status_batch({new_status})"
+    )
+
+
+async def update_grievance_status_batch(grievance_ids, new_status):
+    """
+    Sets `new_status` on many grievances with one UPDATE in one transaction.
+    Returns the ids whose status actually changed, or None on failure.
+    """
+    return await run_db(_update_grievance_status_batch, grievance_ids, new_status)
+
+
 # --------------------------------------------------
 # 6. Notify Department (Works for ALL Issue Types)
 # --------------------------------------------------
-async def notify_department(grievance_id):
-    """
-    Marks a grievance as notified to the relevant department.
-    Sets `notified_to_dept = TRUE`
-    """
+def _notify_department(grievance_id):
     conn = get_connection(DB_NAME)
     if conn is None:
         print("DB connection failed in notify_department().")
         return False
 
-    cur = conn.cursor()
-    query = "UPDATE grievances SET notified_to_dept = TRUE WHERE id = %s"
+    cur = conn.cursor(dictionary=True)
     try:
-        cur.execute(query, (grievance_id,))
+        cur.execute(_SUMMARY_ROW_FOR_UPDATE, (grievance_id,))
+        row = cur.fetchone()
+        if row is None:
+            conn.rollback()
+            print(f"Grievance {grievance_id} not found.")
+            return False
+        if not row["notified_to_dept"]:
+            cur.execute("UPDATE grievances SET notified_to_dept = TRUE WHERE id = %s", (grievance_id,))
+            _move_summary(cur, row, notified_to_dept=True)
+            _record_history(cur, [(grievance_id, "notified_to_dept", False, True)])
         conn.commit()
         print(f"Grievance {grievance_id} notified to department.")
         return True
     except Error as e:
+        conn.rollback()
         print(f"Error notifying department: {e}")
         return False
     finally:
         cur.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+async def notify_department(grievance_id):
+    """
+    Marks a grievance as notified to the relevant department.
+    Sets `notified_to_dept = TRUE`
+    """
+    return await run_db(_notify_department, grievance_id)
+
+
+def _notify_department_batch(grievance_ids):
+    return _change_grievances(
+        grievance_ids, "notified_to_dept = TRUE", [],
+        lambda r: not r["notified_to_dept"], {"notified_to_dept": True},
+        "notify_department_batch"
+    )
+
+
+async def notify_department_batch(grievance_ids):
+    """
+    Marks many grievances as notified with one UPDATE in one transaction.
+    Returns the ids that weren't notified before, or None on failure.
+    """
+    return await run_db(_notify_department_batch, grievance_ids)
+
+
+# --------------------------------------------------
+# 7. Migration: move photo BLOBs into the media store
+# --------------------------------------------------
+def migrate_photos_to_media_store(batch_size=100):
+    """
+    Moves existing `photo` BLOBs into the media store, sets `photo_ref` and clears
+    the BLOB. Resumable: only rows that still hold a BLOB are processed.
+    Run from bot/: python -c "from database import migrate_photos_to_media_store as m; m()"
+    """
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        print("DB connection failed in migrate_photos_to_media_store().")
+        return 0
+
+    cur = conn.cursor()
+    migrated = 0
+    last_id = 0
+    try:
+        while True:
+            cur.execute(
+                "SELECT id, photo FROM grievances WHERE id > %s AND photo IS NOT NULL ORDER BY id LIMIT %s",
+                (last_id, batch_size)
+            )
+            rows = cur.fetchall()
+            if not rows:
+                break
+            updates = [(media_store.put(bytes(photo)), gid) for gid, photo in rows]
+            cur.executemany("UPDATE grievances SET photo_ref = %s, photo = NULL WHERE id = %s", updates)
+            conn.commit()
+            migrated += len(rows)
+            last_id = rows[-1][0]
+            print(f"Migrated {migrated} photos (up to id {last_id})")
+    except Error as e:
+        print(f"Photo migration error: {e}")
+        traceback.print_exc()
+    finally:
+        cur.close()
+        conn.close()
+
+    print(f"Photo migration finished: {migrated} rows. Run OPTIMIZE TABLE grievances to reclaim space.")
+    return migrated
+
+
+# --------------------------------------------------
+# 8. Dashboard Query Layer (column-projected, keyset-paginated)
+# --------------------------------------------------
+# Columns shown on a dashboard grievance card (no photo bytes)
+CARD_COLUMNS = (
+    "id", "username", "grievance", "issue", "location", "photo_ref", "ai_reply",
+    "status", "priority_index", "created_at", "notified_to_dept"
+)
+# Columns needed for analytics (no free text)
+ANALYTICS_COLUMNS = (
+    "id", "username", "issue", "location", "status", "photo_ref",
+    "sentiment_score", "keyword_severity", "frequency_score", "priority_index",
+    "created_at", "notified_to_dept"
+)
+_SELECTABLE_COLUMNS = {
+    "id", "user_id", "username", "grievance", "issue", "location", "photo_ref",
+    "additional_data", "ai_reply", "sentiment_score", "keyword_severity",
+    "frequency_score", "priority_index", "status", "created_at", "notified_to_dept",
+    "tracking_id", "updated_at"
+}
+_FILTER_COLUMNS = {"issue": "issue", "status": "status", "location": "location"}
+
+
+def _select_list(columns):
+    unknown = set(columns) - _SELECTABLE_COLUMNS
+    if unknown:
+        raise ValueError(f"Unknown grievance columns: {sorted(unknown)}")
+    return ", ".join(f"`{c}`" for c in columns)
+
+
+def build_filter_clause(filters=None):
+    """
+    Turns dashboard filters into a SQL WHERE fragment + params.
+    filters: {"issue": [...], "status": [...], "location": [...],
+              "created_from": datetime, "created_to": datetime}
+    Empty lists mean "no filter" (same as the sidebar multiselects).
+    """
+    clauses, params = [], []
+    for key, column in _FILTER_COLUMNS.items():
+        values = list((filters or {}).get(key) or [])
+        if values:
+            clauses.append(f"{column} IN ({', '.join(['%s'] * len(values))})")
+            params.extend(values)
+    if (filters or {}).get("created_from"):
+        clauses.append("created_at >= %s")
+        params.append(filters["created_from"])
+    if (filters or {}).get("created_to"):
+        clauses.append("created_at < %s")
+        params.append(filters["created_to"])
+    return (" AND ".join(clauses) or "1=1"), params
+
+
+def fetch_grievances_page(filters=None, after=None, limit=10, columns=CARD_COLUMNS):
+    """
+    Returns (rows, next_cursor) for one page ordered by newest first.
+    `after` is the cursor of the previous page: (created_at, id) of its last row.
+    Keyset pagination keeps every page O(limit) however deep you go.
+    next_cursor is None on the last page.
+    """
+    columns = tuple(columns)
+    select_cols = columns + tuple(c for c in ("created_at", "id") if c not in columns)
+    where, params = build_filter_clause(filters)
+    if after is not None:
+        where += " AND (created_at < %s OR (created_at = %s AND id < %s))"
+        params += [after[0], after[0], after[1]]
+
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return [], None
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            f"SELECT {_select_list(select_cols)} FROM grievances WHERE {where} "
+            f"ORDER BY created_at DESC, id DESC LIMIT %s",
+            params + [limit + 1]
+        )
+        rows = cur.fetchall()
+    except Error as e:
+        print(f"Error fetching grievances page: {e}")
+        return [], None
+    finally:
+        cur.close()
+        conn.close()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1]["created_at"], rows[-1]["id"])
+    return rows, next_cursor
+
+
+def iter_grievances(filters=None, columns=ANALYTICS_COLUMNS, page_size=5000):
+    """
+    Yields grievances matching `filters` newest first, one keyset page in memory
+    at a time (reports, exports). No connection is held between pages.
+    """
+    cursor = None
+    while True:
+        page, cursor = fetch_grievances_page(filters, cursor, page_size, columns)
+        yield from page
+        if cursor is None:
+            return
+
+
+def fetch_grievances(filters=None, columns=ANALYTICS_COLUMNS, page_size=5000):
+    """
+    Fetches all grievances matching `filters`, projected to `columns`,
+    page by page with the keyset cursor.
+    """
+    return list(iter_grievances(filters, columns, page_size))
+
+
+def count_grievances(filters=None):
+    where, params = build_filter_clause(filters)
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return 0
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT COUNT(*) FROM grievances WHERE {where}", params)
+        return cur.fetchone()[0]
+    except Error as e:
+        print(f"Error counting grievances: {e}")
+        return 0
+    finally:
+        cur.close()
+        conn.close()
+
+
+def fetch_data_version():
+    """
+    A string that changes whenever a grievance is inserted or updated
+    (MAX(updated_at), MAX(id): two index lookups). None if the DB is unreachable.
+    """
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return None
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT MAX(updated_at), MAX(id) FROM grievances")
+        updated_at, max_id = cur.fetchone()
+        return f"{updated_at}/{max_id}"
+    except Error as e:
+        print(f"Error reading data version: {e}")
+        return None
+    finally:
+        cur.close()
+        conn.close()
+
+
+def fetch_grievance_ids(filters=None, notified=None, limit=5000):
+    """
+    Ids of grievances matching `filters` (optionally only (not) notified ones),
+    for the dashboard's bulk actions.
+    """
+    where, params = build_filter_clause(filters)
+    if notified is not None:
+        where += " AND COALESCE(notified_to_dept, FALSE) = %s"
+        params.append(bool(notified))
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return []
+    cur = conn.cursor()
+    try:
+        cur.execute(f"SELECT id FROM grievances WHERE {where} ORDER BY id LIMIT %s", params + [limit])
+        return [r[0] for r in cur.fetchall()]
+    except Error as e:
+        print(f"Error fetching grievance ids: {e}")
+        return []
+    finally:
+        cur.close()
+        conn.close()
+
+
+def fetch_grievances_by_ids(ids, columns=CARD_COLUMNS):
+    """
+    Re-reads specific grievances (e.g. right after the dashboard changed them).
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return []
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            f"SELECT {_select_list(columns)} FROM grievances WHERE id IN ({', '.join(['%s'] * len(ids))})",
+            ids
+        )
+        return cur.fetchall()
+    except Error as e:
+        print(f"Error fetching grievances by id: {e}")
+        return []
+    finally:
+        cur.close()
+        conn.close()
+
+
+def fetch_grievances_updated_since(updated_after=None, after_id=0, filters=None,
+                                   columns=CARD_COLUMNS, limit=500, settle_seconds=None):
+    """
+    Grievances matching `filters` changed after (updated_after, after_id), oldest
+    change first: a keyset on idx_grievances_updated. Pass the last row's
+    (updated_at, id) to continue. With `settle_seconds`, rows changed more
+    recently than that are left for the next call (see CHANGE_FEED_SETTLE_SECONDS).
+    """
+    columns = tuple(columns)
+    select_cols = columns + tuple(c for c in ("updated_at", "id") if c not in columns)
+    where, params = build_filter_clause(filters)
+    keyset, keyset_params = "TRUE", []
+    if updated_after is not None:
+        keyset = "(updated_at > %s OR (updated_at = %s AND id > %s))"
+        keyset_params = [updated_after, updated_after, after_id]
+    if settle_seconds is not None:
+        keyset += " AND updated_at < NOW(6) - INTERVAL %s SECOND"
+        keyset_params.append(settle_seconds)
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return []
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            f"SELECT {_select_list(select_cols)} FROM grievances WHERE {keyset} AND {where} "
+            f"ORDER BY updated_at, id LIMIT %s",
+            keyset_params + params + [limit]
+        )
+        return cur.fetchall()
+    except Error as e:
+        print(f"Error fetching updated grievances: {e}")
+        return []
+    finally:
+        cur.close()
+        conn.close()
+
+
+def fetch_filter_options():
+    """
+    Distinct values for the sidebar filters: {"issue": [...], "status": [...], "location": [...]}.
+    Read from grievance_summary, which has one row per combination.
+    """
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return {key: [] for key in _FILTER_COLUMNS}
+    cur = conn.cursor()
+    try:
+        options = {}
+        for key, column in _FILTER_COLUMNS.items():
+            cur.execute(f"SELECT DISTINCT {column} FROM grievance_summary WHERE total > 0 ORDER BY {column}")
+            options[key] = [r[0] for r in cur.fetchall()]
+        return options
+    except Error as e:
+        print(f"Error fetching filter options: {e}")
+        return {key: [] for key in _FILTER_COLUMNS}
+    finally:
+        cur.close()
+        conn.close()
+
+
+# --------------------------------------------------
+# 9. Dashboard Aggregates (served from grievance_summary)
+# --------------------------------------------------
+_EMPTY_METRICS = {"total": 0, "pending": 0, "with_photo": 0, "notified": 0,
+                  "locations": 0, "avg_priority": 0.0}
+
+
+def _summary_filter_clause(filters):
+    # The summary has no timestamps; only the issue/status/location filters apply
+    where, params = build_filter_clause(
+        {k: v for k, v in (filters or {}).items() if k in _FILTER_COLUMNS}
+    )
+    return f"total > 0 AND {where}", params
+
+
+def fetch_summary_metrics(filters=None):
+    """
+    Headline numbers: {"total", "pending", "with_photo", "notified", "locations", "avg_priority"}.
+    """
+    where, params = _summary_filter_clause(filters)
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return dict(_EMPTY_METRICS)
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            f"""
+            SELECT COALESCE(SUM(total), 0) AS total,
+                   COALESCE(SUM(CASE WHEN status = 'Pending' THEN total END), 0) AS pending,
+                   COALESCE(SUM(with_photo), 0) AS with_photo,
+                   COALESCE(SUM(notified), 0) AS notified,
+                   COUNT(DISTINCT location) AS locations,
+                   COALESCE(SUM(priority_sum) / NULLIF(SUM(total), 0), 0) AS avg_priority
+            FROM grievance_summary WHERE {where}
+            """,
+            params
+        )
+        row = cur.fetchone()
+        return {
+            "total": int(row["total"]), "pending": int(row["pending"]),
+            "with_photo": int(row["with_photo"]), "notified": int(row["notified"]),
+            "locations": int(row["locations"]), "avg_priority": float(row["avg_priority"]),
+        }
+    except Error as e:
+        print(f"Error fetching summary metrics: {e}")
+        return dict(_EMPTY_METRICS)
+    finally:
+        cur.close()
+        conn.close()
+
+
+def fetch_counts_by(dimension, filters=None, limit=None):
+    """
+    [(value, count), ...] grouped by "issue", "location" or "status", largest first.
+    """
+    column = _FILTER_COLUMNS.get(dimension)
+    if column is None:
+        raise ValueError(f"Unknown summary dimension: {dimension!r}")
+    where, params = _summary_filter_clause(filters)
+    query = (f"SELECT {column}, SUM(total) AS cnt FROM grievance_summary WHERE {where} "
+             f"GROUP BY {column} ORDER BY cnt DESC, {column}")
+    if limit:
+        query += " LIMIT %s"
+        params.append(limit)
+
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return []
+    cur = conn.cursor()
+    try:
+        cur.execute(query, params)
+        return [(value, int(cnt)) for value, cnt in cur.fetchall()]
+    except Error as e:
+        print(f"Error fetching counts by {dimension}: {e}")
+        return []
+    finally:
+        cur.close()
+        conn.close()
+
+
+PRIORITY_COLUMNS = (
+    "id", "username", "issue", "location", "status",
+    "priority_index", "sentiment_score", "keyword_severity", "frequency_score"
+)
+
+
+def fetch_top_priority(filters=None, limit=10, columns=PRIORITY_COLUMNS):
+    """
+    The `limit` highest-priority grievances matching `filters`.
+    """
+    where, params = build_filter_clause(filters)
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return []
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            f"SELECT {_select_list(columns)} FROM grievances WHERE {where} "
+            f"ORDER BY priority_index DESC, id DESC LIMIT %s",
+            params + [limit]
+        )
+        return cur.fetchall()
+    except Error as e:
+        print(f"Error fetching top priority grievances: {e}")
+        return []
+    finally:
+        cur.close()
+        conn.close()
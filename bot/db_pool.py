@@ -0,0 +1,195 @@
+# ==========================================
+# bot/db_pool.py — Shared MySQL Connection Pool (Bot + Dashboard)
+# ==========================================
+
+import threading
+import time
+from collections import deque
+
+import mysql.connector
+from mysql.connector import Error
+
+
+class PoolTimeoutError(Error):
+    """Raised when no pooled connection becomes free within the checkout timeout."""
+
+
+# --------------------------------------------------
+# 1. Pooled Connection Wrapper
+# --------------------------------------------------
+class PooledConnection:
+    """
+    Thin proxy around a mysql.connector connection.
+    `close()` hands the connection back to its pool instead of disconnecting,
+    so existing `conn.close()` calls keep working unchanged.
+    """
+
+    def __init__(self, pool, raw_conn, created_at):
+        self._pool = pool
+        self._raw = raw_conn
+        self._created_at = created_at
+        self._returned = False
+
+    def close(self):
+        if not self._returned:
+            self._returned = True
+            self._pool._release(self._raw, self._created_at)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# --------------------------------------------------
+# 2. Connection Pool
+# --------------------------------------------------
+class ConnectionPool:
+    """
+    Fixed-size, thread-safe MySQL connection pool.
+
+    - Connections are opened lazily, up to `size`.
+    - Each checkout pings the connection (health check) and replaces it if dead.
+    - Connections older than `recycle_seconds` are closed and reopened.
+    - Checkouts block up to `timeout` seconds when the pool is exhausted.
+    """
+
+    def __init__(self, size=5, timeout=10.0, recycle_seconds=1800, **connect_kwargs):
+        self.size = max(1, int(size))
+        self.timeout = float(timeout)
+        self.recycle_seconds = float(recycle_seconds)
+        self._connect_kwargs = connect_kwargs
+
+        self._idle = deque()  # (raw_conn, created_at)
+        self._open_count = 0
+        self._cond = threading.Condition()
+        self._closed_at = None  # connections opened before this are closed on return
+
+        self._stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "created": 0,
+            "recycled": 0,
+            "health_check_failures": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    # ---- internal helpers
+    def _open(self):
+        raw = mysql.connector.connect(**self._connect_kwargs)
+        with self._cond:
+            self._stats["created"] += 1
+        return raw, time.monotonic()
+
+    @staticmethod
+    def _discard(raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _count(self, stat):
+        with self._cond:
+            self._stats[stat] += 1
+
+    def _is_healthy(self, raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    # ---- public API
+    def get_connection(self):
+        """Borrows a connection; call `.close()` on it to return it to the pool."""
+        start = time.monotonic()
+        deadline = start + self.timeout
+
+        with self._cond:
+            while not self._idle and self._open_count >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        msg=f"No free connection in pool after {self.timeout:.1f}s (size={self.size})"
+                    )
+                self._cond.wait(remaining)
+
+            if self._idle:
+                raw, created_at = self._idle.popleft()
+            else:
+                raw, created_at = None, None
+                self._open_count += 1
+
+        try:
+            if raw is not None and time.monotonic() - created_at > self.recycle_seconds:
+                self._discard(raw)
+                self._count("recycled")
+                raw = None
+            if raw is not None and not self._is_healthy(raw):
+                self._discard(raw)
+                self._count("health_check_failures")
+                raw = None
+            if raw is None:
+                raw, created_at = self._open()
+        except Exception:
+            with self._cond:
+                self._open_count -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_total"] += waited
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+
+        return PooledConnection(self, raw, created_at)
+
+    def _release(self, raw, created_at):
+        # Never hand back a connection with an open transaction to the next borrower
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+            reusable = True
+        except Exception:
+            reusable = False
+
+        with self._cond:
+            if reusable and (self._closed_at is None or created_at > self._closed_at):
+                self._idle.append((raw, created_at))
+                self._cond.notify()
+                return
+            self._open_count -= 1
+            self._cond.notify()
+        self._discard(raw)
+
+    def close_all(self):
+        """
+        Closes every idle connection. Borrowed ones are closed when returned;
+        the pool opens fresh connections for later checkouts.
+        """
+        with self._cond:
+            self._closed_at = time.monotonic()
+            while self._idle:
+                raw, _ = self._idle.popleft()
+                self._discard(raw)
+                self._open_count -= 1
+            self._cond.notify_all()
+
+    def stats(self):
+        """Returns a snapshot of pool usage and wait statistics."""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot["size"] = self.size
+            snapshot["open"] = self._open_count
+            snapshot["idle"] = len(self._idle)
+            snapshot["in_use"] = self._open_count - len(self._idle)
+        checkouts = snapshot["checkouts"]
+        snapshot["wait_time_avg"] = snapshot["wait_time_total"] / checkouts if checkouts else 0.0
+        return snapshot
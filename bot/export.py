@@ -0,0 +1,257 @@
+# ==========================================
+# bot/export.py — Columnar Export for Analysts (Parquet / gzip CSV)
+# ==========================================
+# Streams grievances out of MySQL in keyset chunks ordered by (updated_at, id),
+# so memory stays bounded over the full table. The photo BLOB is never read;
+# photo_ref (the media-store hash) is exported instead.
+#
+#   parquet : each run writes a new part file into the output directory, one
+#             row group per chunk (read the directory as one dataset)
+#   csv     : each run appends a gzip member to <name>.csv.gz
+#
+# A watermark file next to the output records the (updated_at, id) of the last
+# exported row, so the next run appends only rows inserted or changed since.
+# A grievance that changed after it was exported appears again with a newer
+# updated_at: keep the latest row per id. Filters apply to the row as it is
+# now, so a row that stops matching (e.g. --status Pending, then resolved) is
+# simply not exported again: the earlier copy stays. Use --full to rebuild.
+#
+#   python export.py --format parquet
+#   python export.py --format csv --from 2025-01-01 --issue "Fire Hazards" --status Pending
+#   python export.py --format parquet --full      # ignore the watermark, replace old parts
+
+import argparse
+import csv
+import gzip
+import json
+import os
+import re
+import shutil
+import sys
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from database import fetch_grievances_updated_since, CHANGE_FEED_SETTLE_SECONDS
+
+_BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+EXPORT_DIR = os.getenv("EXPORT_DIR", os.path.join(_BOT_DIR, "exports"))
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "20000"))
+
+# Everything except the photo BLOB
+EXPORT_COLUMNS = (
+    "id", "tracking_id", "user_id", "username", "grievance", "issue", "location",
+    "photo_ref", "additional_data", "ai_reply", "sentiment_score", "keyword_severity",
+    "frequency_score", "priority_index", "status", "notified_to_dept", "created_at", "updated_at",
+)
+
+
+# --------------------------------------------------
+# 1. Streaming Source
+# --------------------------------------------------
+def iter_chunks(filters, watermark=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Yields lists of rows changed after `watermark` ({"updated_at", "id"}),
+    oldest change first, `chunk_rows` at a time.
+    """
+    updated_after = watermark["updated_at"] if watermark else None
+    after_id = watermark["id"] if watermark else 0
+    while True:
+        rows = fetch_grievances_updated_since(
+            updated_after, after_id, filters, EXPORT_COLUMNS, chunk_rows, CHANGE_FEED_SETTLE_SECONDS
+        )
+        if not rows:
+            return
+        for r in rows:
+            r["notified_to_dept"] = None if r["notified_to_dept"] is None else bool(r["notified_to_dept"])
+        yield rows
+        if len(rows) < chunk_rows:
+            return
+        updated_after, after_id = rows[-1]["updated_at"], rows[-1]["id"]
+
+
+# --------------------------------------------------
+# 2. Writers (to a temp file; published only when the run completes)
+# --------------------------------------------------
+def _parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()), ("tracking_id", pa.string()), ("user_id", pa.int64()),
+        ("username", pa.string()), ("grievance", pa.string()), ("issue", pa.string()),
+        ("location", pa.string()), ("photo_ref", pa.string()), ("additional_data", pa.string()),
+        ("ai_reply", pa.string()), ("sentiment_score", pa.float64()), ("keyword_severity", pa.float64()),
+        ("frequency_score", pa.float64()), ("priority_index", pa.float64()), ("status", pa.string()),
+        ("notified_to_dept", pa.bool_()), ("created_at", pa.timestamp("us")), ("updated_at", pa.timestamp("us")),
+    ])
+
+
+def _write_parquet(chunks, tmp_path):
+    """One row group per chunk. Returns (rows written, last row)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema()
+    written, last = 0, None
+    with pq.ParquetWriter(tmp_path, schema, compression="snappy") as writer:
+        for rows in chunks:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            written += len(rows)
+            last = rows[-1]
+    return written, last
+
+
+def _write_csv(chunks, tmp_path, header):
+    """A standalone gzip member (appendable to the main .csv.gz). Returns (rows written, last row)."""
+    written, last = 0, None
+    with gzip.open(tmp_path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_COLUMNS)
+        if header:
+            writer.writeheader()
+        for rows in chunks:
+            writer.writerows(rows)
+            written += len(rows)
+            last = rows[-1]
+    return written, last
+
+
+# --------------------------------------------------
+# 3. Watermark / previous outputs
+# --------------------------------------------------
+def _watermark_path(out_dir, name, fmt):
+    return os.path.join(out_dir, f"{name}.{fmt}.watermark.json")
+
+
+def _parquet_parts(out_dir, name):
+    """Part files written for `name` (not those of another name sharing its prefix)."""
+    pattern = re.compile(rf"{re.escape(name)}-\d{{8}}T\d{{6}}-[0-9a-f]{{6}}\.parquet")
+    return [os.path.join(out_dir, f) for f in os.listdir(out_dir) if pattern.fullmatch(f)]
+
+
+def _remove_previous_outputs(out_dir, name, fmt, keep=None):
+    """After a --full run: drops what earlier runs wrote, except `keep`."""
+    if fmt == "parquet":
+        stale = [p for p in _parquet_parts(out_dir, name) if p != keep]
+    else:
+        stale = [p for p in [os.path.join(out_dir, f"{name}.csv.gz")] if p != keep and os.path.exists(p)]
+    for path in stale:
+        os.remove(path)
+    if stale:
+        print(f"Removed {len(stale)} file(s) from earlier exports.")
+
+
+def load_watermark(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            watermark = json.load(f)
+    except (OSError, ValueError):
+        return None
+    watermark["updated_at"] = datetime.fromisoformat(watermark["updated_at"])
+    return watermark
+
+
+def save_watermark(path, watermark):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(watermark, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+# --------------------------------------------------
+# 4. Export
+# --------------------------------------------------
+def export(fmt="parquet", out_dir=EXPORT_DIR, name="grievances", filters=None,
+           full=False, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Exports grievances matching `filters` that changed since the last run.
+    Returns the number of rows written, or None if the export can't continue
+    with the existing watermark (different filters).
+    """
+    filters = {k: (sorted(v) if isinstance(v, list) else v) for k, v in (filters or {}).items() if v}
+    os.makedirs(out_dir, exist_ok=True)
+    watermark_path = _watermark_path(out_dir, name, fmt)
+    watermark = None if full else load_watermark(watermark_path)
+    filters_key = json.dumps(filters, sort_keys=True, default=str)
+    if watermark and watermark.get("filters") != filters_key:
+        print(f"{watermark_path} was written with other filters ({watermark.get('filters')}); "
+              f"use another --name, or --full to start over.")
+        return None
+
+    chunks = iter_chunks(filters, watermark, chunk_rows)
+    tmp_path = os.path.join(out_dir, f".{name}-{uuid.uuid4().hex}.tmp")
+    try:
+        if fmt == "parquet":
+            written, last = _write_parquet(chunks, tmp_path)
+            target = os.path.join(out_dir, f"{name}-{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}.parquet")
+            if written:
+                os.replace(tmp_path, target)
+        else:
+            target = os.path.join(out_dir, f"{name}.csv.gz")
+            append = not full and os.path.exists(target)
+            written, last = _write_csv(chunks, tmp_path, header=not append)
+            if written and not append:
+                os.replace(tmp_path, target)
+            elif written:
+                # Concatenated gzip members read back as one CSV
+                with open(tmp_path, "rb") as src, open(target, "ab") as dst:
+                    shutil.copyfileobj(src, dst)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    if full:
+        # The new output holds everything, so the earlier ones would only duplicate it
+        _remove_previous_outputs(out_dir, name, fmt, keep=target if written else None)
+    if not written:
+        if full and os.path.exists(watermark_path):
+            os.remove(watermark_path)
+        print("Nothing new to export.")
+        return 0
+    save_watermark(watermark_path, {
+        "updated_at": last["updated_at"].isoformat(),
+        "id": last["id"],
+        "filters": filters_key,
+        "rows_total": (watermark or {}).get("rows_total", 0) + written,
+        "last_run": datetime.now().isoformat(timespec="seconds"),
+    })
+    print(f"Exported {written} grievances → {target}")
+    return written
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Export grievances to Parquet or gzip CSV")
+    parser.add_argument("--format", choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--out", default=EXPORT_DIR, help="output directory")
+    parser.add_argument("--name", default="grievances", help="file name prefix (one watermark per name)")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="created on or after (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="created on or before (YYYY-MM-DD)")
+    parser.add_argument("--issue", action="append", default=[])
+    parser.add_argument("--status", action="append", default=[])
+    parser.add_argument("--full", action="store_true", help="ignore the watermark, export everything and replace earlier outputs")
+    parser.add_argument("--chunk-rows", type=int, default=EXPORT_CHUNK_ROWS, help="rows per read / row group")
+    args = parser.parse_args()
+
+    filters = {"issue": args.issue, "status": args.status}
+    if args.start:
+        filters["created_from"] = datetime.combine(args.start, time.min)
+    if args.end:
+        filters["created_to"] = datetime.combine(args.end + timedelta(days=1), time.min)
+
+    if args.format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("Parquet export needs pyarrow (pip install -r requirements.txt), or use --format csv.")
+            return 1
+
+    written = export(args.format, args.out, args.name, filters, args.full, args.chunk_rows)
+    return 1 if written is None else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# ==========================================
+# bot/frequency_counter.py — Rolling Per-Issue / Per-Location Counts (No DB Import)
+# ==========================================
+# Counts are kept in fixed time buckets (hourly by default). Each sliding window
+# keeps a running total that is adjusted as buckets enter and leave it, so both
+# recording a grievance and reading a count are amortized O(1). Keys nobody
+# reads or writes any more (one-off free-text locations) are swept out once per
+# bucket, so memory follows the number of keys seen within the window.
+# database.py persists the buckets and feeds them back in on startup.
+
+import os
+import re
+import threading
+import time
+from collections import deque
+
+FREQUENCY_BUCKET_SECONDS = int(os.getenv("FREQUENCY_BUCKET_SECONDS", "3600"))
+FREQUENCY_WINDOWS = {"24h": 24 * 3600, "7d": 7 * 24 * 3600}
+
+# Window used for scoring, and the count at which each component reaches 0.5
+FREQUENCY_SCORE_WINDOW = os.getenv("FREQUENCY_SCORE_WINDOW", "24h")
+FREQUENCY_ISSUE_HALF = float(os.getenv("FREQUENCY_ISSUE_HALF", "10"))
+FREQUENCY_LOCATION_HALF = float(os.getenv("FREQUENCY_LOCATION_HALF", "3"))
+
+SCOPES = ("issue", "location")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_key(scope: str, value) -> str:
+    """
+    Locations are free text; fold case and whitespace so "MG Road" == "mg  road".
+    """
+    value = _WHITESPACE.sub(" ", str(value or "unknown")).strip()
+    if scope == "location":
+        value = value.casefold()
+    return value[:255]
+
+
+def bucket_start(ts: float, bucket_seconds=FREQUENCY_BUCKET_SECONDS) -> int:
+    return int(ts) // bucket_seconds * bucket_seconds
+
+
+# --------------------------------------------------
+# 1. Sliding-Window Counter
+# --------------------------------------------------
+class RollingCounter:
+    """
+    Per-key counts over one sliding window made of fixed-size buckets.
+    """
+
+    def __init__(self, window_seconds, bucket_seconds=FREQUENCY_BUCKET_SECONDS):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self._buckets = {}  # key -> deque([[bucket_start, count], ...]) oldest first
+        self._totals = {}   # key -> running total inside the window
+
+    def _expire(self, key, now):
+        buckets = self._buckets.get(key)
+        if not buckets:
+            return
+        oldest_allowed = bucket_start(now, self.bucket_seconds) - self.window_seconds + self.bucket_seconds
+        while buckets and buckets[0][0] < oldest_allowed:
+            self._totals[key] -= buckets.popleft()[1]
+        if not buckets:
+            del self._buckets[key]
+            del self._totals[key]
+
+    def add(self, key, ts, n=1):
+        b = bucket_start(ts, self.bucket_seconds)
+        buckets = self._buckets.setdefault(key, deque())
+        self._totals[key] = self._totals.get(key, 0) + n
+        if buckets and buckets[-1][0] == b:
+            buckets[-1][1] += n
+        elif not buckets or buckets[-1][0] < b:
+            buckets.append([b, n])
+        else:
+            # Out-of-order bucket (only during loading): insert in place
+            for i, entry in enumerate(buckets):
+                if entry[0] == b:
+                    entry[1] += n
+                    break
+                if entry[0] > b:
+                    buckets.insert(i, [b, n])
+                    break
+        self._expire(key, max(ts, time.time()))
+
+    def count(self, key, now=None):
+        self._expire(key, now or time.time())
+        return self._totals.get(key, 0)
+
+    def sweep(self, now=None):
+        """Expires every key, dropping those with no bucket left in the window."""
+        now = now or time.time()
+        for key in list(self._buckets):
+            self._expire(key, now)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+# --------------------------------------------------
+# 2. Tracker (all scopes x all windows)
+# --------------------------------------------------
+class FrequencyTracker:
+    """
+    Rolling counts per issue and per location for every window in FREQUENCY_WINDOWS.
+    """
+
+    def __init__(self, windows=FREQUENCY_WINDOWS, bucket_seconds=FREQUENCY_BUCKET_SECONDS):
+        self.windows = dict(windows)
+        self.bucket_seconds = bucket_seconds
+        self._counters = {
+            (scope, name): RollingCounter(seconds, bucket_seconds)
+            for scope in SCOPES for name, seconds in self.windows.items()
+        }
+        self._lock = threading.Lock()
+        self._swept_at = time.time()
+        self.loaded = False
+
+    def record(self, issue, location, ts=None, n=1):
+        """Counts one grievance (call after it has been persisted)."""
+        ts = ts or time.time()
+        with self._lock:
+            for (scope, _), counter in self._counters.items():
+                counter.add(normalize_key(scope, issue if scope == "issue" else location), ts, n)
+            if time.time() - self._swept_at >= self.bucket_seconds:
+                self._sweep()
+
+    def _sweep(self, now=None):
+        self._swept_at = time.time()
+        for counter in self._counters.values():
+            counter.sweep(now)
+
+    def sweep(self, now=None):
+        """Drops keys whose newest bucket has left every window."""
+        with self._lock:
+            self._sweep(now)
+
+    def load(self, rows):
+        """
+        Seeds the counters from persisted buckets: iterable of (scope, key, bucket_start, count).
+        """
+        with self._lock:
+            for scope, key, start, count in rows:
+                for (s, _), counter in self._counters.items():
+                    if s == scope:
+                        counter.add(normalize_key(scope, key), start, count)
+            self.loaded = True
+
+    def count(self, scope, value, window=FREQUENCY_SCORE_WINDOW):
+        with self._lock:
+            return self._counters[(scope, window)].count(normalize_key(scope, value))
+
+    def score(self, issue, location=None):
+        """
+        Frequency score in [0, 1): saturating blend of recent issue and location counts.
+        """
+        issue_count = self.count("issue", issue)
+        issue_part = issue_count / (issue_count + FREQUENCY_ISSUE_HALF)
+        if location is None or normalize_key("location", location) == "unknown":
+            return round(issue_part, 3)
+        location_count = self.count("location", location)
+        location_part = location_count / (location_count + FREQUENCY_LOCATION_HALF)
+        return round(0.6 * issue_part + 0.4 * location_part, 3)
+
+
+# Process-wide tracker read by priority_index and fed by database.py
+tracker = FrequencyTracker()
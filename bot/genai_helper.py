@@ -3,8 +3,11 @@
 import os
 import re
 import json
+import asyncio
+import sqlite3
 import google.generativeai as genai
 from issue_config import ISSUE_CONFIG # Import the issue configuration
+from llm_cache import get_cache
 
 # Configure Gemini API key
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
@@ -13,14 +16,106 @@ genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 VALID_ISSUES = list(ISSUE_CONFIG.keys())
 ISSUE_LIST_STRING = ", ".join(VALID_ISSUES)
 
-# --- 1️⃣ Extract issue and location ---
-def extract_issue_and_location(grievance_text: str):
+GEMINI_MODEL_NAME = "gemini-2.5-flash"
+
+# Async call limits (bot event loop)
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "15"))
+
+# One structured call for issue + location + reply (set to 0 for the two-call path)
+GEMINI_COMBINED_CALL = os.getenv("GEMINI_COMBINED_CALL", "1") == "1"
+
+# Canned fallbacks used whenever Gemini fails or times out
+FALLBACK_CLASSIFICATION = {"issue": "Other Civic Complaints", "location": "unknown"}
+FALLBACK_REPLY = "Thank you for reporting your issue. Our team will look into it soon."
+
+REPLY_SYSTEM_PROMPT = (
+    "You are a polite and empathetic AI assistant working for the municipal grievance redressal system. "
+    "Your task is to reply briefly and professionally to citizens' complaints, "
+    "acknowledging the issue and assuring timely action. Keep it under 2 sentences."
+)
+
+
+def _default_model_factory():
+    return genai.GenerativeModel(GEMINI_MODEL_NAME)
+
+
+# Builds the shared model object. Replaceable (e.g. with a local fake)
+# via set_model_factory().
+_model_factory = _default_model_factory
+_model = None
+_semaphore = None
+
+
+def set_model_factory(factory):
     """
-    Uses Gemini to extract issue and location from a user's complaint text, 
-    classifying the issue against the list of predefined types.
-    Returns a dictionary with keys 'issue' (one of the 20 types) and 'location'.
+    Overrides how the Gemini model object is built (used by benchmarks/fakes).
     """
-    prompt = f"""
+    global _model_factory, _model
+    _model_factory = factory
+    _model = None
+
+
+def _get_model():
+    # Built once and reused by every call
+    global _model
+    if _model is None:
+        _model = _model_factory()
+    return _model
+
+
+def _get_semaphore():
+    # Created lazily so it binds to the running bot loop
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def _generate_async(prompt: str, **kwargs) -> str:
+    """
+    Runs one Gemini call without blocking the event loop.
+    At most GEMINI_MAX_CONCURRENCY calls are in flight; each is cut off after GEMINI_TIMEOUT seconds.
+    """
+    async with _get_semaphore():
+        response = await asyncio.wait_for(
+            _get_model().generate_content_async(prompt, **kwargs), timeout=GEMINI_TIMEOUT
+        )
+    return response.text.strip()
+
+
+# --- Result cache (keyed by normalized grievance text) ---
+# A cache failure (locked or corrupt file) counts as a miss / skipped write
+def _cache_get(kind: str, text: str):
+    try:
+        cache = get_cache()
+        return cache.get(kind, text) if cache else None
+    except sqlite3.Error as e:
+        print(f"LLM cache read failed ({kind}): {e}")
+        return None
+
+
+def _cache_set(kind: str, text: str, value):
+    try:
+        cache = get_cache()
+        if cache:
+            cache.set(kind, text, value)
+    except sqlite3.Error as e:
+        print(f"LLM cache write failed ({kind}): {e}")
+
+
+# SQLite work stays off the event loop in the async helpers
+async def _cache_get_async(kind: str, text: str):
+    return await asyncio.to_thread(_cache_get, kind, text)
+
+
+async def _cache_set_async(kind: str, text: str, value):
+    await asyncio.to_thread(_cache_set, kind, text, value)
+
+
+# --- Prompt builders / parsers shared by the sync and async paths ---
+def _classification_prompt(grievance_text: str) -> str:
+    return f"""
     Analyze this grievance: "{grievance_text}"
     
     Classify the issue into one of these types: {ISSUE_LIST_STRING}.
@@ -31,31 +126,123 @@ def extract_issue_and_location(grievance_text: str):
     - location: The location/place mentioned (e.g., "Main Street, near City Hall"), or "unknown" if not found.
     """
 
-    try:
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        response = model.generate_content(prompt)
-        text = response.text.strip()
-
-        # Extract JSON from response
-        match = re.search(r'\{.*\}', text, re.DOTALL)
-        if match:
-            data = json.loads(match.group(0))
-            
-            # Basic validation to ensure issue is one of the types, defaulting to "Other"
-            classified_issue = data.get("issue", "Other Civic Complaints")
-            if classified_issue not in VALID_ISSUES:
-                classified_issue = "Other Civic Complaints"
-
-            return {
-                "issue": classified_issue,
-                "location": data.get("location", "unknown")
-            }
 
+def _extract_json(text: str):
+    """
+    Returns the first JSON object embedded in a model response, or None.
+    """
+    match = re.search(r'\{.*\}', text, re.DOTALL)
+    if not match:
+        return None
+    return json.loads(match.group(0))
+
+
+def _validated_classification(data: dict):
+    # Basic validation to ensure issue is one of the types, defaulting to "Other"
+    classified_issue = data.get("issue", "Other Civic Complaints")
+    if classified_issue not in VALID_ISSUES:
+        classified_issue = "Other Civic Complaints"
+
+    return {
+        "issue": classified_issue,
+        "location": data.get("location", "unknown")
+    }
+
+
+def _parse_classification(text: str):
+    """
+    Extracts the JSON object from a classification response.
+    Returns None if no JSON is found.
+    """
+    data = _extract_json(text)
+    if data is None:
+        return None
+    return _validated_classification(data)
+
+
+def _reply_prompt(user_message: str) -> str:
+    return f"{REPLY_SYSTEM_PROMPT}\nCitizen complaint: {user_message}"
+
+
+def _analysis_prompt(grievance_text: str) -> str:
+    return f"""
+    {REPLY_SYSTEM_PROMPT}
+
+    Analyze this grievance: "{grievance_text}"
+
+    Classify the issue into one of these types: {ISSUE_LIST_STRING}.
+    If the issue doesn't fit any type, classify it as "Other Civic Complaints".
+
+    Return a JSON object with keys:
+    - issue: The best matching issue type from the list.
+    - location: The location/place mentioned (e.g., "Main Street, near City Hall"), or "unknown" if not found.
+    - reply: Your polite acknowledgement to the citizen.
+    """
+
+
+# Ask Gemini for raw JSON so the combined answer parses reliably
+ANALYSIS_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+
+def _parse_analysis(text: str):
+    """
+    Parses a combined analysis response into {'issue', 'location', 'reply'}.
+    Returns None if no JSON is found.
+    """
+    data = _extract_json(text)
+    if data is None:
+        return None
+    parsed = _validated_classification(data)
+    parsed["reply"] = str(data.get("reply") or "").strip() or FALLBACK_REPLY
+    return parsed
+
+
+# --- 1️⃣ Extract issue and location ---
+def extract_issue_and_location(grievance_text: str):
+    """
+    Uses Gemini to extract issue and location from a user's complaint text, 
+    classifying the issue against the list of predefined types.
+    Returns a dictionary with keys 'issue' (one of the 20 types) and 'location'.
+    """
+    cached = _cache_get("classification", grievance_text)
+    if cached:
+        return cached
+
+    parsed = None
+    try:
+        response = _get_model().generate_content(_classification_prompt(grievance_text))
+        parsed = _parse_classification(response.text.strip())
     except Exception as e:
         print("Error in extract_issue_and_location:", e)
 
+    if parsed:
+        _cache_set("classification", grievance_text, parsed)
+        return parsed
     # fallback
-    return {"issue": "Other Civic Complaints", "location": "unknown"}
+    return dict(FALLBACK_CLASSIFICATION)
+
+
+async def extract_issue_and_location_async(grievance_text: str):
+    """
+    Non-blocking extract_issue_and_location() for the bot handlers.
+    Falls back to "Other Civic Complaints"/"unknown" on error or timeout.
+    """
+    cached = await _cache_get_async("classification", grievance_text)
+    if cached:
+        return cached
+
+    parsed = None
+    try:
+        parsed = _parse_classification(await _generate_async(_classification_prompt(grievance_text)))
+    except asyncio.TimeoutError:
+        print(f"Gemini classification timed out after {GEMINI_TIMEOUT}s")
+    except Exception as e:
+        print("Error in extract_issue_and_location_async:", e)
+
+    if parsed:
+        await _cache_set_async("classification", grievance_text, parsed)
+        return parsed
+    return dict(FALLBACK_CLASSIFICATION)
 
 
 # --- 2️⃣ Generate polite AI reply (Function from original utils.py) ---
@@ -63,23 +250,102 @@ def get_gemini_reply(user_message: str) -> str:
     """
     Generate a polite and contextual reply for each complaint using Gemini.
     """
-    try:
-        system_prompt = (
-            "You are a polite and empathetic AI assistant working for the municipal grievance redressal system. "
-            "Your task is to reply briefly and professionally to citizens' complaints, "
-            "acknowledging the issue and assuring timely action. Keep it under 2 sentences."
-        )
-
-        model = genai.GenerativeModel("gemini-2.5-flash")
+    cached = _cache_get("reply", user_message)
+    if cached:
+        return cached
 
+    try:
         # Send prompt to Gemini
-        response = model.generate_content(
-            f"{system_prompt}\nCitizen complaint: {user_message}"
-        )
+        response = _get_model().generate_content(_reply_prompt(user_message))
 
         # Return Gemini's response text
-        return response.text.strip()
+        reply = response.text.strip()
+    except Exception as e:
+        print("Gemini Error:", e)
+        return FALLBACK_REPLY
+
+    _cache_set("reply", user_message, reply)
+    return reply
+
+
+async def get_gemini_reply_async(user_message: str) -> str:
+    """
+    Non-blocking get_gemini_reply(); returns the canned reply on error or timeout.
+    """
+    cached = await _cache_get_async("reply", user_message)
+    if cached:
+        return cached
 
+    try:
+        reply = await _generate_async(_reply_prompt(user_message))
+    except asyncio.TimeoutError:
+        print(f"Gemini reply timed out after {GEMINI_TIMEOUT}s")
+        return FALLBACK_REPLY
     except Exception as e:
         print("Gemini Error:", e)
-        return "Thank you for reporting your issue. Our team will look into it soon."
+        return FALLBACK_REPLY
+
+    await _cache_set_async("reply", user_message, reply)
+    return reply
+
+
+# --- 3️⃣ Combined classification + reply (single round-trip) ---
+def analyze_grievance(grievance_text: str):
+    """
+    Returns {'issue', 'location', 'reply'} for a complaint.
+    With GEMINI_COMBINED_CALL this is one structured Gemini call; otherwise it
+    falls back to extract_issue_and_location() followed by get_gemini_reply().
+    """
+    if not GEMINI_COMBINED_CALL:
+        result = extract_issue_and_location(grievance_text)
+        result["reply"] = get_gemini_reply(grievance_text)
+        return result
+
+    cached = _cache_get("analysis", grievance_text)
+    if cached:
+        return cached
+
+    parsed = None
+    try:
+        response = _get_model().generate_content(
+            _analysis_prompt(grievance_text), generation_config=ANALYSIS_GENERATION_CONFIG
+        )
+        parsed = _parse_analysis(response.text.strip())
+    except Exception as e:
+        print("Error in analyze_grievance:", e)
+
+    if parsed:
+        _cache_set("analysis", grievance_text, parsed)
+        return parsed
+    return dict(FALLBACK_CLASSIFICATION, reply=FALLBACK_REPLY)
+
+
+async def analyze_grievance_async(grievance_text: str):
+    """
+    Non-blocking analyze_grievance() for the bot handlers.
+    In two-call mode the reply is left as None so callers can request it
+    only once the submission is complete.
+    """
+    if not GEMINI_COMBINED_CALL:
+        result = await extract_issue_and_location_async(grievance_text)
+        result["reply"] = None
+        return result
+
+    cached = await _cache_get_async("analysis", grievance_text)
+    if cached:
+        return cached
+
+    parsed = None
+    try:
+        parsed = _parse_analysis(await _generate_async(
+            _analysis_prompt(grievance_text), generation_config=ANALYSIS_GENERATION_CONFIG
+        ))
+    except asyncio.TimeoutError:
+        print(f"Gemini analysis timed out after {GEMINI_TIMEOUT}s")
+    except Exception as e:
+        print("Error in analyze_grievance_async:", e)
+
+    if parsed:
+        await _cache_set_async("analysis", grievance_text, parsed)
+        return parsed
+    return dict(FALLBACK_CLASSIFICATION, reply=FALLBACK_REPLY)
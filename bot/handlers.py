@@ -1,11 +1,39 @@
-from telegram import Update
+import functools
+import weakref
+import asyncio
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
-from database import save_grievance, get_status
-from genai_helper import extract_issue_and_location, get_gemini_reply
+from database import get_status_page_async, get_grievance_detail_async
+from genai_helper import analyze_grievance_async
+from ingest_queue import submit as submit_to_ingest_queue
 from issue_config import ISSUE_CONFIG
+from session_store import get_session_store
+
+# Multi-step complaint submissions in progress (TTL-evicted; see session_store.py)
+pending_submissions = get_session_store()
+
+# One lock per user with a submission step in flight. With concurrent updates
+# enabled, two messages from the same user would otherwise read and overwrite
+# the same session at once. Unused locks are dropped automatically.
+_user_locks = weakref.WeakValueDictionary()
+
+
+def _user_lock(user_id):
+    lock = _user_locks.get(user_id)
+    if lock is None:
+        lock = _user_locks[user_id] = asyncio.Lock()
+    return lock
+
+
+def serialized_per_user(handler):
+    """Runs a handler for one user at a time; other users are not blocked."""
+    @functools.wraps(handler)
+    async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        async with _user_lock(update.message.from_user.id):
+            return await handler(update, context)
+    return wrapper
 
-# Dictionary to track multi-step complaint submissions
-pending_submissions = {}
 
 # ------------------------------
 # Helper: Determine next required data
@@ -18,7 +46,7 @@ def get_next_step(submission_data):
         return "awaiting_location", "📍 I couldn't detect the location clearly. Please send your location."
 
     # 2️⃣ Photo requirement
-    if issue_config['photo_required'] and submission_data.get('photo_file') is None:
+    if issue_config['photo_required'] and submission_data.get('photo_path') is None:
         return "awaiting_photo", "📸 This issue type needs a photo. Please upload one now or skip with /skip_photo."
 
     # 3️⃣ Additional info
@@ -39,6 +67,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # ------------------------------
 # /register
 # ------------------------------
+@serialized_per_user
 async def register(update: Update, context: ContextTypes.DEFAULT_TYPE):
     grievance_text = " ".join(context.args)
     if not grievance_text:
@@ -48,8 +77,8 @@ async def register(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.message.from_user.id
     username = update.message.from_user.username or "Anonymous"
 
-    # Extract issue + location using Gemini
-    extracted = extract_issue_and_location(grievance_text)
+    # Extract issue + location (and, in combined mode, the reply) using Gemini
+    extracted = await analyze_grievance_async(grievance_text)
     issue = extracted.get("issue", "Other Civic Complaints")
     location = extracted.get("location", "unknown")
     issue_config = ISSUE_CONFIG.get(issue, ISSUE_CONFIG["Other Civic Complaints"])
@@ -61,8 +90,9 @@ async def register(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "issue": issue,
         "config": issue_config,
         "location": location,
-        "photo_file": None,
-        "additional_data": None
+        "photo_path": None,
+        "additional_data": None,
+        "ai_reply": extracted.get("reply")
     }
 
     next_step, prompt = get_next_step(submission_data)
@@ -70,19 +100,12 @@ async def register(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Case 1: Fully ready to save
     if next_step == "complete":
-        ai_reply = get_gemini_reply(grievance_text)
-        await save_grievance(user_id, username, grievance_text, issue, location, None, None, ai_reply)
-
+        await finalize_submission(update, context, user_id, submission_data)
 
-        await update.message.reply_text(
-            f"✅ Your grievance has been registered!\n\n"
-            f"🧾 Issue: {issue}\n📍 Location: {location}\n\n"
-            f"{ai_reply}"
-        )
-
-    # Case 2: Ask for next detail
+    # Case 2: Ask for next detail (replaces any unfinished submission)
     else:
-        pending_submissions[user_id] = submission_data
+        pending_submissions.discard_photo(pending_submissions.get(user_id))
+        pending_submissions.set(user_id, submission_data)
         await update.message.reply_text(
             f"✅ We classified your issue as: {issue}\n\n"
             f"{prompt}"
@@ -92,23 +115,25 @@ async def register(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # ------------------------------
 # /skip_photo
 # ------------------------------
+@serialized_per_user
 async def skip_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.message.from_user.id
+    submission_data = pending_submissions.get(user_id)
 
-    if user_id not in pending_submissions:
+    if submission_data is None:
         await update.message.reply_text("❌ No active grievance to skip a photo for. Please use /register first.")
         return
 
-    submission_data = pending_submissions[user_id]
-
     if submission_data['step'] == "awaiting_photo":
-        submission_data['photo_file'] = None
+        pending_submissions.discard_photo(submission_data)
+        submission_data['photo_path'] = None
         next_step, prompt = get_next_step(submission_data)
         submission_data['step'] = next_step
 
         if next_step == "complete":
-            await finalize_submission(update, user_id)
+            await finalize_submission(update, context, user_id, submission_data)
         else:
+            pending_submissions.set(user_id, submission_data)
             await update.message.reply_text(prompt)
     else:
         await update.message.reply_text("You can only use /skip_photo when asked for a photo.")
@@ -117,49 +142,55 @@ async def skip_photo(update: Update, context: ContextTypes.DEFAULT_TYPE):
 # ------------------------------
 # Finalize submission
 # ------------------------------
-async def finalize_submission(update: Update, user_id):
-    submission_data = pending_submissions.pop(user_id)
+# Scoring, the AI reply and the INSERT happen on the ingest workers
+# (ingest_queue.py); the citizen gets a tracking ID now and the AI
+# acknowledgement as a follow-up message.
+async def finalize_submission(update: Update, context: ContextTypes.DEFAULT_TYPE, user_id, submission_data):
+    previous = pending_submissions.pop(user_id)
+    if previous and previous.get('photo_path') != submission_data.get('photo_path'):
+        pending_submissions.discard_photo(previous)
     issue = submission_data['issue']
-    grievance = submission_data['grievance']
     location = submission_data['location']
 
-    ai_reply = get_gemini_reply(grievance)
-
-    await save_grievance(
-        user_id=user_id,
-        username=submission_data['username'],
-        grievance=grievance,
-        issue=issue,
-        location=location,
-        photo_file=submission_data.get('photo_file'),
-        additional_data=submission_data.get('additional_data'),
-        ai_reply=ai_reply
-    )
-
-
-    photo_status = "✅ Photo included." if submission_data.get('photo_file') else "❌ No photo."
-    additional_status = "✅ Extra detail provided." if submission_data.get('additional_data') else "❌ No extra detail."
+    payload = {
+        "user_id": user_id,
+        "username": submission_data['username'],
+        "grievance": submission_data['grievance'],
+        "issue": issue,
+        "location": location,
+        "additional_data": submission_data.get('additional_data'),
+        "ai_reply": submission_data.get('ai_reply'),
+    }
+    try:
+        tracking_id = await submit_to_ingest_queue(
+            context, update.effective_chat.id, payload, submission_data.get('photo_path')
+        )
+    except Exception as e:
+        print(f"Failed to queue grievance: {e}")
+        pending_submissions.discard_photo(submission_data)
+        await update.message.reply_text("⚠️ Sorry, we couldn't accept your grievance right now. Please try again.")
+        return
 
     await update.message.reply_text(
-        f"🎉 Submission complete!\n\n"
-        f"🧾 Issue: {issue}\n📍 Location: {location}\n"
-        f"{photo_status}\n{additional_status}\n\n"
-        f"{ai_reply}"
+        f"📨 Received! Tracking ID: {tracking_id}\n\n"
+        f"🧾 Issue: {issue}\n📍 Location: {location}\n\n"
+        f"You'll get a confirmation message as soon as it's registered."
     )
 
 
 # ------------------------------
 # Handle messages for step-by-step collection
 # ------------------------------
+@serialized_per_user
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.message.from_user.id
+    submission_data = pending_submissions.get(user_id)
 
-    if user_id not in pending_submissions:
+    if submission_data is None:
         if update.message.text:
             await update.message.reply_text("💬 Use /register <your grievance> to start reporting.")
         return
 
-    submission_data = pending_submissions[user_id]
     current_step = submission_data['step']
     input_received = False
 
@@ -181,8 +212,9 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
             # ✅ Download bytes (async)
             photo_bytes = await file_info.download_as_bytearray()
 
-            # ✅ Save in memory
-            submission_data['photo_file'] = bytes(photo_bytes)
+            # ✅ Spill to disk; the session only keeps the path
+            pending_submissions.discard_photo(submission_data)
+            submission_data['photo_path'] = pending_submissions.spill_photo(user_id, bytes(photo_bytes))
             input_received = True
 
         except Exception as e:
@@ -204,33 +236,95 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     submission_data['step'] = next_step
 
     if next_step == "complete":
-        await finalize_submission(update, user_id)
+        await finalize_submission(update, context, user_id, submission_data)
     else:
+        pending_submissions.set(user_id, submission_data)
         await update.message.reply_text(prompt)
 
 
 # ------------------------------
-# /status command
+# /status command (paginated list + /status <id> detail)
 # ------------------------------
+STATUS_PAGE_SIZE = 5
+TELEGRAM_TEXT_LIMIT = 4096
+
+
+def _shorten(text, limit):
+    text = (text or "").strip()
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def _status_page_view(rows, older, newer):
+    lines = ["📋 Your Grievances:"]
+    for g in rows:
+        lines.append(
+            f"🆔 {g['id']} · {g['issue']} · {g['status']}\n"
+            f"📍 {_shorten(g['location'], 60)} · 📅 {g['created_at']:%Y-%m-%d}"
+        )
+    lines.append("Send /status <id> for details.")
+
+    buttons = []
+    if newer is not None:
+        buttons.append(InlineKeyboardButton("← Newer", callback_data=f"status:newer:{newer}"))
+    if older is not None:
+        buttons.append(InlineKeyboardButton("Older →", callback_data=f"status:older:{older}"))
+    return "\n\n".join(lines), (InlineKeyboardMarkup([buttons]) if buttons else None)
+
+
+def _status_detail_view(g):
+    text = (
+        f"🆔 ID: {g['id']}\n"
+        f"Issue: {g['issue']}\n"
+        f"Location: {g['location']}\n"
+        f"Status: {g['status']}\n"
+        f"Department notified: {'Yes' if g['notified_to_dept'] else 'No'}\n"
+        f"Photo: {'Yes' if g['has_photo'] else 'No'}\n"
+        f"📅 Date: {g['created_at']}\n\n"
+        f"Complaint: {_shorten(g['grievance'], 1500)}\n"
+    )
+    if g.get('additional_data'):
+        text += f"Extra detail: {_shorten(g['additional_data'], 500)}\n"
+    text += f"\nAI Reply: {_shorten(g['ai_reply'], 1500) or 'Pending acknowledgment.'}"
+    return _shorten(text, TELEGRAM_TEXT_LIMIT)
+
+
 async def status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_id = update.message.from_user.id
-    grievances = get_status(user_id)
 
-    if not grievances:
+    # /status <id> → detail view of one grievance
+    if context.args:
+        if not context.args[0].isdigit():
+            await update.message.reply_text("Usage: /status or /status <grievance id>")
+            return
+        grievance = await get_grievance_detail_async(user_id, int(context.args[0]))
+        if grievance is None:
+            await update.message.reply_text("No grievance with that ID was found for your account.")
+            return
+        await update.message.reply_text(_status_detail_view(grievance))
+        return
+
+    rows, older, newer = await get_status_page_async(user_id, limit=STATUS_PAGE_SIZE)
+    if not rows:
         await update.message.reply_text("No grievances found.")
         return
 
-    response_lines = ["📋 Your Grievances:"]
-    for g in grievances:
-        ai_ack = g.get('ai_reply', 'Pending acknowledgment.')
-        response_lines.append(
-            f"🆔 ID: {g['id']}\n"
-            f"Issue: {g['issue']}\n"
-            f"Location: {g['location']}\n"
-            f"Status: {g['status']}\n"
-            f"AI Reply: {ai_ack}\n"
-            f"📅 Date: {g['created_at']}\n"
-            "----------------------"
-        )
+    text, keyboard = _status_page_view(rows, older, newer)
+    await update.message.reply_text(text, reply_markup=keyboard)
+
+
+async def status_page(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Handles the ← Newer / Older → buttons under a /status list."""
+    query = update.callback_query
+    await query.answer()
+
+    _, direction, cursor = query.data.split(":")
+    if direction == "older":
+        rows, older, newer = await get_status_page_async(query.from_user.id, before_id=int(cursor), limit=STATUS_PAGE_SIZE)
+    else:
+        rows, older, newer = await get_status_page_async(query.from_user.id, after_id=int(cursor), limit=STATUS_PAGE_SIZE)
+    if not rows:
+        await query.edit_message_text("No more grievances.")
+        return
 
-    await update.message.reply_text("\n\n".join(response_lines))
+    text, keyboard = _status_page_view(rows, older, newer)
+    await query.edit_message_text(text, reply_markup=keyboard)
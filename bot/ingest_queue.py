@@ -0,0 +1,428 @@
+# ==========================================
+# bot/ingest_queue.py — Write-Behind Ingestion Queue (Local SQLite, No Broker)
+# ==========================================
+# Handlers enqueue a finished submission and answer the citizen at once with a
+# tracking ID. Workers running inside the bot's event loop then fetch the AI
+# replies, score + bulk INSERT up to INGEST_BATCH_SIZE grievances at a time
+# and send each acknowledgement as a follow-up message.
+#
+# Jobs survive restarts (SQLite, WAL). A failed job is retried with exponential
+# backoff; after INGEST_MAX_ATTEMPTS it moves to the `dead_letters` table with
+# its last error. Each job carries its tracking ID into grievances.tracking_id
+# (unique), so a retry after a crash mid-save never creates a duplicate row.
+
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+
+_BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+INGEST_QUEUE_PATH = os.getenv("INGEST_QUEUE_PATH", os.path.join(_BOT_DIR, "ingest_queue.sqlite3"))
+INGEST_SPOOL_DIR = os.getenv("INGEST_SPOOL_DIR", os.path.join(_BOT_DIR, "ingest_spool"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "20"))  # jobs saved per bulk INSERT
+INGEST_MAX_ATTEMPTS = int(os.getenv("INGEST_MAX_ATTEMPTS", "5"))
+INGEST_RETRY_BASE_SECONDS = float(os.getenv("INGEST_RETRY_BASE_SECONDS", "5"))
+INGEST_RETRY_MAX_SECONDS = float(os.getenv("INGEST_RETRY_MAX_SECONDS", "600"))
+INGEST_POLL_SECONDS = float(os.getenv("INGEST_POLL_SECONDS", "2"))
+
+
+def new_tracking_id() -> str:
+    return f"CV-{uuid.uuid4().hex[:10].upper()}"
+
+
+# --------------------------------------------------
+# 1. Durable Queue
+# --------------------------------------------------
+class IngestQueue:
+    """
+    SQLite-backed job queue: enqueue → claim → complete | fail (retry / dead-letter).
+    """
+
+    def __init__(self, path=INGEST_QUEUE_PATH, spool_dir=INGEST_SPOOL_DIR,
+                 max_attempts=INGEST_MAX_ATTEMPTS):
+        self.path = path
+        self.spool_dir = spool_dir
+        self.max_attempts = max_attempts
+        os.makedirs(spool_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tracking_id TEXT NOT NULL UNIQUE,
+                chat_id INTEGER,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, next_attempt_at)")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tracking_id TEXT NOT NULL,
+                chat_id INTEGER,
+                payload TEXT NOT NULL,
+                attempts INTEGER NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                failed_at REAL NOT NULL
+            )
+        """)
+        self.enqueued = 0
+        self.completed = 0
+        self.retried = 0
+        self.dead = 0
+
+    def enqueue(self, chat_id, payload, photo_path=None):
+        """
+        Stores a job and returns its tracking ID. `photo_path` (e.g. a session
+        spool file) is moved into the queue's spool so the job owns it.
+        """
+        tracking_id = new_tracking_id()
+        payload = dict(payload)
+        if photo_path and os.path.exists(photo_path):
+            queued_path = os.path.join(self.spool_dir, f"{tracking_id}{os.path.splitext(photo_path)[1]}")
+            shutil.move(photo_path, queued_path)
+            payload["photo_path"] = queued_path
+        else:
+            payload["photo_path"] = None
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (tracking_id, chat_id, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (tracking_id, chat_id, json.dumps(payload), now, now)
+            )
+            self.enqueued += 1
+        return tracking_id
+
+    def claim(self, limit=1):
+        """
+        Marks up to `limit` ready jobs as processing and returns them as dicts.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, tracking_id, chat_id, payload, attempts FROM jobs "
+                "WHERE status = 'queued' AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            if rows:
+                self._conn.executemany(
+                    "UPDATE jobs SET status = 'processing' WHERE id = ?", [(r[0],) for r in rows]
+                )
+        return [
+            {"id": r[0], "tracking_id": r[1], "chat_id": r[2], "payload": json.loads(r[3]), "attempts": r[4]}
+            for r in rows
+        ]
+
+    def complete(self, job):
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE id = ?", (job["id"],))
+            self.completed += 1
+        self._discard_photo(job["payload"])
+
+    def fail(self, job, error):
+        """
+        Schedules a retry with exponential backoff, or dead-letters the job.
+        Returns True if the job was dead-lettered.
+        """
+        attempts = job["attempts"] + 1
+        now = time.time()
+        with self._lock:
+            if attempts >= self.max_attempts:
+                self._conn.execute("BEGIN")
+                self._conn.execute(
+                    "INSERT INTO dead_letters (tracking_id, chat_id, payload, attempts, last_error, created_at, failed_at) "
+                    "SELECT tracking_id, chat_id, payload, ?, ?, created_at, ? FROM jobs WHERE id = ?",
+                    (attempts, str(error), now, job["id"])
+                )
+                self._conn.execute("DELETE FROM jobs WHERE id = ?", (job["id"],))
+                self._conn.execute("COMMIT")
+                self.dead += 1
+                return True
+            delay = min(INGEST_RETRY_BASE_SECONDS * 2 ** (attempts - 1), INGEST_RETRY_MAX_SECONDS)
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (attempts, now + delay, str(error), job["id"])
+            )
+            self.retried += 1
+            return False
+
+    def recover(self):
+        """Re-queues jobs left 'processing' by a previous run that stopped mid-job."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE jobs SET status = 'queued' WHERE status = 'processing'"
+            ).rowcount
+
+    def requeue_dead_letter(self, dead_letter_id):
+        """Moves a dead-lettered job back onto the queue (e.g. after fixing the DB)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            moved = self._conn.execute(
+                "INSERT INTO jobs (tracking_id, chat_id, payload, next_attempt_at, created_at) "
+                "SELECT tracking_id, chat_id, payload, ?, created_at FROM dead_letters WHERE id = ?",
+                (now, dead_letter_id)
+            ).rowcount
+            self._conn.execute("DELETE FROM dead_letters WHERE id = ?", (dead_letter_id,))
+            self._conn.execute("COMMIT")
+        return bool(moved)
+
+    def load_photo(self, payload):
+        path = payload.get("photo_path")
+        if not path:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError as e:
+            print(f"Queued photo missing ({path}): {e}")
+            return None
+
+    def _discard_photo(self, payload):
+        path = payload.get("photo_path")
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            dead_letters = self._conn.execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0]
+        return {
+            "queued": counts.get("queued", 0),
+            "processing": counts.get("processing", 0),
+            "dead_letters": dead_letters,
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead": self.dead,
+        }
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_ingest_queue():
+    """Returns the process-wide IngestQueue."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = IngestQueue()
+        return _queue
+
+
+# --------------------------------------------------
+# 2. Workers (asyncio tasks inside the bot)
+# --------------------------------------------------
+def _store_photo(job, queue):
+    """
+    Moves a queued photo into the media store and returns its ref (None if the
+    job has no photo or its spool file is gone). A storage error is raised so the
+    job is retried with its photo; only on the last attempt is the grievance
+    saved without it.
+    """
+    import media_store
+
+    photo = queue.load_photo(job["payload"])
+    if photo is None:
+        return None
+    try:
+        return media_store.put(photo)
+    except OSError as e:
+        if job["attempts"] + 1 < queue.max_attempts:
+            raise
+        print(f"Failed to store photo for {job['tracking_id']} after {job['attempts'] + 1} attempts "
+              f"({e}); saving the grievance without it.")
+        return None
+
+
+def _records_for(jobs, replies, queue):
+    """
+    Returns (records, errors): records[i] is the row for jobs[i], or None if its
+    photo couldn't be stored yet, with the reason in errors[i].
+    """
+    records, errors = [], {}
+    for i, (job, reply) in enumerate(zip(jobs, replies)):
+        try:
+            photo_ref = _store_photo(job, queue)
+        except OSError as e:
+            records.append(None)
+            errors[i] = f"photo storage failed: {e}"
+            continue
+        records.append({
+            "user_id": job["payload"]["user_id"],
+            "username": job["payload"]["username"],
+            "grievance": job["payload"]["grievance"],
+            "issue": job["payload"]["issue"],
+            "location": job["payload"]["location"],
+            "photo_ref": photo_ref,
+            "additional_data": job["payload"].get("additional_data"),
+            "ai_reply": reply,
+            "tracking_id": job["tracking_id"],
+        })
+    return records, errors
+
+
+async def process_jobs(jobs, queue):
+    """
+    AI replies for the batch (concurrently; skipped where the classifier already
+    produced one), then a single bulk score + INSERT. Jobs whose photo couldn't
+    be stored are left out and fail, keeping their spooled photo for the retry.
+    Returns [(grievance_id or None, ai_reply, error or None, photo_ref or None), ...]
+    in job order.
+    """
+    from database import save_grievances_batch_async
+    from genai_helper import get_gemini_reply_async
+
+    async def reply_for(payload):
+        return payload.get("ai_reply") or await get_gemini_reply_async(payload["grievance"])
+
+    replies = await asyncio.gather(*(reply_for(job["payload"]) for job in jobs))
+    records, photo_errors = await asyncio.to_thread(_records_for, jobs, replies, queue)
+    to_save = [i for i, r in enumerate(records) if r is not None]
+    ids, errors = [], {}
+    if to_save:
+        ids, errors = await save_grievances_batch_async([records[i] for i in to_save])
+
+    results = [(None, reply, photo_errors.get(i), None) for i, reply in enumerate(replies)]
+    for j, i in enumerate(to_save):
+        results[i] = (ids[j], replies[i], errors.get(j), records[i]["photo_ref"])
+    return results
+
+
+def _acknowledgement(job, grievance_id, ai_reply, photo_ref):
+    payload = job["payload"]
+    # Based on what was stored, not on what was sent
+    if photo_ref:
+        photo_status = "✅ Photo included."
+    elif payload.get("photo_path"):
+        photo_status = "⚠️ We couldn't save your photo; the grievance was registered without it."
+    else:
+        photo_status = "❌ No photo."
+    additional_status = "✅ Extra detail provided." if payload.get("additional_data") else "❌ No extra detail."
+    return (
+        f"🎉 Grievance {job['tracking_id']} registered as ID {grievance_id}.\n\n"
+        f"🧾 Issue: {payload['issue']}\n📍 Location: {payload['location']}\n"
+        f"{photo_status}\n{additional_status}\n\n"
+        f"{ai_reply}"
+    )
+
+
+class IngestWorkerPool:
+    """
+    `workers` coroutines that drain the queue and message citizens via `bot`.
+    """
+
+    def __init__(self, queue, bot, workers=INGEST_WORKERS, batch_size=INGEST_BATCH_SIZE,
+                 poll_seconds=INGEST_POLL_SECONDS):
+        self.queue = queue
+        self.bot = bot
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.poll_seconds = poll_seconds
+        self._wakeup = asyncio.Event()
+        self._tasks = []
+
+    def notify(self):
+        """Wakes idle workers after an enqueue (call from the event loop)."""
+        self._wakeup.set()
+
+    def start(self):
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"Ingest queue: re-queued {recovered} interrupted job(s).")
+        self._tasks = [asyncio.create_task(self._run(i), name=f"ingest-{i}") for i in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _run(self, worker_no):
+        while True:
+            jobs = await asyncio.to_thread(self.queue.claim, self.batch_size)
+            if not jobs:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._handle(jobs)
+
+    async def _handle(self, jobs):
+        try:
+            results = await process_jobs(jobs, self.queue)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            results = [(None, None, str(e), None)] * len(jobs)
+
+        for job, (grievance_id, ai_reply, error, photo_ref) in zip(jobs, results):
+            if grievance_id is None:
+                await self._fail(job, error or "grievance could not be saved")
+                continue
+            await asyncio.to_thread(self.queue.complete, job)
+            await self._send(job["chat_id"], _acknowledgement(job, grievance_id, ai_reply, photo_ref))
+
+    async def _fail(self, job, error):
+        print(f"Ingest job {job['tracking_id']} failed (attempt {job['attempts'] + 1}): {error}")
+        if await asyncio.to_thread(self.queue.fail, job, error):
+            await self._send(job["chat_id"],
+                             f"⚠️ Sorry, we couldn't register grievance {job['tracking_id']}. "
+                             f"Our team has been alerted; please try again later.")
+
+    async def _send(self, chat_id, text):
+        # Delivery problems (user blocked the bot, network) never re-run the save
+        if chat_id is None:
+            return
+        try:
+            await self.bot.send_message(chat_id=chat_id, text=text)
+        except Exception as e:
+            print(f"Could not send ingest follow-up to {chat_id}: {e}")
+
+
+# --------------------------------------------------
+# 3. Application Hooks (python-telegram-bot post_init / post_shutdown)
+# --------------------------------------------------
+async def start_ingest_workers(application):
+    pool = IngestWorkerPool(get_ingest_queue(), application.bot)
+    pool.start()
+    application.bot_data["ingest_workers"] = pool
+
+
+async def stop_ingest_workers(application):
+    pool = application.bot_data.pop("ingest_workers", None)
+    if pool is not None:
+        await pool.stop()
+
+
+async def submit(context, chat_id, payload, photo_path=None):
+    """
+    Enqueues a finished submission from a handler and wakes the workers.
+    Returns the tracking ID to show the citizen.
+    """
+    tracking_id = await asyncio.to_thread(get_ingest_queue().enqueue, chat_id, payload, photo_path)
+    pool = context.application.bot_data.get("ingest_workers")
+    if pool is not None:
+        pool.notify()
+    return tracking_id
@@ -0,0 +1,219 @@
+# ==========================================
+# bot/keyword_matcher.py — Aho–Corasick Keyword Severity Matcher
+# ==========================================
+# One pass over the text finds every lexicon term, regardless of lexicon size.
+# Matches must sit on word boundaries ("fire" matches "fire!" but not "firewall"),
+# except at the edge of a term written in a script without spaces between words
+# (Chinese, Japanese, Thai, ...), where "火灾" must match inside "市场发生火灾".
+# Simple English inflections of each term (fires, injuries, flooded, ...) are
+# added at load time, so plurals still match.
+#
+# Lexicon file format (UTF-8), one term per line, weight after a tab or comma:
+#   fire	0.95
+#   incendio	0.95
+#   आग	0.95
+#   火灾	0.95
+# Blank lines and lines starting with "#" are ignored. Multi-word terms are allowed.
+
+import os
+import threading
+import time
+import unicodedata
+from collections import deque
+
+
+def _fold(text: str) -> str:
+    # casefold() handles non-ASCII scripts; NFKC merges compatibility forms
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def _is_word_char(ch: str) -> bool:
+    # Combining marks (Devanagari vowel signs etc.) belong to the word they follow
+    return ch.isalnum() or ch == "_" or unicodedata.category(ch).startswith("M")
+
+
+# Scripts written without spaces between words (Hangul: particles attach to the noun)
+_UNSPACED_SCRIPTS = ("CJK", "HIRAGANA", "KATAKANA", "HANGUL", "THAI", "LAO", "KHMER", "MYANMAR", "TIBETAN")
+
+
+def _needs_boundary(ch: str) -> bool:
+    """False for characters of scripts where words aren't delimited by spaces."""
+    return not unicodedata.name(ch, "").startswith(_UNSPACED_SCRIPTS)
+
+
+# --------------------------------------------------
+# 1. Automaton
+# --------------------------------------------------
+class AhoCorasick:
+    """
+    Compiled multi-pattern matcher. `patterns` maps term -> weight.
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]       # state -> {char: next_state}
+        self._fail = [0]
+        self._output = [[]]     # state -> [(term_length, weight, check_start, check_end), ...]
+        for term, weight in patterns.items():
+            term = _fold(term.strip())
+            if term:
+                self._add(term, float(weight))
+        self._build_failure_links()
+
+    def _add(self, term, weight):
+        state = 0
+        for ch in term:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._output[state].append((len(term), weight, _needs_boundary(term[0]), _needs_boundary(term[-1])))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """
+        Yields (start, end, weight) for each whole-word match in `text`.
+        `text` must already be folded with the same normalization as the patterns.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        n = len(text)
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+            at_boundary = i + 1 == n or not _is_word_char(text[i + 1])
+            for length, weight, check_start, check_end in output[state]:
+                if check_end and not at_boundary:
+                    continue
+                start = i - length + 1
+                if not check_start or start == 0 or not _is_word_char(text[start - 1]):
+                    yield start, i + 1, weight
+
+    def max_weight(self, text):
+        folded = _fold(text)
+        best = 0.0
+        for _, _, weight in self.iter_matches(folded):
+            if weight > best:
+                best = weight
+        return best
+
+
+# --------------------------------------------------
+# 2. Lexicon Loading
+# --------------------------------------------------
+_VOWELS = set("aeiou")
+
+
+def _inflections(term):
+    """Regular English plural / past / -ing forms of a term's last word."""
+    if not term.isascii() or not term[-1:].isalpha():
+        return []
+    if term.endswith("y") and len(term) > 1 and term[-2] not in _VOWELS:
+        return [term + "s", term[:-1] + "ies", term[:-1] + "ied", term + "ing"]
+    if term.endswith("e"):
+        return [term + "s", term + "d", term[:-1] + "ing"]
+    forms = [term + "s", term + "ed", term + "ing"]
+    if term.endswith(("s", "x", "z", "ch", "sh")):
+        forms.append(term + "es")
+    return forms
+
+
+def expand_inflections(lexicon):
+    """
+    Adds inflected forms of every term with the term's weight. Terms listed
+    explicitly in the lexicon keep their own weight.
+    """
+    expanded = dict(lexicon)
+    for term, weight in lexicon.items():
+        for form in _inflections(_fold(term.strip())):
+            expanded.setdefault(form, weight)
+    return expanded
+
+
+def load_lexicon(path):
+    """
+    Reads a term/weight lexicon file into a dict.
+    """
+    lexicon = {}
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            sep = "\t" if "\t" in line else ","
+            term, _, weight = line.rpartition(sep)
+            try:
+                lexicon[term.strip()] = float(weight)
+            except ValueError:
+                print(f"Skipping bad lexicon line {line_no} in {path}: {line!r}")
+    return lexicon
+
+
+class KeywordSeverityMatcher:
+    """
+    Holds the compiled matcher for the current lexicon and recompiles it when
+    the lexicon file changes on disk (checked at most every `check_interval` seconds),
+    so terms can be edited without restarting the bot.
+    """
+
+    def __init__(self, default_lexicon, path=None, check_interval=5.0):
+        self.default_lexicon = dict(default_lexicon)
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._last_check = 0.0
+        self.term_count = 0
+        self._matcher = None
+        self.reload()
+
+    def reload(self):
+        """Rebuilds the automaton from the lexicon file (or the default lexicon)."""
+        lexicon = dict(self.default_lexicon)
+        mtime = None
+        if self.path:
+            try:
+                mtime = os.path.getmtime(self.path)
+                lexicon.update(load_lexicon(self.path))
+            except OSError as e:
+                print(f"Keyword lexicon {self.path} not loaded: {e}")
+        matcher = AhoCorasick(expand_inflections(lexicon))
+        with self._lock:
+            self._matcher = matcher
+            self._mtime = mtime
+            self.term_count = len(lexicon)
+            self._last_check = time.monotonic()
+
+    def _maybe_reload(self):
+        if not self.path or time.monotonic() - self._last_check < self.check_interval:
+            return
+        self._last_check = time.monotonic()
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            print(f"Keyword lexicon changed, reloading {self.path}")
+            self.reload()
+
+    def severity(self, text: str) -> float:
+        """Highest weight among lexicon terms found in `text` (0.0 if none)."""
+        self._maybe_reload()
+        return self._matcher.max_weight(text)
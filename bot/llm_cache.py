@@ -0,0 +1,166 @@
+# ==========================================
+# bot/llm_cache.py — Persistent Cache for Gemini Results (SQLite)
+# ==========================================
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.sqlite3")
+)
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+# --------------------------------------------------
+# 1. Key Normalization
+# --------------------------------------------------
+def normalize_text(text: str) -> str:
+    """
+    Folds case, Unicode forms, punctuation and whitespace so near-identical
+    complaints ("Pothole on MG Road!!" / "pothole on mg road") share a key.
+    """
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = _PUNCTUATION.sub(" ", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def cache_key(kind: str, text: str) -> str:
+    return hashlib.sha256(f"{kind}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+# --------------------------------------------------
+# 2. Cache Store
+# --------------------------------------------------
+class LLMCache:
+    """
+    Content-addressed SQLite cache with TTL expiry and size-bounded LRU eviction.
+    Values are stored as JSON; hits refresh `last_access`.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache (last_access)")
+        self._size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, kind: str, text: str):
+        """Returns the cached value, or None on a miss or expired entry."""
+        key = cache_key(kind, text)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            value, created_at = row
+            if now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._size -= 1
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, kind: str, text: str, value):
+        key = cache_key(kind, text)
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO llm_cache (key, kind, value, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, kind, json.dumps(value), now, now)
+            )
+            if cur.rowcount:
+                self._size += 1
+            else:
+                self._conn.execute(
+                    "UPDATE llm_cache SET value = ?, created_at = ?, last_access = ? WHERE key = ?",
+                    (json.dumps(value), now, now, key)
+                )
+            if self._size > self.max_entries:
+                self._evict()
+
+    def _evict(self):
+        # Drop expired rows first, then least-recently-used ones down to the limit
+        expired = self._conn.execute(
+            "DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,)
+        ).rowcount
+        excess = self._size - expired - self.max_entries
+        lru = 0
+        if excess > 0:
+            lru = self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_access ASC LIMIT ?)", (excess,)
+            ).rowcount
+        self._size -= expired + lru
+        self.evictions += expired + lru
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._size = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+# --------------------------------------------------
+# 3. Process-wide Instance
+# --------------------------------------------------
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    Returns the shared LLMCache, or None when caching is disabled or the store can't be opened.
+    """
+    global _cache, LLM_CACHE_ENABLED
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = LLMCache()
+            except sqlite3.Error as e:
+                print(f"LLM cache disabled (cannot open {LLM_CACHE_PATH}): {e}")
+                LLM_CACHE_ENABLED = False
+                return None
+        return _cache
@@ -2,17 +2,17 @@
 import logging
 import os
 from dotenv import load_dotenv
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
+from telegram.ext import Application, CallbackQueryHandler, CommandHandler, MessageHandler, filters
 # Updated handlers import to include the new skip_photo function
-from handlers import start, register, status, handle_message, skip_photo 
+from handlers import start, register, status, status_page, handle_message, skip_photo 
 from database import init_db
+from priority_index import warm_up_sentiment_model
+from session_store import start_sweeper
+from ingest_queue import start_ingest_workers, stop_ingest_workers
 
 # Load environment variables (like TELEGRAM_BOT_TOKEN)
 load_dotenv()
 
-# Initialize the database (create DB and table if they don't exist)
-init_db()
-
 # Set up logging for better error visibility
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
@@ -25,12 +25,33 @@ def main():
         logging.error("TELEGRAM_BOT_TOKEN not found in environment variables. Cannot start bot.")
         return
 
-    app = Application.builder().token(bot_token).build()
+    # Initialize the database (create it if missing, apply pending schema migrations)
+    init_db()
+
+    # Load the sentiment model in the background while the bot connects to Telegram
+    warm_up_sentiment_model(background=True)
+
+    # Expire abandoned /register flows (and their spooled photos)
+    start_sweeper()
+
+    # Handle updates from different users concurrently; slow LLM/DB calls are awaited,
+    # so one citizen's request no longer queues everyone else's behind it.
+    concurrent_updates = int(os.getenv("BOT_CONCURRENT_UPDATES", "32"))
+    # Ingest workers (save + AI acknowledgement) run alongside the handlers
+    app = (
+        Application.builder()
+        .token(bot_token)
+        .concurrent_updates(concurrent_updates)
+        .post_init(start_ingest_workers)
+        .post_shutdown(stop_ingest_workers)
+        .build()
+    )
 
     # Register command handlers
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("register", register))
     app.add_handler(CommandHandler("status", status))
+    app.add_handler(CallbackQueryHandler(status_page, pattern=r"^status:(older|newer):\d+$"))
     # New handler for skipping photo upload
     app.add_handler(CommandHandler("skip_photo", skip_photo)) 
 
@@ -0,0 +1,110 @@
+# ==========================================
+# bot/media_store.py — Content-Addressed Photo Store (Local Disk)
+# ==========================================
+# Photos are stored once per unique content under MEDIA_ROOT/<aa>/<bb>/<sha256>.
+# The grievances table only keeps the sha256 (`photo_ref`), so row reads stay small
+# and identical uploads share one file. A small JPEG thumbnail is generated at
+# ingest under MEDIA_ROOT/thumbs/ for the dashboard cards.
+
+import hashlib
+import io
+import os
+import tempfile
+
+MEDIA_ROOT = os.getenv(
+    "MEDIA_ROOT", os.path.join(os.path.dirname(os.path.abspath(__file__)), "media")
+)
+THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "320"))  # longest side, pixels
+
+
+def _is_ref(ref) -> bool:
+    return isinstance(ref, str) and len(ref) == 64 and all(c in "0123456789abcdef" for c in ref)
+
+
+def path_for(ref: str) -> str:
+    """Absolute path of the stored original for `ref`."""
+    if not _is_ref(ref):
+        raise ValueError(f"Invalid media reference: {ref!r}")
+    return os.path.join(MEDIA_ROOT, ref[:2], ref[2:4], ref)
+
+
+def thumbnail_path_for(ref: str) -> str:
+    """Absolute path of the JPEG thumbnail for `ref`."""
+    if not _is_ref(ref):
+        raise ValueError(f"Invalid media reference: {ref!r}")
+    return os.path.join(MEDIA_ROOT, "thumbs", ref[:2], ref[2:4], f"{ref}.jpg")
+
+
+def _atomic_write(path: str, data: bytes):
+    # Temp file + rename so readers never see partial files
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def make_thumbnail(data: bytes, size=THUMBNAIL_SIZE) -> bytes:
+    """Downscales an image to fit `size`x`size` and re-encodes it as JPEG."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((size, size))
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=80, optimize=True)
+    return out.getvalue()
+
+
+def ensure_thumbnail(ref: str, data: bytes = None):
+    """
+    Returns the thumbnail path for `ref`, generating it if missing.
+    Returns None if the original is missing or isn't a readable image.
+    """
+    thumb_path = thumbnail_path_for(ref)
+    if os.path.exists(thumb_path):
+        return thumb_path
+    data = data if data is not None else get(ref)
+    if data is None:
+        return None
+    try:
+        _atomic_write(thumb_path, make_thumbnail(data))
+    except Exception as e:
+        print(f"Thumbnail generation failed for {ref}: {e}")
+        return None
+    return thumb_path
+
+
+def put(data: bytes) -> str:
+    """
+    Stores `data` (if not already present) plus its thumbnail and returns its sha256 reference.
+    """
+    ref = hashlib.sha256(data).hexdigest()
+    path = path_for(ref)
+    if not os.path.exists(path):
+        _atomic_write(path, data)
+    ensure_thumbnail(ref, data)
+    return ref
+
+
+def get(ref: str):
+    """Returns the stored bytes for `ref`, or None if missing."""
+    try:
+        with open(path_for(ref), "rb") as f:
+            return f.read()
+    except (OSError, ValueError):
+        return None
+
+
+def exists(ref: str) -> bool:
+    try:
+        return os.path.exists(path_for(ref))
+    except ValueError:
+        return False
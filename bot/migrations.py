@@ -0,0 +1,364 @@
+# ==========================================
+# bot/migrations.py — Versioned Schema Migrations + Index Checks
+# ==========================================
+# Each migration runs once, in order, and is recorded in `schema_version`.
+# Steps are written to be idempotent (MySQL commits DDL implicitly, so a step
+# interrupted half-way must be safe to re-run). When the schema is current,
+# migrate() costs one SELECT.
+#
+#   python migrations.py            # apply pending migrations
+#   python migrations.py --status   # show applied / pending versions
+#   python migrations.py --verify   # EXPLAIN the hot queries, check index usage
+
+import argparse
+import sys
+import traceback
+
+from mysql.connector import Error
+
+MIGRATION_LOCK_NAME = "civicare_schema_migrations"
+MIGRATION_LOCK_TIMEOUT = 60  # seconds to wait for another process's migration
+
+
+# --------------------------------------------------
+# 1. Helpers
+# --------------------------------------------------
+def _column_exists(cur, table, column):
+    cur.execute(
+        "SELECT 1 FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column)
+    )
+    return cur.fetchone() is not None
+
+
+def _index_exists(cur, table, index):
+    cur.execute(
+        "SELECT 1 FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s LIMIT 1",
+        (table, index)
+    )
+    return cur.fetchone() is not None
+
+
+def _table_empty(cur, table):
+    cur.execute(f"SELECT 1 FROM {table} LIMIT 1")
+    return cur.fetchone() is None
+
+
+def _add_column(cur, table, column, definition):
+    if not _column_exists(cur, table, column):
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        print(f"Added column: {table}.{column}")
+
+
+def _add_index(cur, table, index, columns):
+    if not _index_exists(cur, table, index):
+        # Online build: the bot keeps inserting while the index is created
+        cur.execute(f"ALTER TABLE {table} ADD INDEX {index} ({columns}), ALGORITHM=INPLACE, LOCK=NONE")
+        print(f"Added index: {table}.{index} ({columns})")
+
+
+# --------------------------------------------------
+# 2. Migrations (append only — never edit an applied step)
+# --------------------------------------------------
+def _create_grievances(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS grievances (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            user_id BIGINT,
+            username VARCHAR(255),
+            grievance TEXT,
+            issue VARCHAR(255) DEFAULT 'General complaint',
+            location VARCHAR(255) DEFAULT 'unknown',
+            photo LONGBLOB,
+            additional_data TEXT,
+            ai_reply TEXT,
+            sentiment_score FLOAT DEFAULT 0,
+            keyword_severity FLOAT DEFAULT 0,
+            frequency_score FLOAT DEFAULT 0,
+            priority_index FLOAT DEFAULT 0,
+            status VARCHAR(50) DEFAULT 'Pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _add_notified_to_dept(cur):
+    _add_column(cur, "grievances", "notified_to_dept", "BOOLEAN DEFAULT FALSE")
+
+
+def _create_frequency_buckets(cur):
+    from database import _backfill_frequency
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS grievance_frequency (
+            scope VARCHAR(16) NOT NULL,
+            `key` VARCHAR(255) NOT NULL,
+            bucket_start BIGINT NOT NULL,
+            count INT NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, `key`, bucket_start)
+        )
+    """)
+    if _table_empty(cur, "grievance_frequency"):
+        _backfill_frequency(cur)
+
+
+def _add_photo_ref(cur):
+    _add_column(cur, "grievances", "photo_ref", "CHAR(64) NULL")
+
+
+def _create_summary(cur):
+    from database import _rebuild_summary
+
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS grievance_summary (
+            issue VARCHAR(255) NOT NULL,
+            location VARCHAR(255) NOT NULL,
+            status VARCHAR(50) NOT NULL,
+            total INT NOT NULL DEFAULT 0,
+            with_photo INT NOT NULL DEFAULT 0,
+            notified INT NOT NULL DEFAULT 0,
+            priority_sum DOUBLE NOT NULL DEFAULT 0,
+            PRIMARY KEY (issue, location, status)
+        )
+    """)
+    if _table_empty(cur, "grievance_summary"):
+        _rebuild_summary(cur)
+
+
+# Access paths: /status by user, dashboard pages newest-first (optionally
+# filtered by issue+status, status or location), top-N by priority.
+GRIEVANCE_INDEXES = {
+    "idx_grievances_user": "user_id, id",
+    "idx_grievances_created": "created_at, id",
+    "idx_grievances_issue_status_created": "issue, status, created_at",
+    "idx_grievances_status_created": "status, created_at",
+    "idx_grievances_location_created": "location, created_at",
+    "idx_grievances_priority": "priority_index, id",
+}
+
+
+def _add_grievance_indexes(cur):
+    for index, columns in GRIEVANCE_INDEXES.items():
+        _add_index(cur, "grievances", index, columns)
+
+
+def _add_tracking_id(cur):
+    # Set by the ingest queue; the unique key makes retried jobs idempotent
+    _add_column(cur, "grievances", "tracking_id", "VARCHAR(32) NULL")
+    if not _index_exists(cur, "grievances", "uq_grievances_tracking"):
+        cur.execute("ALTER TABLE grievances ADD UNIQUE INDEX uq_grievances_tracking (tracking_id), "
+                    "ALGORITHM=INPLACE, LOCK=NONE")
+        print("Added index: grievances.uq_grievances_tracking (tracking_id)")
+
+
+def _add_updated_at(cur):
+    if not _column_exists(cur, "grievances", "updated_at"):
+        _add_column(cur, "grievances", "updated_at",
+                    "TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)")
+        # Existing rows start from their creation time, in short batches
+        last_id = 0
+        while True:
+            cur.execute("SELECT MAX(id) FROM (SELECT id FROM grievances WHERE id > %s ORDER BY id LIMIT 5000) t",
+                        (last_id,))
+            upper = cur.fetchone()[0]
+            if upper is None:
+                break
+            cur.execute("UPDATE grievances SET updated_at = COALESCE(created_at, updated_at) "
+                        "WHERE id > %s AND id <= %s", (last_id, upper))
+            cur.execute("COMMIT")
+            last_id = upper
+    _add_index(cur, "grievances", "idx_grievances_updated", "updated_at, id")
+
+
+def _create_history(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS grievance_history (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            grievance_id INT NOT NULL,
+            event VARCHAR(32) NOT NULL,
+            old_value VARCHAR(255) NULL,
+            new_value VARCHAR(255) NULL,
+            changed_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+            INDEX idx_history_grievance (grievance_id, id)
+        )
+    """)
+
+
+def _add_frequency_bucket_index(cur):
+    # Lets the retention DELETE find expired buckets without a full scan
+    _add_index(cur, "grievance_frequency", "idx_frequency_bucket", "bucket_start")
+
+
+MIGRATIONS = [
+    (1, "create grievances", _create_grievances),
+    (2, "add grievances.notified_to_dept", _add_notified_to_dept),
+    (3, "create grievance_frequency", _create_frequency_buckets),
+    (4, "add grievances.photo_ref", _add_photo_ref),
+    (5, "create grievance_summary", _create_summary),
+    (6, "add grievances access-path indexes", _add_grievance_indexes),
+    (7, "add grievances.tracking_id", _add_tracking_id),
+    (8, "add grievances.updated_at", _add_updated_at),
+    (9, "create grievance_history", _create_history),
+    (10, "add grievance_frequency.bucket_start index", _add_frequency_bucket_index),
+]
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# --------------------------------------------------
+# 3. Runner
+# --------------------------------------------------
+def _ensure_version_table(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def current_version(cur):
+    cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cur.fetchone()[0]
+
+
+def migrate(conn):
+    """
+    Applies pending migrations on `conn` (connected to the grievance DB).
+    Returns the schema version afterwards. Safe to call from several processes:
+    a MySQL named lock makes the others wait, then they find nothing to do.
+    """
+    cur = conn.cursor()
+    try:
+        _ensure_version_table(cur)
+        version = current_version(cur)
+        if version >= LATEST_VERSION:
+            return version
+
+        cur.execute("SELECT GET_LOCK(%s, %s)", (MIGRATION_LOCK_NAME, MIGRATION_LOCK_TIMEOUT))
+        if cur.fetchone()[0] != 1:
+            raise RuntimeError("Timed out waiting for another schema migration to finish.")
+        try:
+            version = current_version(cur)
+            for number, name, step in MIGRATIONS:
+                if number <= version:
+                    continue
+                print(f"Applying migration {number}: {name}")
+                step(cur)
+                cur.execute("INSERT INTO schema_version (version, name) VALUES (%s, %s)", (number, name))
+                conn.commit()
+                version = number
+        finally:
+            cur.execute("SELECT RELEASE_LOCK(%s)", (MIGRATION_LOCK_NAME,))
+            cur.fetchone()
+        print(f"Schema is at version {version}.")
+        return version
+    finally:
+        cur.close()
+
+
+def migration_status(conn):
+    """Returns [(version, name, applied_at or None), ...] for every known migration."""
+    cur = conn.cursor()
+    try:
+        _ensure_version_table(cur)
+        cur.execute("SELECT version, applied_at FROM schema_version")
+        applied = dict(cur.fetchall())
+    finally:
+        cur.close()
+    return [(number, name, applied.get(number)) for number, name, _ in MIGRATIONS]
+
+
+# --------------------------------------------------
+# 4. Index Verification (EXPLAIN)
+# --------------------------------------------------
+# (label, query, params, acceptable indexes). Mirrors the queries in database.py.
+INDEX_CHECKS = [
+    ("/status by user",
+     "SELECT id FROM grievances WHERE user_id = %s ORDER BY id DESC LIMIT 5",
+     (0,), {"idx_grievances_user"}),
+    ("dashboard page, no filter",
+     "SELECT id FROM grievances ORDER BY created_at DESC, id DESC LIMIT 11",
+     (), {"idx_grievances_created"}),
+    ("dashboard page, issue + status",
+     "SELECT id FROM grievances WHERE issue IN (%s) AND status IN (%s) "
+     "ORDER BY created_at DESC, id DESC LIMIT 11",
+     ("Fire Hazards", "Pending"), {"idx_grievances_issue_status_created"}),
+    ("dashboard page, status",
+     "SELECT id FROM grievances WHERE status IN (%s) ORDER BY created_at DESC, id DESC LIMIT 11",
+     ("Pending",), {"idx_grievances_status_created", "idx_grievances_created"}),
+    ("dashboard page, location",
+     "SELECT id FROM grievances WHERE location IN (%s) ORDER BY created_at DESC, id DESC LIMIT 11",
+     ("Ward 1",), {"idx_grievances_location_created"}),
+    ("report, created_at range",
+     "SELECT id FROM grievances WHERE created_at >= NOW() - INTERVAL 30 DAY "
+     "ORDER BY created_at DESC, id DESC LIMIT 11",
+     (), {"idx_grievances_created"}),
+    ("changed since",
+     "SELECT id FROM grievances WHERE updated_at > NOW() - INTERVAL 1 DAY "
+     "ORDER BY updated_at, id LIMIT 500",
+     (), {"idx_grievances_updated"}),
+    ("top priority",
+     "SELECT id FROM grievances ORDER BY priority_index DESC, id DESC LIMIT 10",
+     (), {"idx_grievances_priority"}),
+]
+
+
+def verify_indexes(conn):
+    """
+    EXPLAINs each query in INDEX_CHECKS and checks the chosen key.
+    On a near-empty table MySQL may prefer a full scan, so run this against
+    realistic data (e.g. `python benchmarks.py dashboard-query --keep-rows`).
+    Returns True if every query uses one of its expected indexes.
+    """
+    cur = conn.cursor(dictionary=True)
+    ok = True
+    try:
+        print(f"{'query':<34}{'key':<40}{'rows':>10}  result")
+        for label, query, params, expected in INDEX_CHECKS:
+            cur.execute("EXPLAIN " + query, params)
+            plan = cur.fetchall()[0]
+            key = plan.get("key")
+            passed = key in expected
+            ok = ok and passed
+            print(f"{label:<34}{str(key):<40}{str(plan.get('rows')):>10}  {'ok' if passed else 'FAIL'}")
+    finally:
+        cur.close()
+    return ok
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main():
+    from database import get_connection, init_db, DB_NAME
+
+    parser = argparse.ArgumentParser(description="CiviCare schema migrations")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--verify", action="store_true", help="check index usage with EXPLAIN")
+    args = parser.parse_args()
+
+    if not args.status:
+        init_db()
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        return 1
+    try:
+        if args.status:
+            for number, name, applied_at in migration_status(conn):
+                print(f"{number:>3}  {name:<40}{applied_at or 'pending'}")
+        if args.verify:
+            return 0 if verify_indexes(conn) else 1
+        return 0
+    except Error as e:
+        print(f"Migration error: {e}")
+        traceback.print_exc()
+        return 1
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,62 @@
 # ==========================================
 # 🤖 bot/priority_index.py — AI-based Priority Scoring (No DB Import)
 # ==========================================
-from transformers import pipeline
+from sentiment_batcher import MicroBatcher
+from sentiment_backends import build_sentiment_pipeline, SENTIMENT_MAX_TOKENS
+from keyword_matcher import KeywordSeverityMatcher
+import frequency_counter
+import asyncio
+import os
 import re
+import threading
 
 # ---------------------------
-# 1️⃣ Initialize Sentiment Model
+# 1️⃣ Initialize Sentiment Model (lazy)
 # ---------------------------
-# Uses lightweight BERT-based model (multilingual safe)
-sentiment_analyzer = pipeline("sentiment-analysis", model="nlptown/bert-base-multilingual-uncased-sentiment")
+# Uses lightweight BERT-based model (multilingual safe).
+# transformers/torch and the model are loaded on first use, so importing this
+# module (e.g. via database.py from the dashboard) stays cheap.
+SENTIMENT_MODEL_NAME = "nlptown/bert-base-multilingual-uncased-sentiment"
+
+# CPU inference backend: "pipeline" (full precision), "quantized" (int8) or "onnx"
+SENTIMENT_BACKEND = os.getenv("SENTIMENT_BACKEND", "pipeline")
+
+_sentiment_analyzer = None
+_model_lock = threading.Lock()
+
+
+def get_sentiment_analyzer():
+    """
+    Returns the sentiment pipeline, loading it on the first call (thread-safe).
+    """
+    global _sentiment_analyzer
+    if _sentiment_analyzer is None:
+        with _model_lock:
+            if _sentiment_analyzer is None:
+                _sentiment_analyzer = build_sentiment_pipeline(SENTIMENT_BACKEND, SENTIMENT_MODEL_NAME)
+    return _sentiment_analyzer
+
+
+def warm_up_sentiment_model(background=True):
+    """
+    Loads the sentiment model ahead of the first grievance.
+    With background=True the load runs on a daemon thread and this returns immediately.
+    """
+    if not background:
+        get_sentiment_analyzer()
+        return None
+    thread = threading.Thread(target=get_sentiment_analyzer, name="sentiment-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+# Micro-batching knobs: flush after N texts or after the wait window, whichever comes first
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "16"))
+SENTIMENT_BATCH_WAIT_MS = float(os.getenv("SENTIMENT_BATCH_WAIT_MS", "5"))
+
+# Set SENTIMENT_PRELOAD=1 to load the model at import time (old behaviour)
+if os.getenv("SENTIMENT_PRELOAD", "0") == "1":
+    get_sentiment_analyzer()
 
 # ---------------------------
 # 2️⃣ Keyword Severity Mapping
@@ -34,19 +82,59 @@ KEYWORD_WEIGHTS = {
     "malpractice": 0.8,
 }
 
+# Optional lexicon file (term<TAB>weight per line) merged over KEYWORD_WEIGHTS.
+# Edits are picked up without a restart.
+KEYWORD_LEXICON_PATH = os.getenv("KEYWORD_LEXICON_PATH")
+KEYWORD_LEXICON_CHECK_SECONDS = float(os.getenv("KEYWORD_LEXICON_CHECK_SECONDS", "5"))
+
+_keyword_matcher = KeywordSeverityMatcher(
+    KEYWORD_WEIGHTS, KEYWORD_LEXICON_PATH, KEYWORD_LEXICON_CHECK_SECONDS
+)
+
 
 # ---------------------------
 # 3️⃣ Sentiment Analysis
 # ---------------------------
+def _label_to_score(label: str) -> float:
+    stars = int(re.findall(r"\d+", label)[0])  # e.g., "4 stars"
+    return (stars - 1) / 4.0  # normalize to 0–1
+
+
+def get_sentiment_scores(texts) -> list:
+    """
+    Scores a list of texts in one batched forward pass (CPU).
+    Converts sentiment (1–5 stars) to polarity (0–1 scale).
+    """
+    if not texts:
+        return []
+    # Truncate by tokens: the model accepts at most 512, and a character cut doesn't guarantee that
+    results = get_sentiment_analyzer()(
+        [t or "" for t in texts], batch_size=len(texts), truncation=True, max_length=SENTIMENT_MAX_TOKENS
+    )
+    return [_label_to_score(r["label"]) for r in results]
+
+
+# Shared batcher: concurrent callers (DB executor threads) get coalesced into one forward pass
+_batcher = MicroBatcher(get_sentiment_scores, SENTIMENT_BATCH_SIZE, SENTIMENT_BATCH_WAIT_MS)
+
+
 def get_sentiment_score(text: str) -> float:
     """
     Converts sentiment (1–5 stars) to polarity (0–1 scale).
+    Blocks until the micro-batch containing `text` has been scored.
     """
     try:
-        result = sentiment_analyzer(text[:512])[0]  # limit length
-        label = result["label"]  # e.g., "4 stars"
-        stars = int(re.findall(r"\d+", label)[0])
-        return (stars - 1) / 4.0  # normalize to 0–1
+        return _batcher.submit(text).result()
+    except Exception:
+        return 0.5
+
+
+async def get_sentiment_score_async(text: str) -> float:
+    """
+    Awaitable get_sentiment_score() that doesn't hold a thread while waiting.
+    """
+    try:
+        return await asyncio.wrap_future(_batcher.submit(text))
     except Exception:
         return 0.5
 
@@ -55,44 +143,80 @@ def get_sentiment_score(text: str) -> float:
 # 4️⃣ Keyword Severity
 # ---------------------------
 def get_keyword_severity(text: str) -> float:
-    text = text.lower()
-    max_score = 0.0
-    for word, weight in KEYWORD_WEIGHTS.items():
-        if word in text:
-            max_score = max(max_score, weight)
-    return max_score
+    """
+    Highest severity weight among whole-word lexicon matches (single Aho–Corasick pass).
+    """
+    return _keyword_matcher.severity(text)
+
+
+def reload_keyword_lexicon():
+    """
+    Forces an immediate reload of the keyword lexicon file.
+    """
+    _keyword_matcher.reload()
 
 
 # ---------------------------
-# 5️⃣ Frequency Weight (Simple Placeholder)
+# 5️⃣ Frequency Weight (Rolling Counts)
 # ---------------------------
-# You can enhance this later with actual DB counts.
-def get_frequency_score(issue: str) -> float:
-    freq_lookup = {
-        "Fire Hazards": 0.9,
-        "Crime / Anti-Social Activity": 0.8,
-        "Electricity / Power": 0.6,
-        "Sewage & Drainage": 0.5,
-        "Garbage & Waste Management": 0.4,
-    }
-    return freq_lookup.get(issue, 0.3)
+# Reads the in-memory sliding-window counters kept up to date by database.py (O(1)).
+def get_frequency_score(issue: str, location: str = None) -> float:
+    return frequency_counter.tracker.score(issue, location)
 
 
 # ---------------------------
 # 6️⃣ Final Priority Index Calculation
 # ---------------------------
-def calculate_priority_index(text: str, issue: str):
+# Weights (w1, w2, w3) for sentiment, keyword severity and frequency.
+# Stored scores don't follow changes to these, KEYWORD_WEIGHTS or the model:
+# re-score existing rows with rescore.py.
+PRIORITY_WEIGHTS = (0.3, 0.5, 0.2)
+
+
+def combine_priority(S, K, F, weights=PRIORITY_WEIGHTS):
+    """
+    P = w1*S + w2*K + w3*F
+    """
+    w1, w2, w3 = weights
+    return round((w1 * S) + (w2 * K) + (w3 * F), 3)
+
+
+def calculate_priority_index(text: str, issue: str, location: str = None):
     """
     Calculates weighted priority index:
     P = w1*S + w2*K + w3*F
     """
     S = get_sentiment_score(text)
     K = get_keyword_severity(text)
-    F = get_frequency_score(issue)
+    F = get_frequency_score(issue, location)
+    return S, K, F, combine_priority(S, K, F)
+
 
-    # Normalize weights
-    w1, w2, w3 = 0.3, 0.5, 0.2
-    P = (w1 * S) + (w2 * K) + (w3 * F)
-    P = round(P, 3)
+def calculate_priority_indices(items, batch_size=SENTIMENT_BATCH_SIZE):
+    """
+    Batched calculate_priority_index() for bulk saves.
+    items: [(text, issue, location), ...] → [(S, K, F, P), ...] in the same order.
+    Sentiment is scored in forward passes of `batch_size` texts.
+    """
+    texts = [text for text, _, _ in items]
+    sentiments = []
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        try:
+            sentiments.extend(get_sentiment_scores(chunk))
+        except Exception as e:
+            # Retry one by one so a single bad text doesn't neutralise its whole chunk
+            print(f"Batch sentiment scoring failed ({e}); scoring texts one by one.")
+            for text in chunk:
+                try:
+                    sentiments.extend(get_sentiment_scores([text]))
+                except Exception as item_error:
+                    print(f"Sentiment scoring failed for one text: {item_error}")
+                    sentiments.append(0.5)
 
-    return S, K, F, P
+    results = []
+    for (text, issue, location), S in zip(items, sentiments):
+        K = get_keyword_severity(text)
+        F = get_frequency_score(issue, location)
+        results.append((S, K, F, combine_priority(S, K, F)))
+    return results
@@ -0,0 +1,218 @@
+# ==========================================
+# bot/reports.py — Streaming PDF Reports (on demand, disk-cached)
+# ==========================================
+# Rows are read from MySQL in keyset pages and turned into one reportlab Table
+# per REPORT_CHUNK_ROWS rows (header repeated on every page). The tables are
+# handed to the document lazily, so only one chunk is in memory at a time
+# however many rows the report has.
+#
+# Finished PDFs are cached on disk per (date range, filters, data version): any
+# insert or update changes the version, and the next request rebuilds.
+#
+#   python reports.py --days 30 -o report.pdf
+#   python reports.py --from 2025-01-01 --to 2025-03-31 --issue "Fire Hazards"
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import uuid
+from datetime import date, datetime, time, timedelta
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import landscape, letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+
+from database import iter_grievances, count_grievances, fetch_data_version
+
+_BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(_BOT_DIR, "report_cache"))
+REPORT_CACHE_MAX_FILES = int(os.getenv("REPORT_CACHE_MAX_FILES", "20"))
+REPORT_CHUNK_ROWS = int(os.getenv("REPORT_CHUNK_ROWS", "500"))
+
+REPORT_COLUMNS = ("id", "issue", "location", "status", "priority_index",
+                  "grievance", "created_at", "notified_to_dept")
+HEADER = ['ID', 'Issue Type', 'Location', 'Status', 'Priority Index', 'Complaint', 'Date', 'Notified']
+# Fixed widths (landscape letter, 720pt usable) so every chunk lines up
+COL_WIDTHS = [35, 100, 75, 50, 70, 255, 80, 55]
+COMPLAINT_CHARS = 70
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 8),
+    ('FONTSIZE', (0, 1), (-1, -1), 7),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+])
+
+
+# --------------------------------------------------
+# 1. Lazy Story
+# --------------------------------------------------
+class _LazyStory(list):
+    """
+    doc.build() consumes its story from the front; this list refills itself
+    from `tail` whenever it runs empty, so flowables are created on demand.
+    """
+
+    def __init__(self, head, tail):
+        super().__init__(head)
+        self._tail = iter(tail)
+
+    def __len__(self):
+        if not super().__len__():
+            flowable = next(self._tail, None)
+            if flowable is not None:
+                self.append(flowable)
+        return super().__len__()
+
+
+def _row(r):
+    text = r.get("grievance") or ""
+    created = r.get("created_at")
+    return [
+        str(r["id"]),
+        r.get("issue") or "",
+        r.get("location") or "",
+        r.get("status") or "",
+        f"{float(r.get('priority_index') or 0):.2f}",
+        text[:COMPLAINT_CHARS] + "..." if len(text) > COMPLAINT_CHARS else text,
+        created.strftime('%Y-%m-%d %H:%M') if created else "",
+        "Yes" if r.get("notified_to_dept") else "No",
+    ]
+
+
+def _tables(rows, chunk_rows):
+    """One Table per `chunk_rows` rows; each splits across pages with its header repeated."""
+    chunk = [HEADER]
+    for r in rows:
+        chunk.append(_row(r))
+        if len(chunk) > chunk_rows:
+            yield Table(chunk, colWidths=COL_WIDTHS, repeatRows=1, style=TABLE_STYLE)
+            chunk = [HEADER]
+    if len(chunk) > 1:
+        yield Table(chunk, colWidths=COL_WIDTHS, repeatRows=1, style=TABLE_STYLE)
+
+
+def _page_number(canvas, doc):
+    canvas.setFont("Helvetica", 8)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2, f"Page {doc.page}")
+
+
+# --------------------------------------------------
+# 2. Build
+# --------------------------------------------------
+def build_report(path, filters, title, chunk_rows=REPORT_CHUNK_ROWS):
+    """
+    Writes the PDF for grievances matching `filters` to `path`, streaming rows
+    from the database. Returns the number of grievances in the report.
+    """
+    total = count_grievances(filters)
+    styles = getSampleStyleSheet()
+    head = [
+        Paragraph(title, styles['Title']),
+        Paragraph(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S IST')}", styles['Normal']),
+        Paragraph(f"Total Grievances: {total}", styles['Normal']),
+        Spacer(1, 12),
+    ]
+    rows = iter_grievances(filters, REPORT_COLUMNS, page_size=chunk_rows) if total else ()
+    doc = SimpleDocTemplate(path, pagesize=landscape(letter), title=title, pageCompression=1)
+    doc.build(_LazyStory(head, _tables(rows, chunk_rows)),
+              onFirstPage=_page_number, onLaterPages=_page_number)
+    return total
+
+
+def _report_filters(start, end, filters):
+    """Sidebar filters (empty lists dropped, values sorted) + the [start, end] day range."""
+    report_filters = {k: sorted(v) for k, v in (filters or {}).items() if v}
+    report_filters["created_from"] = datetime.combine(start, time.min)
+    report_filters["created_to"] = datetime.combine(end + timedelta(days=1), time.min)
+    return report_filters
+
+
+def report_cache_path(report_filters, version):
+    key = json.dumps({"filters": report_filters, "version": version}, sort_keys=True, default=str)
+    return os.path.join(REPORT_CACHE_DIR, f"report-{hashlib.sha256(key.encode()).hexdigest()[:32]}.pdf")
+
+
+def _prune_cache(keep=REPORT_CACHE_MAX_FILES):
+    try:
+        entries = sorted(
+            (e for e in os.scandir(REPORT_CACHE_DIR) if e.name.endswith(".pdf")),
+            key=lambda e: e.stat().st_mtime, reverse=True
+        )
+    except OSError:
+        return
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def get_report(start, end, filters=None, chunk_rows=REPORT_CHUNK_ROWS):
+    """
+    Returns (path, cached) for the PDF of grievances created from `start` to
+    `end` (dates, inclusive) matching `filters`. A cached file is reused until
+    the data changes. Returns (None, False) if the database is unreachable.
+    """
+    version = fetch_data_version()
+    if version is None:
+        return None, False
+    report_filters = _report_filters(start, end, filters)
+    path = report_cache_path(report_filters, version)
+    if os.path.exists(path):
+        os.utime(path)  # keeps recently used reports out of the prune
+        return path, True
+
+    os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    title = f"Civic Grievance Report ({start:%Y-%m-%d} to {end:%Y-%m-%d})"
+    try:
+        total = build_report(tmp_path, report_filters, title, chunk_rows)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    print(f"Report built: {total} grievances → {path}")
+    _prune_cache()
+    return path, False
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Build a grievance PDF report")
+    parser.add_argument("--from", dest="start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", type=date.fromisoformat, help="last day (default: today)")
+    parser.add_argument("--days", type=int, default=30, help="period ending --to, if --from is not given")
+    parser.add_argument("--issue", action="append", default=[])
+    parser.add_argument("--status", action="append", default=[])
+    parser.add_argument("--location", action="append", default=[])
+    parser.add_argument("-o", "--output", help="copy the PDF here")
+    args = parser.parse_args()
+
+    end = args.end or date.today()
+    start = args.start or end - timedelta(days=args.days)
+    path, cached = get_report(start, end, {"issue": args.issue, "status": args.status, "location": args.location})
+    if path is None:
+        print("Database unavailable.")
+        return 1
+    print(f"{'Cached' if cached else 'Built'}: {path}")
+    if args.output:
+        shutil.copyfile(path, args.output)
+        print(f"Copied to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# ==========================================
+# bot/rescore.py — Offline Bulk Re-scoring of priority_index
+# ==========================================
+# Recomputes sentiment_score, keyword_severity and priority_index for stored
+# grievances after PRIORITY_WEIGHTS, KEYWORD_WEIGHTS / the keyword lexicon or
+# the sentiment model changed.
+#
+# Rows are streamed in id order (keyset chunks, bounded memory), scored with
+# batched inference on a pool of worker processes (one model per process), and
+# written back with one bulk UPDATE per chunk. A checkpoint file records the
+# last committed id, so an interrupted run resumes where it stopped.
+#
+# frequency_score is kept as stored: it reflects how many similar reports were
+# open when the grievance came in, which can't be recomputed after the fact.
+#
+#   python rescore.py                  # start, or resume from the checkpoint
+#   python rescore.py --restart        # ignore the checkpoint
+#   python rescore.py --workers 8 --chunk-size 5000
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+from tqdm import tqdm
+
+RESCORE_CHECKPOINT_PATH = os.getenv(
+    "RESCORE_CHECKPOINT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rescore_checkpoint.json")
+)
+_UPDATE_ROWS_PER_STATEMENT = 1000
+
+
+# --------------------------------------------------
+# 1. Worker processes
+# --------------------------------------------------
+def _init_worker():
+    # One intra-op thread per process: the pool already uses every core
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+
+def _score_batch(batch):
+    """
+    [(id, text), ...] → [(id, sentiment, keyword_severity), ...]
+    If the batch fails, rows are scored one by one; a row that still fails
+    comes back as (id, None, None) and keeps its stored scores.
+    """
+    from priority_index import get_sentiment_scores, get_keyword_severity
+
+    texts = [text or "" for _, text in batch]
+    try:
+        sentiments = get_sentiment_scores(texts)
+    except Exception as e:
+        print(f"Sentiment batch starting at id {batch[0][0]} failed ({e}); scoring rows one by one.")
+        sentiments = []
+        for (gid, _), text in zip(batch, texts):
+            try:
+                sentiments.extend(get_sentiment_scores([text]))
+            except Exception as row_error:
+                print(f"Skipping grievance {gid}: {row_error}")
+                sentiments.append(None)
+    return [
+        (gid, s, None if s is None else get_keyword_severity(text))
+        for (gid, _), text, s in zip(batch, texts, sentiments)
+    ]
+
+
+# --------------------------------------------------
+# 2. Checkpoint
+# --------------------------------------------------
+def scoring_fingerprint():
+    """
+    Identifies the scoring setup; a checkpoint from a different setup is not resumed.
+    """
+    import priority_index
+
+    lexicon_mtime = None
+    if priority_index.KEYWORD_LEXICON_PATH and os.path.exists(priority_index.KEYWORD_LEXICON_PATH):
+        lexicon_mtime = os.path.getmtime(priority_index.KEYWORD_LEXICON_PATH)
+    return {
+        "weights": list(priority_index.PRIORITY_WEIGHTS),
+        "keyword_weights": priority_index.KEYWORD_WEIGHTS,
+        "lexicon_path": priority_index.KEYWORD_LEXICON_PATH,
+        "lexicon_mtime": lexicon_mtime,
+        "model": priority_index.SENTIMENT_MODEL_NAME,
+        "backend": priority_index.SENTIMENT_BACKEND,
+    }
+
+
+def load_checkpoint(path, fingerprint):
+    try:
+        with open(path, encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get("fingerprint") != fingerprint:
+        print("Scoring setup changed since the checkpoint was written; starting over.")
+        return None
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+# --------------------------------------------------
+# 3. Streaming read / bulk write
+# --------------------------------------------------
+def _fetch_chunk(cur, after_id, limit):
+    cur.execute(
+        "SELECT id, grievance, frequency_score FROM grievances WHERE id > %s ORDER BY id LIMIT %s",
+        (after_id, limit)
+    )
+    return cur.fetchall()
+
+
+def _write_chunk(cur, rows):
+    """
+    rows: [(id, sentiment, keyword_severity, priority_index), ...].
+    One UPDATE ... JOIN per _UPDATE_ROWS_PER_STATEMENT rows instead of one UPDATE per row.
+    """
+    for start in range(0, len(rows), _UPDATE_ROWS_PER_STATEMENT):
+        part = rows[start:start + _UPDATE_ROWS_PER_STATEMENT]
+        values = " UNION ALL ".join(["SELECT %s AS id, %s AS s, %s AS k, %s AS p"] * len(part))
+        cur.execute(
+            f"""
+            UPDATE grievances g JOIN ({values}) v ON g.id = v.id
+            SET g.sentiment_score = v.s, g.keyword_severity = v.k, g.priority_index = v.p
+            """,
+            [x for row in part for x in row]
+        )
+
+
+def rescore(workers=None, chunk_size=2000, batch_size=32,
+            checkpoint_path=RESCORE_CHECKPOINT_PATH, restart=False):
+    """
+    Re-scores every grievance. Returns the number of rows updated in this run.
+    """
+    from database import get_connection, rebuild_grievance_summary, DB_NAME
+    from priority_index import combine_priority
+
+    fingerprint = scoring_fingerprint()
+    checkpoint = None if restart else load_checkpoint(checkpoint_path, fingerprint)
+    if checkpoint is None:
+        checkpoint = {"last_id": 0, "processed": 0, "skipped": [], "fingerprint": fingerprint,
+                      "started_at": time.time()}
+    else:
+        print(f"Resuming after id {checkpoint['last_id']} ({checkpoint['processed']} rows already done).")
+
+    conn = get_connection(DB_NAME)
+    if conn is None:
+        print("DB connection failed in rescore().")
+        return 0
+    cur = conn.cursor()
+    cur.execute("SELECT COUNT(*) FROM grievances WHERE id > %s", (checkpoint["last_id"],))
+    remaining = cur.fetchone()[0]
+
+    workers = workers or os.cpu_count() or 1
+    updated = 0
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ctx.Pool(workers, initializer=_init_worker) as pool, \
+                tqdm(total=remaining, unit="rows", desc="Re-scoring") as progress:
+            while True:
+                rows = _fetch_chunk(cur, checkpoint["last_id"], chunk_size)
+                if not rows:
+                    break
+                frequency = {gid: float(f or 0) for gid, _, f in rows}
+                batches = [
+                    [(gid, text) for gid, text, _ in rows[i:i + batch_size]]
+                    for i in range(0, len(rows), batch_size)
+                ]
+                scored = [r for batch in pool.imap(_score_batch, batches) for r in batch]
+                checkpoint.setdefault("skipped", []).extend(gid for gid, s, _ in scored if s is None)
+                _write_chunk(cur, [
+                    (gid, s, k, combine_priority(s, k, frequency[gid])) for gid, s, k in scored if s is not None
+                ])
+                conn.commit()
+
+                checkpoint["last_id"] = rows[-1][0]
+                checkpoint["processed"] += len(rows)
+                save_checkpoint(checkpoint_path, checkpoint)
+                updated += len(rows)
+                progress.update(len(rows))
+    except Exception as e:
+        conn.rollback()
+        print(f"Re-scoring stopped at id {checkpoint['last_id']}: {e}")
+        traceback.print_exc()
+        print("Run again to resume from the checkpoint.")
+        return updated
+    finally:
+        cur.close()
+        conn.close()
+
+    # Priority sums in the dashboard summary changed with the scores
+    rebuild_grievance_summary()
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    skipped = checkpoint.get("skipped", [])
+    print(f"Re-scored {checkpoint['processed'] - len(skipped)} grievances.")
+    if skipped:
+        print(f"{len(skipped)} could not be scored and kept their old scores (ids: {skipped[:20]}"
+              f"{' ...' if len(skipped) > 20 else ''}).")
+    return updated
+
+
+# --------------------------------------------------
+# CLI
+# --------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Re-score stored grievances with the current priority model")
+    parser.add_argument("--workers", type=int, default=None, help="scoring processes (default: all CPU cores)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="rows read and written per transaction")
+    parser.add_argument("--batch-size", type=int, default=32, help="texts per sentiment forward pass")
+    parser.add_argument("--checkpoint", default=RESCORE_CHECKPOINT_PATH)
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    rescore(args.workers, args.chunk_size, args.batch_size, args.checkpoint, args.restart)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+# ==========================================
+# bot/sentiment_backends.py — CPU Inference Backends for Sentiment Scoring
+# ==========================================
+# Every backend returns a transformers text-classification pipeline with the
+# same "N stars" labels, so priority_index's 1–5 star → 0–1 mapping is unchanged.
+# Each pipeline truncates inputs to SENTIMENT_MAX_TOKENS tokens (the model limit).
+#
+#   pipeline  : full-precision PyTorch model (original behaviour)
+#   quantized : dynamic int8 quantization of the Linear layers (torch only)
+#   onnx      : ONNX Runtime graph via optimum (optional dependency:
+#               pip install "optimum[onnxruntime]"); exported once and cached on disk
+
+import os
+
+SENTIMENT_BACKENDS = ("pipeline", "quantized", "onnx")
+SENTIMENT_MAX_TOKENS = 512
+SENTIMENT_ONNX_DIR = os.getenv(
+    "SENTIMENT_ONNX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "sentiment-onnx")
+)
+
+
+def _sentiment_pipeline(model, tokenizer=None):
+    from transformers import pipeline
+
+    analyzer = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer,
+                        truncation=True, max_length=SENTIMENT_MAX_TOKENS)
+    # Also covers callers that don't pass truncation per call
+    analyzer.tokenizer.model_max_length = min(analyzer.tokenizer.model_max_length, SENTIMENT_MAX_TOKENS)
+    return analyzer
+
+
+def _build_pipeline(model_name):
+    return _sentiment_pipeline(model_name)
+
+
+def _build_quantized(model_name):
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    model.eval()
+    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    return _sentiment_pipeline(model, tokenizer)
+
+
+def _build_onnx(model_name):
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+
+    if os.path.isdir(SENTIMENT_ONNX_DIR):
+        model = ORTModelForSequenceClassification.from_pretrained(SENTIMENT_ONNX_DIR)
+        tokenizer = AutoTokenizer.from_pretrained(SENTIMENT_ONNX_DIR)
+    else:
+        print(f"Exporting {model_name} to ONNX (one-time) -> {SENTIMENT_ONNX_DIR}")
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(SENTIMENT_ONNX_DIR)
+        tokenizer.save_pretrained(SENTIMENT_ONNX_DIR)
+    return _sentiment_pipeline(model, tokenizer)
+
+
+_BUILDERS = {
+    "pipeline": _build_pipeline,
+    "quantized": _build_quantized,
+    "onnx": _build_onnx,
+}
+
+
+def build_sentiment_pipeline(backend, model_name):
+    """
+    Builds the sentiment pipeline for `backend`.
+    Unknown backends, or an ONNX backend without optimum/onnxruntime installed,
+    fall back to the full-precision pipeline. The backend actually built is
+    recorded on the result as `.sentiment_backend`.
+    """
+    builder = _BUILDERS.get(backend)
+    if builder is None:
+        print(f"Unknown SENTIMENT_BACKEND '{backend}', using 'pipeline'.")
+        backend, builder = "pipeline", _build_pipeline
+    try:
+        analyzer = builder(model_name)
+    except ImportError as e:
+        print(f"Sentiment backend '{backend}' unavailable ({e}), using 'pipeline'.")
+        backend, analyzer = "pipeline", _build_pipeline(model_name)
+    analyzer.sentiment_backend = backend
+    return analyzer
@@ -0,0 +1,95 @@
+# ==========================================
+# bot/sentiment_batcher.py — Micro-batching for Sentiment Inference
+# ==========================================
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """
+    Collects single-item requests from many threads and runs them through
+    `batch_fn` together.
+
+    A batch is flushed when `max_batch_size` items are waiting or `max_wait_ms`
+    has passed since the first item arrived, whichever comes first.
+    `batch_fn(items)` must return one result per item, in order. If a batch
+    raises, its items are retried one by one so only the failing item's
+    future gets the exception.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_wait_ms=5.0):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="sentiment-batcher", daemon=True)
+                    self._thread.start()
+
+    def submit(self, item) -> Future:
+        """Queues one item and returns a Future resolved with its result."""
+        self._ensure_started()
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise ValueError(f"batch_fn returned {len(results)} results for {len(items)} items")
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    # One bad item must not fail its neighbours: retry them one at a time
+                    self._run_one_by_one(batch)
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+
+    def _run_one_by_one(self, batch):
+        for item, future in batch:
+            try:
+                future.set_result(self.batch_fn([item])[0])
+            except Exception as e:
+                future.set_exception(e)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "pending": self._queue.qsize(),
+            }
@@ -0,0 +1,291 @@
+# ==========================================
+# bot/session_store.py — Conversation State for Multi-Step Submissions
+# ==========================================
+# Holds each user's in-progress /register flow between messages.
+#
+#   memory : LRU dict with TTL expiry (lost on restart)
+#   sqlite : durable across restarts (same WAL setup as llm_cache.py)
+#
+# Session data must be JSON-serializable. Photos are never kept in the session:
+# they are spilled to SESSION_SPOOL_DIR and the session stores the file path.
+# A background sweeper drops abandoned sessions (and their photos) after the TTL.
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+_BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")  # memory | sqlite
+SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(6 * 3600)))
+SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(_BOT_DIR, "sessions.sqlite3"))
+SESSION_SPOOL_DIR = os.getenv("SESSION_SPOOL_DIR", os.path.join(_BOT_DIR, "session_spool"))
+SESSION_SWEEP_SECONDS = float(os.getenv("SESSION_SWEEP_SECONDS", "60"))
+
+# Unreferenced spool files younger than this may belong to a spill in progress
+_ORPHAN_GRACE_SECONDS = 600
+
+
+# --------------------------------------------------
+# 1. Shared Behaviour (photo spool, metrics)
+# --------------------------------------------------
+class SessionStore:
+    """
+    Base class: backends implement _get/_set/_pop/_expire/_count/_photo_refs.
+    """
+
+    def __init__(self, ttl=SESSION_TTL_SECONDS, spool_dir=SESSION_SPOOL_DIR):
+        self.ttl = ttl
+        self.spool_dir = spool_dir
+        os.makedirs(spool_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.expired = 0
+        self.evicted = 0
+
+    # --- Public API
+    def get(self, user_id):
+        """Returns a copy of the user's session dict, or None."""
+        with self._lock:
+            return self._get(user_id, time.time())
+
+    def set(self, user_id, data):
+        """Saves the session and restarts its TTL."""
+        with self._lock:
+            self._set(user_id, data, time.time())
+
+    def pop(self, user_id):
+        """
+        Removes and returns the session. Its spooled photo is kept:
+        the caller reads it with load_photo() and then calls discard_photo().
+        """
+        with self._lock:
+            return self._pop(user_id)
+
+    def delete(self, user_id):
+        data = self.pop(user_id)
+        if data:
+            self.discard_photo(data)
+
+    def sweep(self):
+        """Drops expired sessions and orphaned spool files. Returns sessions removed."""
+        with self._lock:
+            expired = self._expire(time.time())
+            self.expired += len(expired)
+            referenced = self._photo_refs()
+        for data in expired:
+            self.discard_photo(data)
+        self._remove_orphan_photos(referenced)
+        return len(expired)
+
+    # --- Photos
+    def spill_photo(self, user_id, photo_bytes):
+        """Writes photo bytes to the spool and returns the path to keep in the session."""
+        path = os.path.join(self.spool_dir, f"{user_id}-{uuid.uuid4().hex}.jpg")
+        with open(path, "wb") as f:
+            f.write(photo_bytes)
+        return path
+
+    def load_photo(self, data):
+        path = (data or {}).get("photo_path")
+        if not path:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError as e:
+            print(f"Spooled photo missing ({path}): {e}")
+            return None
+
+    def discard_photo(self, data):
+        path = (data or {}).get("photo_path")
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _remove_orphan_photos(self, referenced):
+        cutoff = time.time() - _ORPHAN_GRACE_SECONDS
+        try:
+            names = os.listdir(self.spool_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.spool_dir, name)
+            try:
+                if path not in referenced and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    # --- Metrics
+    def stats(self):
+        spool_files = spool_bytes = 0
+        try:
+            for entry in os.scandir(self.spool_dir):
+                spool_files += 1
+                spool_bytes += entry.stat().st_size
+        except OSError:
+            pass
+        with self._lock:
+            active, session_bytes = self._count()
+        return {
+            "backend": self.backend,
+            "active_sessions": active,
+            "session_bytes": session_bytes,
+            "spool_files": spool_files,
+            "spool_bytes": spool_bytes,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+
+# --------------------------------------------------
+# 2. In-Memory Backend (LRU + TTL)
+# --------------------------------------------------
+class MemorySessionStore(SessionStore):
+    backend = "memory"
+
+    def __init__(self, ttl=SESSION_TTL_SECONDS, max_entries=SESSION_MAX_ENTRIES, spool_dir=SESSION_SPOOL_DIR):
+        super().__init__(ttl, spool_dir)
+        self.max_entries = max(1, int(max_entries))
+        self._sessions = OrderedDict()  # user_id -> (expires_at, json text), least recent first
+
+    def _get(self, user_id, now):
+        entry = self._sessions.get(user_id)
+        if entry is None or entry[0] < now:
+            return None
+        self._sessions.move_to_end(user_id)
+        return json.loads(entry[1])
+
+    def _set(self, user_id, data, now):
+        # Stored as JSON so memory accounting is exact and callers can't mutate it in place
+        self._sessions[user_id] = (now + self.ttl, json.dumps(data))
+        self._sessions.move_to_end(user_id)
+        while len(self._sessions) > self.max_entries:
+            _, (_, text) = self._sessions.popitem(last=False)
+            self.evicted += 1
+            self.discard_photo(json.loads(text))
+
+    def _pop(self, user_id):
+        entry = self._sessions.pop(user_id, None)
+        return json.loads(entry[1]) if entry else None
+
+    def _expire(self, now):
+        expired = [uid for uid, (expires_at, _) in self._sessions.items() if expires_at < now]
+        return [json.loads(self._sessions.pop(uid)[1]) for uid in expired]
+
+    def _count(self):
+        return len(self._sessions), sum(len(text) for _, text in self._sessions.values())
+
+    def _photo_refs(self):
+        refs = set()
+        for _, text in self._sessions.values():
+            path = json.loads(text).get("photo_path")
+            if path:
+                refs.add(path)
+        return refs
+
+
+# --------------------------------------------------
+# 3. SQLite Backend (survives restarts)
+# --------------------------------------------------
+class SQLiteSessionStore(SessionStore):
+    backend = "sqlite"
+
+    def __init__(self, path=SESSION_DB_PATH, ttl=SESSION_TTL_SECONDS, spool_dir=SESSION_SPOOL_DIR):
+        super().__init__(ttl, spool_dir)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                user_id INTEGER PRIMARY KEY,
+                data TEXT NOT NULL,
+                photo_path TEXT,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions (expires_at)")
+
+    def _get(self, user_id, now):
+        row = self._conn.execute(
+            "SELECT data FROM sessions WHERE user_id = ? AND expires_at >= ?", (user_id, now)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set(self, user_id, data, now):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO sessions (user_id, data, photo_path, expires_at) VALUES (?, ?, ?, ?)",
+            (user_id, json.dumps(data), data.get("photo_path"), now + self.ttl)
+        )
+
+    def _pop(self, user_id):
+        row = self._conn.execute("SELECT data FROM sessions WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        self._conn.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+        return json.loads(row[0])
+
+    def _expire(self, now):
+        rows = self._conn.execute("SELECT data FROM sessions WHERE expires_at < ?", (now,)).fetchall()
+        self._conn.execute("DELETE FROM sessions WHERE expires_at < ?", (now,))
+        return [json.loads(text) for text, in rows]
+
+    def _count(self):
+        count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions").fetchone()
+        return count, size
+
+    def _photo_refs(self):
+        rows = self._conn.execute("SELECT photo_path FROM sessions WHERE photo_path IS NOT NULL").fetchall()
+        return {path for path, in rows}
+
+
+# --------------------------------------------------
+# 4. Process-wide Instance + Sweeper
+# --------------------------------------------------
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Returns the shared store for SESSION_BACKEND (falls back to memory if SQLite can't open)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if SESSION_BACKEND == "sqlite":
+                try:
+                    _store = SQLiteSessionStore()
+                except sqlite3.Error as e:
+                    print(f"Session store: cannot open {SESSION_DB_PATH} ({e}), using memory.")
+            elif SESSION_BACKEND != "memory":
+                print(f"Unknown SESSION_BACKEND '{SESSION_BACKEND}', using 'memory'.")
+            if _store is None:
+                _store = MemorySessionStore()
+        return _store
+
+
+def start_sweeper(interval=SESSION_SWEEP_SECONDS):
+    """
+    Starts a daemon thread that expires abandoned sessions every `interval` seconds.
+    """
+    store = get_session_store()
+
+    def _run():
+        while True:
+            time.sleep(interval)
+            try:
+                removed = store.sweep()
+                if removed:
+                    print(f"Session sweep: expired {removed} abandoned session(s). {store.stats()}")
+            except Exception as e:
+                print(f"Session sweep failed: {e}")
+
+    thread = threading.Thread(target=_run, name="session-sweeper", daemon=True)
+    thread.start()
+    return thread
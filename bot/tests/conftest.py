@@ -0,0 +1,5 @@
+# bot/ modules import each other by flat name (e.g. `from database import ...`)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
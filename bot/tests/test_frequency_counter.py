@@ -0,0 +1,36 @@
+import time
+
+from frequency_counter import FrequencyTracker
+
+HOUR = 3600
+WINDOWS = {"24h": 24 * HOUR, "7d": 7 * 24 * HOUR}
+
+
+def _sizes(tracker):
+    return {key: len(counter) for key, counter in tracker._counters.items()}
+
+
+def test_sweep_drops_keys_outside_every_window():
+    tracker = FrequencyTracker(WINDOWS, HOUR)
+    now = time.time()
+    tracker.record("Fire Hazards", "one-off street", now - 3 * 24 * HOUR)
+    tracker.record("Fire Hazards", "Ward 1", now - HOUR)
+
+    tracker.sweep(now)
+    sizes = _sizes(tracker)
+    assert sizes[("location", "24h")] == 1
+    assert sizes[("location", "7d")] == 2
+
+    tracker.sweep(now + 8 * 24 * HOUR)
+    assert set(_sizes(tracker).values()) == {0}
+
+
+def test_counts_unchanged_by_sweep():
+    tracker = FrequencyTracker(WINDOWS, HOUR)
+    now = time.time()
+    for _ in range(3):
+        tracker.record("Water Supply", "Ward 2", now - HOUR)
+    tracker.sweep(now)
+
+    assert tracker._counters[("issue", "24h")].count("Water Supply", now) == 3
+    assert tracker._counters[("location", "7d")].count("ward 2", now) == 3
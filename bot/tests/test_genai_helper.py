@@ -0,0 +1,139 @@
+# Async Gemini helpers against a delayed local fake (no network, no API key).
+import asyncio
+import sqlite3
+
+import pytest
+
+pytest.importorskip("google.generativeai")
+
+import genai_helper
+import llm_cache
+
+
+class DelayedFakeModel:
+    """Answers after `delay` seconds and records how many calls overlapped."""
+
+    class _Response:
+        def __init__(self, text):
+            self.text = text
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content_async(self, prompt, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if "- reply:" in prompt:
+            return self._Response('{"issue": "Roads & Traffic", "location": "MG Road", "reply": "On it."}')
+        return self._Response("Thank you, we are on it.")
+
+
+@pytest.fixture
+def fake_model(monkeypatch, tmp_path):
+    model = DelayedFakeModel(delay=0.05)
+    genai_helper.set_model_factory(lambda: model)
+    monkeypatch.setattr(genai_helper, "_semaphore", None)
+    monkeypatch.setattr(genai_helper, "GEMINI_MAX_CONCURRENCY", 3)
+    monkeypatch.setattr(genai_helper, "GEMINI_TIMEOUT", 5.0)
+    monkeypatch.setattr(genai_helper, "GEMINI_COMBINED_CALL", True)
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.LLMCache(path=str(tmp_path / "llm_cache.sqlite3")))
+    yield model
+    genai_helper.set_model_factory(genai_helper._default_model_factory)
+
+
+def test_concurrent_calls_overlap_up_to_the_semaphore_limit(fake_model):
+    async def run():
+        return await asyncio.gather(*(genai_helper.get_gemini_reply_async(f"pothole {i}") for i in range(10)))
+
+    replies = asyncio.run(run())
+
+    assert replies == ["Thank you, we are on it."] * 10
+    assert fake_model.calls == 10
+    assert fake_model.max_in_flight == genai_helper.GEMINI_MAX_CONCURRENCY
+
+
+def test_timeout_falls_back_to_canned_answers(fake_model, monkeypatch):
+    fake_model.delay = 1.0
+    monkeypatch.setattr(genai_helper, "GEMINI_TIMEOUT", 0.05)
+
+    async def run():
+        return (await genai_helper.get_gemini_reply_async("slow reply"),
+                await genai_helper.analyze_grievance_async("slow analysis"))
+
+    reply, analysis = asyncio.run(run())
+
+    assert reply == genai_helper.FALLBACK_REPLY
+    assert analysis == dict(genai_helper.FALLBACK_CLASSIFICATION, reply=genai_helper.FALLBACK_REPLY)
+
+
+def test_timeouts_are_not_cached(fake_model, monkeypatch):
+    monkeypatch.setattr(genai_helper, "GEMINI_TIMEOUT", 0.01)
+    fake_model.delay = 1.0
+    asyncio.run(genai_helper.get_gemini_reply_async("flaky"))
+
+    monkeypatch.setattr(genai_helper, "GEMINI_TIMEOUT", 5.0)
+    fake_model.delay = 0.0
+    assert asyncio.run(genai_helper.get_gemini_reply_async("flaky")) == "Thank you, we are on it."
+
+
+def test_cache_hits_skip_the_model(fake_model):
+    async def run():
+        first = await genai_helper.analyze_grievance_async("Pothole on MG Road!")
+        second = await genai_helper.analyze_grievance_async("pothole on mg road")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == {"issue": "Roads & Traffic", "location": "MG Road", "reply": "On it."}
+    assert fake_model.calls == 1
+
+
+def test_cache_reads_and_writes_run_off_the_event_loop(fake_model, monkeypatch):
+    import threading
+
+    threads = []
+    cache = llm_cache._cache
+    for name in ("get", "set"):
+        original = getattr(cache, name)
+
+        def traced(*args, _original=original):
+            threads.append(threading.current_thread())
+            return _original(*args)
+
+        monkeypatch.setattr(cache, name, traced)
+
+    asyncio.run(genai_helper.get_gemini_reply_async("streetlight out"))
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+class BrokenCache:
+    def get(self, kind, text):
+        raise sqlite3.OperationalError("database is locked")
+
+    def set(self, kind, text, value):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_cache_errors_do_not_discard_model_results(fake_model, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_cache", BrokenCache())
+
+    async def run():
+        return (await genai_helper.get_gemini_reply_async("pothole"),
+                await genai_helper.analyze_grievance_async("pothole on MG Road"))
+
+    reply, analysis = asyncio.run(run())
+
+    assert reply == "Thank you, we are on it."
+    assert analysis["issue"] == "Roads & Traffic"
+    assert analysis["reply"] == "On it."
+    assert fake_model.calls == 2
@@ -0,0 +1,74 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("telegram")
+pytest.importorskip("google.generativeai")
+pytest.importorskip("mysql.connector")
+
+import handlers  # noqa: E402
+from session_store import MemorySessionStore  # noqa: E402
+
+
+class FakeMessage:
+    def __init__(self, user_id, text=None):
+        self.from_user = SimpleNamespace(id=user_id, username="tester")
+        self.text = text
+        self.photo = None
+        self.replies = []
+
+    async def reply_text(self, text, **kwargs):
+        self.replies.append(text)
+
+
+def _update(user_id, text=None):
+    return SimpleNamespace(message=FakeMessage(user_id, text), effective_chat=SimpleNamespace(id=user_id))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = MemorySessionStore(spool_dir=str(tmp_path / "spool"))
+    monkeypatch.setattr(handlers, "pending_submissions", store)
+
+    async def analyze(text):
+        await asyncio.sleep(0.01)
+        return {"issue": "Other Civic Complaints", "location": "unknown", "reply": "ok"}
+
+    monkeypatch.setattr(handlers, "analyze_grievance_async", analyze)
+    return store
+
+
+def test_register_discards_previous_spilled_photo(store):
+    path = store.spill_photo(1, b"jpeg")
+    store.set(1, {"step": "awaiting_additional_data", "photo_path": path})
+
+    asyncio.run(handlers.register(_update(1), SimpleNamespace(args=["pothole", "here"])))
+
+    assert not (store.get(1) or {}).get("photo_path")
+    assert not os.path.exists(path)
+
+
+def test_same_user_updates_run_one_at_a_time(store, monkeypatch):
+    active, overlaps = set(), []
+    original = handlers.analyze_grievance_async
+
+    async def tracking(text):
+        overlaps.append(bool(active))
+        active.add(text)
+        try:
+            return await original(text)
+        finally:
+            active.discard(text)
+
+    monkeypatch.setattr(handlers, "analyze_grievance_async", tracking)
+
+    async def main():
+        await asyncio.gather(
+            handlers.register(_update(1), SimpleNamespace(args=["first"])),
+            handlers.register(_update(1), SimpleNamespace(args=["second"])),
+        )
+
+    asyncio.run(main())
+    assert overlaps == [False, False]
@@ -0,0 +1,79 @@
+import pytest
+
+import media_store
+from ingest_queue import _acknowledgement, _records_for
+
+
+class FakeQueue:
+    max_attempts = 3
+
+    def __init__(self, photos):
+        self.photos = photos
+
+    def load_photo(self, payload):
+        return self.photos.get(payload.get("photo_path"))
+
+
+def _job(photo_path=None, attempts=0):
+    return {
+        "tracking_id": "T-1",
+        "attempts": attempts,
+        "payload": {
+            "user_id": 1, "username": "u", "grievance": "Fire near the market",
+            "issue": "Fire Hazards", "location": "Ward 1", "photo_path": photo_path,
+        },
+    }
+
+
+@pytest.fixture
+def failing_store(monkeypatch):
+    def fail(data):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(media_store, "put", fail)
+
+
+def test_stored_photo_is_confirmed(monkeypatch):
+    monkeypatch.setattr(media_store, "put", lambda data: "a" * 64)
+    job = _job("/spool/T-1.jpg")
+    records, errors = _records_for([job], ["reply"], FakeQueue({"/spool/T-1.jpg": b"jpeg"}))
+
+    assert errors == {}
+    assert records[0]["photo_ref"] == "a" * 64
+    assert "✅ Photo included." in _acknowledgement(job, 7, "reply", records[0]["photo_ref"])
+
+
+def test_photo_store_error_fails_the_job_for_a_retry(failing_store):
+    jobs = [_job("/spool/T-1.jpg"), dict(_job(), tracking_id="T-2")]
+    records, errors = _records_for(jobs, ["r1", "r2"], FakeQueue({"/spool/T-1.jpg": b"jpeg"}))
+
+    assert records[0] is None
+    assert "disk full" in errors[0]
+    assert records[1]["tracking_id"] == "T-2"
+
+
+def test_last_attempt_saves_without_the_photo_and_says_so(failing_store):
+    job = _job("/spool/T-1.jpg", attempts=FakeQueue.max_attempts - 1)
+    records, errors = _records_for([job], ["reply"], FakeQueue({"/spool/T-1.jpg": b"jpeg"}))
+
+    assert errors == {}
+    assert records[0]["photo_ref"] is None
+    text = _acknowledgement(job, 7, "reply", None)
+    assert "Photo included" not in text
+    assert "couldn't save your photo" in text
+
+
+def test_missing_queued_photo_is_reported():
+    job = _job("/spool/gone.jpg")
+    records, errors = _records_for([job], ["reply"], FakeQueue({}))
+
+    assert errors == {}
+    assert records[0]["photo_ref"] is None
+    assert "couldn't save your photo" in _acknowledgement(job, 7, "reply", None)
+
+
+def test_no_photo():
+    job = _job()
+    records, _ = _records_for([job], ["reply"], FakeQueue({}))
+    assert records[0]["photo_ref"] is None
+    assert "❌ No photo." in _acknowledgement(job, 7, "reply", None)
@@ -0,0 +1,44 @@
+import pytest
+
+from keyword_matcher import KeywordSeverityMatcher
+from priority_index import get_keyword_severity
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Two accidents on the highway", 0.9),
+    ("Floods everywhere", 0.85),
+    ("fires in the market", 0.95),
+    ("Injuries reported", 0.8),
+    ("Street flooded after the rain", 0.85),
+    ("Fire near the school!", 0.95),
+])
+def test_inflected_forms_match(text, expected):
+    assert get_keyword_severity(text) == expected
+
+
+@pytest.mark.parametrize("text", ["Firewall config on the portal", "A gentle breeze", ""])
+def test_no_partial_word_matches(text):
+    assert get_keyword_severity(text) == 0.0
+
+
+def test_explicit_lexicon_entry_keeps_its_own_weight():
+    matcher = KeywordSeverityMatcher({"fire": 0.9, "fires": 0.2})
+    assert matcher.severity("two fires") == 0.2
+    assert matcher.severity("firing range") == 0.9
+
+
+@pytest.mark.parametrize("text", [
+    "市场发生火灾，请快来",      # Chinese, no spaces
+    "ตลาดไฟไหม้เมื่อคืนนี้",       # Thai, no spaces
+    "駅前で火事がありました",     # Japanese
+])
+def test_terms_in_unspaced_scripts_match_inside_sentences(text):
+    matcher = KeywordSeverityMatcher({"火灾": 0.95, "ไฟไหม้": 0.95, "火事": 0.9, "fire": 0.5})
+    assert matcher.severity(text) >= 0.9
+
+
+def test_spaced_scripts_still_need_word_boundaries():
+    matcher = KeywordSeverityMatcher({"आग": 0.95, "fire": 0.5})
+    assert matcher.severity("आगरा शहर") == 0.0
+    assert matcher.severity("बाजार में आग लगी") == 0.95
+    assert matcher.severity("firewall") == 0.0
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+pytest.importorskip("mysql.connector")
+pytest.importorskip("dotenv")
+
+import migrations  # noqa: E402
+
+# Enough rows that MySQL prefers the indexes over a full scan
+SEED_ROWS = int(os.getenv("TEST_INDEX_SEED_ROWS", "20000"))
+
+
+@pytest.fixture(scope="module")
+def conn():
+    import database
+    import benchmarks
+
+    # Opt-in only: migrates, seeds and cleans a separate database, never DB_NAME
+    test_db = os.getenv("TEST_DB_NAME")
+    if not database.DB_HOST or not test_db:
+        pytest.skip("set DB_HOST and TEST_DB_NAME (a scratch database) to run the index checks")
+    if test_db == database.DB_NAME:
+        pytest.skip("TEST_DB_NAME must differ from DB_NAME")
+    app_db, database.DB_NAME = database.DB_NAME, test_db
+    try:
+        yield from _migrated_connection(database, benchmarks)
+    finally:
+        database.DB_NAME = app_db
+
+
+def _migrated_connection(database, benchmarks):
+    database.init_db()
+    conn = database.get_connection(database.DB_NAME)
+    if conn is None:
+        pytest.skip("MySQL unavailable")
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COUNT(*) FROM grievances")
+        seeded = cur.fetchone()[0] < SEED_ROWS
+        if seeded:
+            benchmarks._seed_synthetic_grievances(SEED_ROWS)
+        cur.execute("ANALYZE TABLE grievances")
+        cur.fetchall()
+        assert migrations.current_version(cur) == migrations.LATEST_VERSION
+    finally:
+        cur.close()
+    try:
+        yield conn
+    finally:
+        conn.close()
+        if seeded:
+            benchmarks._cleanup_bench_rows()
+
+
+@pytest.mark.parametrize("label, query, params, expected", migrations.INDEX_CHECKS,
+                         ids=[check[0] for check in migrations.INDEX_CHECKS])
+def test_hot_query_uses_index(conn, label, query, params, expected):
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute("EXPLAIN " + query, params)
+        plan = cur.fetchall()[0]
+    finally:
+        cur.close()
+    assert plan.get("type") != "ALL", f"{label}: full table scan"
+    assert plan.get("key") in expected, f"{label}: used {plan.get('key')}, expected one of {sorted(expected)}"
+
+
+def test_verify_indexes(conn):
+    assert migrations.verify_indexes(conn)
@@ -0,0 +1,39 @@
+import priority_index
+
+
+class RecordingAnalyzer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts, **kwargs):
+        self.calls.append((list(texts), kwargs))
+        return [{"label": "5 stars"} for _ in texts]
+
+
+def test_sentiment_inputs_are_truncated_by_the_tokenizer(monkeypatch):
+    analyzer = RecordingAnalyzer()
+    monkeypatch.setattr(priority_index, "_sentiment_analyzer", analyzer)
+    long_text = "flood " * 2000
+
+    assert priority_index.get_sentiment_scores([long_text, "ok"]) == [1.0, 1.0]
+
+    texts, kwargs = analyzer.calls[0]
+    assert texts[0] == long_text
+    assert kwargs["truncation"] is True
+    assert kwargs["max_length"] == 512
+
+
+class FailingOnAnalyzer(RecordingAnalyzer):
+    def __call__(self, texts, **kwargs):
+        if "bad" in texts:
+            raise RuntimeError("tokenizer error")
+        return super().__call__(texts, **kwargs)
+
+
+def test_failing_text_only_neutralises_itself(monkeypatch):
+    monkeypatch.setattr(priority_index, "_sentiment_analyzer", FailingOnAnalyzer())
+    items = [("good", "Other", "unknown"), ("bad", "Other", "unknown"), ("fine", "Other", "unknown")]
+
+    sentiments = [s for s, _, _, _ in priority_index.calculate_priority_indices(items, batch_size=3)]
+
+    assert sentiments == [1.0, 0.5, 1.0]
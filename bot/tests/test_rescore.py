@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip("tqdm")
+
+import priority_index  # noqa: E402
+from rescore import _score_batch  # noqa: E402
+
+
+def test_failing_row_is_skipped_and_the_rest_scored(monkeypatch):
+    def scores(texts):
+        if "bad" in texts:
+            raise RuntimeError("tokenizer error")
+        return [1.0] * len(texts)
+
+    monkeypatch.setattr(priority_index, "get_sentiment_scores", scores)
+
+    result = _score_batch([(1, "fire in the market"), (2, "bad"), (3, None)])
+
+    assert result == [(1, 1.0, 0.95), (2, None, None), (3, 1.0, 0.0)]
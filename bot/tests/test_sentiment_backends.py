@@ -0,0 +1,42 @@
+import pytest
+
+import sentiment_backends
+from priority_index import SENTIMENT_MODEL_NAME
+from sentiment_backends import SENTIMENT_MAX_TOKENS, _BUILDERS
+
+
+class FakePipeline:
+    pass
+
+
+def test_fallback_records_the_backend_actually_built(monkeypatch):
+    def missing(model_name):
+        raise ImportError("No module named 'optimum'")
+
+    monkeypatch.setattr(sentiment_backends, "_build_pipeline", lambda model_name: FakePipeline())
+    monkeypatch.setitem(sentiment_backends._BUILDERS, "onnx", missing)
+    monkeypatch.setitem(sentiment_backends._BUILDERS, "quantized", lambda model_name: FakePipeline())
+
+    assert sentiment_backends.build_sentiment_pipeline("onnx", "m").sentiment_backend == "pipeline"
+    assert sentiment_backends.build_sentiment_pipeline("bogus", "m").sentiment_backend == "pipeline"
+    assert sentiment_backends.build_sentiment_pipeline("quantized", "m").sentiment_backend == "quantized"
+
+
+@pytest.mark.parametrize("backend", sorted(_BUILDERS))
+def test_backend_truncates_long_inputs(backend):
+    pytest.importorskip("transformers")
+    pytest.importorskip("torch")
+    if backend == "onnx":
+        pytest.importorskip("optimum.onnxruntime")
+    try:
+        analyzer = _BUILDERS[backend](SENTIMENT_MODEL_NAME)
+    except OSError as e:
+        pytest.skip(f"model unavailable: {e}")
+    long_text = "The drain near the school has overflowed again. " * 200
+    assert len(analyzer.tokenizer(long_text)["input_ids"]) > SENTIMENT_MAX_TOKENS
+
+    # No truncation arguments per call: the pipeline must apply them itself
+    result = analyzer([long_text, "ok"])
+
+    assert len(result) == 2
+    assert all(r["label"].endswith(("star", "stars")) for r in result)
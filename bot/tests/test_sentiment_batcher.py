@@ -0,0 +1,46 @@
+import threading
+
+import pytest
+
+from sentiment_batcher import MicroBatcher
+
+
+def _scores(items):
+    if "bad" in items:
+        raise ValueError("sequence too long")
+    return [len(item) for item in items]
+
+
+def test_batches_concurrent_submissions():
+    release = threading.Event()
+    calls = []
+
+    def batch_fn(items):
+        release.wait(1)
+        calls.append(list(items))
+        return [len(item) for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit("x" * i) for i in range(1, 6)]
+    release.set()
+
+    assert [f.result(timeout=2) for f in futures] == [1, 2, 3, 4, 5]
+    assert sum(len(c) for c in calls) == 5
+    assert len(calls) < 5
+
+
+def test_failing_item_does_not_fail_its_batch():
+    batcher = MicroBatcher(_scores, max_batch_size=8, max_wait_ms=50)
+    futures = {text: batcher.submit(text) for text in ("ok", "bad", "fine")}
+
+    assert futures["ok"].result(timeout=2) == 2
+    assert futures["fine"].result(timeout=2) == 4
+    with pytest.raises(ValueError):
+        futures["bad"].result(timeout=2)
+
+
+def test_short_result_list_is_retried_per_item():
+    batcher = MicroBatcher(lambda items: [0] * min(len(items), 1), max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(3)]
+
+    assert [f.result(timeout=2) for f in futures] == [0, 0, 0]